@@ -0,0 +1,60 @@
+# benchmarks/bench_batch.py
+#
+# Headless batch mode end to end: `python main.py --batch -` in a fresh
+# interpreter, so import-time messages are included. Every stdout line must
+# be a JSON result (exit status 1 otherwise); commands per second and the
+# outcome counts come from the stderr summary. The commands only read state.
+# Run from the repo root:  python -m benchmarks.bench_batch
+
+import os
+import sys
+import json
+import time
+import subprocess
+
+COMMANDS = [
+    "what time is it",
+    "what is the date",
+    "list my reminders",
+    "list timers",
+    "how long on the stopwatch",
+    "what do you remember about milk",
+    "play despacito on spotify",   # a backend that may be missing
+    "set volume to 40",
+    "this matches nothing at all",
+]
+ROUNDS = 20
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(commands):
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "main.py", "--batch", "-"], cwd=ROOT, input="\n".join(commands) + "\n",
+                          capture_output=True, text=True, encoding="utf-8", timeout=600)
+    return proc, time.perf_counter() - started
+
+
+def main():
+    commands = COMMANDS * ROUNDS
+    proc, elapsed = run(commands)
+    lines = proc.stdout.splitlines()
+    bad = []
+    for number, line in enumerate(lines, 1):
+        try:
+            json.loads(line)
+        except ValueError:
+            bad.append((number, line))
+    summary = [line for line in proc.stderr.splitlines() if line.startswith("📦")]
+
+    print(f"{len(commands)} commands, exit code {proc.returncode}, {elapsed:.2f}s including start-up")
+    print(summary[-1] if summary else "no batch summary on stderr")
+    print(f"stdout: {len(lines)} lines, {len(lines) - len(bad)} JSON")
+    for number, line in bad[:10]:
+        print(f"  line {number} is not JSON: {line[:100]!r}")
+    if bad or len(lines) != len(commands) or proc.returncode:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_fuzzy.py
+#
+# Fuzzy fallback cost vs. number of indexed trigger phrases: one NumPy
+# matrix-vector product against a per-phrase difflib loop.
+# Run from the repo root:  python -m benchmarks.bench_fuzzy
+
+import difflib
+import random
+import string
+import time
+
+from core.fuzzy_intent import FuzzyIntentIndex
+
+QUERIES = [
+    "strt timer",
+    "what do you remembr",
+    "set volum to 30",
+    "open crome",
+    "this matches nothing at all",
+]
+
+
+def _random_phrase(rng):
+    return " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8))) for _ in range(rng.randint(1, 3)))
+
+
+def build_index(n_phrases, seed=0):
+    rng = random.Random(seed)
+    phrases = ["start timer", "what do you remember", "set volume to", "open chrome"]
+    phrases += [_random_phrase(rng) for _ in range(n_phrases)]
+    index = FuzzyIntentIndex()
+    started = time.perf_counter()
+    for phrase in phrases:
+        index.add(phrase)
+    return index, phrases, time.perf_counter() - started
+
+
+def difflib_best(phrases, command):
+    """The obvious alternative: compare the command with every phrase in turn."""
+    return max(phrases, key=lambda p: difflib.SequenceMatcher(None, command, p).ratio())
+
+
+def per_query(func, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for query in QUERIES:
+            func(query)
+    return (time.perf_counter() - started) / (rounds * len(QUERIES))
+
+
+def main():
+    print(f"{'phrases':>8} {'build ms':>9} {'numpy us':>9} {'difflib us':>11}")
+    for n in (100, 1000, 10000):
+        index, phrases, build = build_index(n)
+        vectorized = per_query(index.best, 200)
+        looped = per_query(lambda q: difflib_best(phrases, q), 2 if n >= 10000 else 20)
+        print(f"{n:>8} {build * 1e3:>9.1f} {vectorized * 1e6:>9.1f} {looped * 1e6:>11.1f}")
+
+    index, _, _ = build_index(100)
+    print()
+    for query in QUERIES:
+        print(f"{query!r:32} -> {index.best(query)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# benchmarks/bench_memory_dedupe.py
+#
+# Near-duplicate check cost vs. store size: MinHash LSH lookup against
+# comparing the new memory with every stored one.
+# Run from the repo root:  python -m benchmarks.bench_memory_dedupe
+
+import time
+
+from benchmarks.bench_memory_search import make_records
+from core.memory_dedupe import DedupeIndex, signature, similarity, shingles
+
+QUERIES = ["that i have to buy milk today", "the wifi password is hunter2 now", "a sentence nobody stored"]
+
+
+def brute_force(records, text):
+    """Exact Jaccard with every stored memory."""
+    new = shingles(text)
+    best = 0.0
+    for record in records:
+        old = shingles(record["text"])
+        best = max(best, len(new & old) / len(new | old))
+    return best
+
+
+def main():
+    print(f"{'memories':>9} {'build s':>8} {'lsh us':>8} {'brute ms':>9} {'groups':>7} {'groups s':>9}")
+    for n in (1_000, 10_000, 100_000):
+        records = make_records(n)
+        index = DedupeIndex()
+        started = time.perf_counter()
+        index({"op": "reset", "records": records})
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(200):
+            for query in QUERIES:
+                index.find(query)
+        lsh = (time.perf_counter() - started) / (200 * len(QUERIES))
+
+        sample = records[:min(n, 10_000)]
+        started = time.perf_counter()
+        brute_force(sample, QUERIES[0])
+        brute = (time.perf_counter() - started) * n / len(sample)
+
+        started = time.perf_counter()
+        groups = index.groups()
+        grouping = time.perf_counter() - started
+        print(f"{n:>9} {build:>8.2f} {lsh * 1e6:>8.1f} {brute * 1e3:>9.1f} {len(groups):>7} {grouping:>9.2f}")
+
+    a, b = "i have to buy", "that i have to buy shit"
+    print(f"\n{a!r} vs {b!r}: estimated Jaccard {similarity(signature(a), signature(b)):.2f}")
+
+
+if __name__ == "__main__":
+    main()
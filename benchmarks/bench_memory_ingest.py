@@ -0,0 +1,51 @@
+# benchmarks/bench_memory_ingest.py
+#
+# Bulk ingest against saying "remember that ..." once per note: batched
+# journal writes and index updates vs. one fsync and index update per memory.
+# Run from the repo root:  python -m benchmarks.bench_memory_ingest
+
+import tempfile
+import time
+
+from benchmarks.bench_memory_search import make_records
+from core import memory_store, memory_search, memory_vectors
+from core.memory_store import MemoryStore
+
+
+def fresh_store():
+    """A shared store in an empty directory, with indexes that attach to it on first use."""
+    memory_store._store = MemoryStore(tempfile.mkdtemp(), background=False)
+    memory_search._index = memory_vectors._index = None
+    return memory_store._store
+
+
+def one_by_one(texts):
+    store = fresh_store()
+    memory_search.get_index(), memory_vectors.get_vector_index()
+    started = time.perf_counter()
+    for text in texts:
+        store.add(text)
+    return time.perf_counter() - started
+
+
+def bulk(texts):
+    from core.memory_ingest import ingest
+    fresh_store()
+    report = ingest(f"{text}\n" for text in texts)
+    return report["seconds"]
+
+
+def main():
+    small = [r["text"] for r in make_records(2_000)]
+    per_item = one_by_one(small)
+    batched = bulk(small)
+    print(f"{len(small)} memories: one by one {len(small) / per_item:>8.0f}/s, bulk {len(small) / batched:>8.0f}/s")
+
+    n = 100_000
+    texts = [r["text"] for r in make_records(n)]
+    seconds = bulk(texts)
+    print(f"{n} memories bulk: {seconds:.1f} s ({n / seconds:.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_memory_search.py
+#
+# Recall cost at 100k memories: SQLite FTS5 ranked search and paged listing
+# against scanning every entry, as list_memory() used to.
+# Run from the repo root:  python -m benchmarks.bench_memory_search
+
+import os
+import random
+import string
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from core.memory_store import make_record, TIMESTAMP_FORMAT
+from core.memory_search import MemoryIndex
+
+# Facts the queries look for, sprinkled through a large random vocabulary
+FACTS = ["buy milk", "dentist on friday", "wifi password is hunter2", "renew the passport"]
+QUERIES = ["milk", "dentist friday", "wifi password", "passport renew", "nothing like this"]
+
+
+def make_records(n, seed=0, vocabulary=20_000):
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(vocabulary)]
+    start = datetime(2024, 1, 1)
+    records = []
+    for i in range(1, n + 1):
+        text = " ".join(rng.choices(words, k=rng.randint(3, 9)))
+        if rng.random() < 0.001:
+            text += " " + rng.choice(FACTS)
+        records.append(make_record(i, text, (start + timedelta(minutes=10 * i)).strftime(TIMESTAMP_FORMAT)))
+    return records
+
+
+def timed(func, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - started) / rounds
+
+
+def main(n=100_000):
+    records = make_records(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = MemoryIndex(os.path.join(tmp, "memory.db"))
+        started = time.perf_counter()
+        index({"op": "reset", "records": records})
+        print(f"{n} memories indexed in {time.perf_counter() - started:.2f} s")
+
+        sync = timed(lambda: index({"op": "reset", "records": records}), 5)
+        print(f"start-up sync check (no rebuild): {sync * 1e3:.1f} ms")
+        add = timed(lambda: index({"op": "add", "record": make_record(n + 1, "buy oat milk")}), 200)
+        print(f"incremental add: {add * 1e3:.3f} ms\n")
+
+        print(f"{'query':22} {'fts5 ms':>8} {'scan ms':>8} {'hits':>6}")
+        for query in QUERIES:
+            fts = timed(lambda: index.search(query), 50)
+            terms = query.split()
+            scan = timed(lambda: [r for r in records if any(t in r["text"] for t in terms)], 3)
+            print(f"{query:22} {fts * 1e3:>8.3f} {scan * 1e3:>8.1f} {len(index.search(query)):>6}")
+
+        page = timed(lambda: index.page(500, 5), 200)
+        ranged = timed(lambda: index.page(0, 5, "2024-06-01 00:00:00", "2024-06-08 00:00:00"), 200)
+        print(f"\npaged listing: {page * 1e3:.3f} ms, one week's range: {ranged * 1e3:.3f} ms")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
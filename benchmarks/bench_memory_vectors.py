@@ -0,0 +1,63 @@
+# benchmarks/bench_memory_vectors.py
+#
+# TF-IDF recall at 100k memories: incremental add, reopening the memory-mapped
+# index, and a vectorized cosine top-k against a per-row Python loop.
+# Run from the repo root:  python -m benchmarks.bench_memory_vectors
+
+import math
+import tempfile
+import time
+
+from benchmarks.bench_memory_search import make_records
+from core.memory_store import make_record
+from core.memory_vectors import VectorIndex
+
+QUERIES = ["shop for milk", "dental appointment", "wireless password", "passport renewal"]
+
+
+def loop_search(index, text, k=3):
+    """The same scoring, one row at a time."""
+    rows = index._matrix[:index.rows].tolist()
+    idf = [math.log((1.0 + index.live) / (1.0 + d)) + 1.0 for d in index.df]
+    query = [q * w for q, w in zip(index._vector(text).tolist(), idf)]
+    norm = math.sqrt(sum(q * q for q in query)) or 1.0
+    scored = [sum(r * q for r, q in zip(row, query) if r) / norm for row in rows]
+    return sorted(range(len(scored)), key=scored.__getitem__, reverse=True)[:k]
+
+
+def main(n=100_000):
+    records = make_records(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = VectorIndex(tmp)
+        started = time.perf_counter()
+        index({"op": "reset", "records": records})
+        print(f"{n} memories vectorized in {time.perf_counter() - started:.2f} s")
+
+        started = time.perf_counter()
+        for i in range(200):
+            index({"op": "add", "record": make_record(n + 1 + i, "buy some groceries at the shop")})
+        print(f"incremental add: {(time.perf_counter() - started) / 200 * 1e3:.3f} ms")
+
+        del index
+        started = time.perf_counter()
+        index = VectorIndex(tmp)
+        print(f"reopen (memory-mapped): {(time.perf_counter() - started) * 1e3:.1f} ms, {index.live} rows\n")
+
+        for query in QUERIES:
+            started = time.perf_counter()
+            for _ in range(10):
+                hits = index.search(query)
+            vectorized = (time.perf_counter() - started) / 10
+            print(f"{query!r:24} {vectorized * 1e3:>8.2f} ms  {hits}")
+
+        sample = VectorIndex(tempfile.mkdtemp())
+        sample({"op": "reset", "records": records[:5000]})
+        started = time.perf_counter()
+        loop_search(sample, QUERIES[0])
+        looped = time.perf_counter() - started
+        print(f"\nper-row loop over 5000 rows: {looped * 1e3:.0f} ms "
+              f"(~{looped * n / 5000:.0f} s at {n})")
+
+
+if __name__ == "__main__":
+    main()
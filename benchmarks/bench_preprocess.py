@@ -0,0 +1,94 @@
+# benchmarks/bench_preprocess.py
+#
+# Per-call latency of core.nlp_parser.preprocess against a large rules file.
+# Run from the repo root:  python -m benchmarks.bench_preprocess
+
+import json
+import os
+import random
+import string
+import tempfile
+import time
+
+from core import nlp_parser
+
+COMMANDS = [
+    "could you please start timer for 5 minutes",
+    "hey launch spotify right now",
+    "search for brunch places near me",
+    "i want to play song despacito",
+    "focus mode",
+    "umm what time is it",
+]
+
+
+def _word(rng):
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+
+
+def build_rules(n, seed=0):
+    rng = random.Random(seed)
+    with open(nlp_parser.NLP_RULES_FILE, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    for _ in range(n):
+        rules["junk_phrases"].append(f"{_word(rng)} {_word(rng)}")
+        rules["synonyms"][_word(rng)] = _word(rng)
+        rules["command_aliases"][f"{_word(rng)} mode"] = f"open {_word(rng)}"
+        rules["start_patterns"][f"{_word(rng)} "] = ""
+    return rules
+
+
+def legacy_preprocess(rules, command):
+    """The original loop of str.replace calls, for comparison."""
+    command = command.lower().strip()
+    for junk in rules["junk_phrases"]:
+        if junk in command:
+            command = command.replace(junk, "").strip()
+    for word, replacement in rules["synonyms"].items():
+        if word in command:
+            command = command.replace(word, replacement)
+    if command in rules["command_aliases"]:
+        return rules["command_aliases"][command]
+    for pattern, replacement in rules["start_patterns"].items():
+        if command.startswith(pattern):
+            command = command.replace(pattern, replacement, 1).strip()
+    if rules.get("fallback_prefix") and not command.startswith(rules["fallback_prefix"]):
+        command = rules["fallback_prefix"] + command
+    return command
+
+
+def per_call(func, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for command in COMMANDS:
+            func(command)
+    return (time.perf_counter() - started) / (rounds * len(COMMANDS)) * 1e6
+
+
+def main():
+    original_file = nlp_parser.NLP_RULES_FILE
+    print(f"{'entries':>8} {'legacy us':>10} {'compiled us':>12} {'cached us':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (0, 1000, 5000, 20000):
+            rules = build_rules(n)
+            path = os.path.join(tmp, f"rules_{n}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(rules, f)
+            nlp_parser.NLP_RULES_FILE = path
+            nlp_parser.reload_rules(force=True)
+
+            rounds = 20 if n >= 5000 else 200
+            legacy = per_call(lambda c: legacy_preprocess(rules, c), rounds)
+            compiled = per_call(nlp_parser._compiled.apply, rounds)
+            cached = per_call(nlp_parser.preprocess, rounds * 10)
+            print(f"{n:>8} {legacy:>10.2f} {compiled:>12.2f} {cached:>10.2f}")
+    nlp_parser.NLP_RULES_FILE = original_file
+    nlp_parser.reload_rules(force=True)
+
+    print()
+    for command in COMMANDS:
+        print(f"{command!r:46} -> {nlp_parser.preprocess(command)!r}")
+
+
+if __name__ == "__main__":
+    main()
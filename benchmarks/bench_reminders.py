@@ -0,0 +1,74 @@
+# benchmarks/bench_reminders.py
+#
+# Reminder scheduling with 100k pending reminders: the heap scheduler's add,
+# cancel, reload and firing lateness against one pass of the old
+# once-a-minute poll (strptime every reminder, compare with now).
+# Run from the repo root:  python -m benchmarks.bench_reminders
+
+import os
+import time
+import random
+import datetime
+import tempfile
+import threading
+
+from core.datastore import atomic_write_json
+from modules.reminder import ReminderBook, TIME_FORMAT
+
+
+def old_poll(reminders):
+    """What reminder_checker did every 60 s before any reminder could fire."""
+    now = datetime.datetime.now()
+    return [r for r in reminders if datetime.datetime.strptime(r["time"], TIME_FORMAT) <= now]
+
+
+def main(n=100_000):
+    rng = random.Random(0)
+    start = datetime.datetime.now() + datetime.timedelta(days=1)
+    reminders = [{"id": i + 1, "task": f"task {i}",
+                  "time": (start + datetime.timedelta(minutes=rng.randrange(525_600))).strftime(TIME_FORMAT)}
+                 for i in range(n)]
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot, log = os.path.join(tmp, "reminders.json"), os.path.join(tmp, "reminders.log")
+        atomic_write_json(snapshot, reminders)
+
+        started = time.perf_counter()
+        book = ReminderBook(snapshot, log, fsync=False)
+        print(f"load {n} pending: {time.perf_counter() - started:.2f} s")
+
+        started = time.perf_counter()
+        old_poll(reminders)
+        print(f"old poll, one pass: {(time.perf_counter() - started) * 1e3:.0f} ms every minute")
+
+        fired = []
+        lock = threading.Lock()
+
+        def on_fire(reminder):
+            with lock:
+                fired.append((reminder["id"], time.time()))
+
+        book.on_fire = on_fire
+        book.start()
+
+        started = time.perf_counter()
+        added = [book.add(f"extra {i}", start + datetime.timedelta(days=400, minutes=i)) for i in range(1000)]
+        print(f"add: {(time.perf_counter() - started) / 1000 * 1e6:.1f} us each")
+        started = time.perf_counter()
+        for reminder in added:
+            book.remove(reminder["id"])
+        print(f"cancel: {(time.perf_counter() - started) / 1000 * 1e6:.1f} us each")
+
+        # 200 reminders due within the next half second, among the 100k
+        targets = {}
+        soon = datetime.datetime.now().replace(microsecond=0) + datetime.timedelta(seconds=1)
+        for i in range(200):
+            reminder = book.add(f"soon {i}", soon)
+            targets[reminder["id"]] = soon.timestamp()
+        time.sleep(max(soon.timestamp() - time.time(), 0) + 0.5)
+        book.stop()
+        late = [(at - targets[i]) * 1e3 for i, at in fired if i in targets]
+        print(f"fired {len(late)}/200, lateness max {max(late):.1f} ms, mean {sum(late) / len(late):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_router.py
+#
+# Routing cost vs. number of registered intents.
+# Run from the repo root:  python -m benchmarks.bench_router
+
+import random
+import string
+import time
+
+from core.intent_engine import IntentEngine
+
+COMMANDS = [
+    "start timer for 5 minutes",
+    "what time is it",
+    "delete memory",
+    "set spotify volume to 40",
+    "open notepad",
+    "play despacito on youtube",
+    "this matches nothing at all",
+]
+
+
+def _noop(command, match):
+    pass
+
+
+def _random_phrase(rng):
+    return " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8))) for _ in range(rng.randint(1, 3)))
+
+
+def build_engine(n_intents, seed=0):
+    rng = random.Random(seed)
+    engine = IntentEngine()
+    for name, phrase in [("timer.start", "start timer"), ("status.time", "time"),
+                         ("memory.clear", "delete memory"), ("file.delete", "delete"),
+                         ("volume.app_set", "set spotify volume to"), ("tool.open", "open notepad"),
+                         ("browser.youtube", "youtube")]:
+        engine.register(name, _noop, phrases=(phrase,))
+    for i in range(n_intents):
+        engine.register(f"synthetic.{i}", _noop, phrases=(_random_phrase(rng), _random_phrase(rng)))
+    engine.compile()
+    return engine
+
+
+def linear_route(engine, command):
+    """The old approach: test every trigger of every intent in registration order."""
+    for intent in engine.intents.values():
+        for phrase in intent.phrases:
+            if phrase in command:
+                return intent
+    return None
+
+
+def bench(n_intents, rounds=2000):
+    engine = build_engine(n_intents)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for command in COMMANDS:
+            engine.match(command)
+    compiled = (time.perf_counter() - started) / (rounds * len(COMMANDS))
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for command in COMMANDS:
+            linear_route(engine, command)
+    linear = (time.perf_counter() - started) / (rounds * len(COMMANDS))
+    return engine, compiled, linear
+
+
+def main():
+    print(f"{'intents':>8} {'compile ms':>11} {'automaton us':>13} {'linear us':>10}")
+    for n in (10, 100, 1000, 10000):
+        engine, compiled, linear = bench(n, rounds=200 if n >= 1000 else 2000)
+        print(f"{n:>8} {engine.compile_time * 1e3:>11.2f} {compiled * 1e6:>13.2f} {linear * 1e6:>10.2f}")
+
+    engine = build_engine(10)
+    print()
+    for command in COMMANDS:
+        print(f"{command!r:32} -> {engine.match(command)}")
+
+
+if __name__ == "__main__":
+    main()
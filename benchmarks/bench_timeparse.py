@@ -0,0 +1,115 @@
+# benchmarks/bench_timeparse.py
+#
+# Spoken time phrases through core.timeparse against the old reminder path
+# (split on " at "/" tomorrow ", then dateutil fuzzy parse) and against
+# dateutil fuzzy parsing of the whole phrase: phrases per second and how
+# many each one understands.
+# Run from the repo root:  python -m benchmarks.bench_timeparse
+
+import time
+import datetime
+
+from dateutil import parser as date_parser
+
+from core import timeparse
+
+NOW = datetime.datetime(2026, 3, 4, 12, 0)  # a Wednesday, noon
+D = datetime.datetime
+
+# (phrase after "remind me to", expected time)
+CORPUS = [
+    ("call mom at 5 pm", D(2026, 3, 4, 17, 0)),
+    ("call mom at 5", D(2026, 3, 4, 17, 0)),
+    ("take my pills in 20 minutes", D(2026, 3, 4, 12, 20)),
+    ("check the oven in an hour and a half", D(2026, 3, 4, 13, 30)),
+    ("stretch in 1 hour 15 minutes", D(2026, 3, 4, 13, 15)),
+    ("submit the report next friday evening", D(2026, 3, 6, 18, 0)),
+    ("see the dentist tomorrow at 9:30 am", D(2026, 3, 5, 9, 30)),
+    ("buy milk tomorrow morning", D(2026, 3, 5, 9, 0)),
+    ("pay rent on monday", D(2026, 3, 9, 9, 0)),
+    ("water the plants tonight", D(2026, 3, 4, 20, 0)),
+    ("join the meeting friday at 3pm", D(2026, 3, 6, 15, 0)),
+    ("move the car half an hour from now", D(2026, 3, 4, 12, 30)),
+    ("leave for the airport at 19:30", D(2026, 3, 4, 19, 30)),
+    ("take out the trash the day after tomorrow at 7 am", D(2026, 3, 6, 7, 0)),
+    ("pick up the kids at 3 o'clock this afternoon", D(2026, 3, 4, 15, 0)),
+    ("start the laundry in twenty five minutes", D(2026, 3, 4, 12, 25)),
+    ("call the bank at 4:15 pm", D(2026, 3, 4, 16, 15)),
+    ("feed the cat this evening", D(2026, 3, 4, 18, 0)),
+    ("book the flight on march 20th", D(2026, 3, 20, 9, 0)),
+    ("send the invoice on saturday at 10", D(2026, 3, 7, 10, 0)),
+    ("tidy the garage today", D(2026, 3, 4, 13, 0)),       # 9 am has passed: the next hour
+    ("pay rent on the 1st", D(2026, 4, 1, 9, 0)),           # this month's 1st has passed
+]
+
+
+def old_reminder_parse(phrase):
+    """What handle_reminder_command did before the grammar."""
+    if " at " in phrase:
+        task, time_str = phrase.rsplit(" at ", 1)
+    elif " tomorrow " in phrase:
+        task, time_str = phrase.split(" tomorrow ", 1)
+        time_str = "tomorrow " + time_str
+    else:
+        return None
+    return date_parser.parse(time_str, fuzzy=True, default=NOW.replace(hour=0))
+
+
+def fuzzy_parse(phrase):
+    return date_parser.parse(phrase, fuzzy=True, default=NOW.replace(hour=0))
+
+
+def grammar_parse(phrase):
+    found = timeparse.parse_when(phrase, NOW)
+    return found.when if found else None
+
+
+def grammar_only(phrase):
+    found = timeparse.parse_when(phrase, NOW, fallback=False)
+    return found.when if found else None
+
+
+def run(parse, rounds):
+    correct = 0
+    for phrase, expected in CORPUS:
+        try:
+            correct += parse(phrase) == expected
+        except (ValueError, OverflowError):
+            pass
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for phrase, _ in CORPUS:
+            try:
+                parse(phrase)
+            except (ValueError, OverflowError):
+                pass
+    rate = rounds * len(CORPUS) / (time.perf_counter() - started)
+    return rate, correct
+
+
+def main():
+    print(f"{len(CORPUS)} spoken phrases, now = {NOW:%A %H:%M}")
+    print(f"{'parser':<24} {'phrases/s':>10} {'correct':>8}")
+    for name, parse, rounds in (("old split + dateutil", old_reminder_parse, 200),
+                                ("dateutil fuzzy", fuzzy_parse, 200),
+                                ("timeparse", grammar_parse, 2000),
+                                ("timeparse, no dateutil", grammar_only, 2000)):
+        rate, correct = run(parse, rounds)
+        print(f"{name:<24} {rate:>10,.0f} {correct:>5}/{len(CORPUS)}")
+
+    durations = ["5 minutes", "1 hour 20 minutes", "90 seconds", "2h30m", "an hour and a half"]
+    started = time.perf_counter()
+    for _ in range(10_000):
+        for phrase in durations:
+            timeparse.parse_duration(phrase)
+    print(f"durations: {50_000 / (time.perf_counter() - started):,.0f} phrases/s")
+
+    print()
+    for phrase, expected in CORPUS:
+        found = timeparse.parse_when(phrase, NOW)
+        mark = "ok " if found and found.when == expected else "BAD"
+        print(f"{mark} {phrase!r:52} -> {found.when if found else None}  [{found.method if found else '-'}] {found.rest if found else ''!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# core/audio_stream.py
+
+import io
+import math
+import time
+import wave
+import queue
+import threading
+from array import array
+from collections import deque
+
+try:
+    import audioop  # fast RMS; removed from the stdlib in Python 3.13
+except ImportError:
+    audioop = None
+
+# === SEGMENTATION DEFAULTS ===
+PRE_ROLL = 0.3                 # seconds of audio kept from before speech was detected
+PAUSE_THRESHOLD = 0.8          # seconds of silence that end an utterance
+MIN_UTTERANCE = 0.25           # shorter bursts are treated as noise
+PHRASE_TIME_LIMIT = 10         # hard cap on one utterance, in seconds
+RECALIBRATE_INTERVAL = 5.0     # seconds between energy-threshold updates
+INITIAL_CALIBRATION = 0.5      # seconds of audio used for the first, one-time calibration
+THRESHOLD_MULTIPLIER = 1.5     # speech must be this much louder than the ambient level
+MIN_ENERGY_THRESHOLD = 300
+
+
+def rms(chunk, sample_width):
+    """Root-mean-square energy of a chunk of little-endian PCM audio."""
+    if audioop is not None:
+        return audioop.rms(chunk, sample_width)
+    if sample_width != 2 or not chunk:
+        return 0
+    samples = array("h", chunk[:len(chunk) - len(chunk) % 2])
+    return int(math.sqrt(sum(s * s for s in samples) / len(samples))) if samples else 0
+
+
+class Utterance:
+    """One segmented utterance of raw PCM audio."""
+
+    def __init__(self, frame_data, sample_rate, sample_width, started_at=None):
+        self.frame_data = frame_data
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.started_at = started_at or time.time()
+        self.ended_at = time.time()
+        # Set when a streaming recognizer decoded this utterance while it was captured
+        self.streamed = False
+        self.result = None
+        self._result_ready = threading.Event()
+
+    def attach_result(self, result):
+        self.result = result
+        self._result_ready.set()
+
+    def wait_result(self, timeout=None):
+        """Wait for the streamed recognition result (None if there is none)."""
+        if not self.streamed:
+            return None
+        self._result_ready.wait(timeout)
+        return self.result
+
+    @property
+    def duration(self):
+        return len(self.frame_data) / float(self.sample_rate * self.sample_width)
+
+    def get_wav_data(self):
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(self.sample_width)
+            w.setframerate(self.sample_rate)
+            w.writeframes(self.frame_data)
+        return buf.getvalue()
+
+    def __repr__(self):
+        return f"Utterance({self.duration:.2f}s @ {self.sample_rate} Hz)"
+
+
+# ========== Sources ==========
+
+class MicrophoneSource:
+    """The default microphone, opened once and kept open (needs PyAudio)."""
+
+    def __init__(self, device_index=None, sample_rate=16000, chunk_size=1024):
+        import speech_recognition as sr
+        self._mic = sr.Microphone(device_index=device_index, sample_rate=sample_rate, chunk_size=chunk_size)
+        self._source = self._mic.__enter__()
+        self.sample_rate = self._mic.SAMPLE_RATE
+        self.sample_width = self._mic.SAMPLE_WIDTH
+        self.chunk_size = self._mic.CHUNK
+
+    def read(self):
+        return self._source.stream.read(self.chunk_size)
+
+    def close(self):
+        self._mic.__exit__(None, None, None)
+
+
+class WavFileSource:
+    """
+    Replays a mono PCM WAV file as if it were a microphone, for testing without hardware.
+    :param realtime: pace reads at the file's sample rate instead of as fast as possible.
+    :param trailing_silence: seconds of silence emitted after the file ends, then EOF.
+    """
+
+    def __init__(self, path, chunk_size=1024, realtime=False, trailing_silence=1.0):
+        self._wav = wave.open(path, "rb")
+        if self._wav.getnchannels() != 1:
+            raise ValueError("WavFileSource needs a mono WAV file.")
+        self.sample_rate = self._wav.getframerate()
+        self.sample_width = self._wav.getsampwidth()
+        self.chunk_size = chunk_size
+        self.realtime = realtime
+        self._silence_chunks = int(trailing_silence * self.sample_rate / chunk_size)
+        self._next_read = time.monotonic()
+
+    def read(self):
+        if self.realtime:
+            delay = self._next_read - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_read += self.chunk_size / self.sample_rate
+        data = self._wav.readframes(self.chunk_size)
+        if data:
+            return data
+        if self._silence_chunks > 0:
+            self._silence_chunks -= 1
+            return b"\x00" * self.chunk_size * self.sample_width
+        return b""  # end of stream
+
+    def close(self):
+        self._wav.close()
+
+
+# ========== Stream ==========
+
+class AudioStream:
+    """
+    A long-lived capture stream: one thread reads the source into a ring
+    buffer, segments utterances by energy, and queues them. The energy
+    threshold is recalibrated in the background from quiet stretches, so
+    no per-command calibration pause is needed and listening costs nothing
+    between commands.
+    """
+
+    def __init__(self, source, energy_threshold=None, pause_threshold=PAUSE_THRESHOLD,
+                 phrase_time_limit=PHRASE_TIME_LIMIT, pre_roll=PRE_ROLL, max_pending=8):
+        self.source = source
+        self.pause_threshold = pause_threshold
+        self.phrase_time_limit = phrase_time_limit
+        self.energy_threshold = energy_threshold or MIN_ENERGY_THRESHOLD
+        self._calibrated = energy_threshold is not None
+
+        self._chunk_seconds = source.chunk_size / float(source.sample_rate)
+        self._pre_roll = deque(maxlen=max(1, int(pre_roll / self._chunk_seconds)))
+        # Energies of recent quiet chunks, used for recalibration
+        self._ambient = deque(maxlen=max(1, int(RECALIBRATE_INTERVAL / self._chunk_seconds)))
+        self._last_calibration = time.monotonic()
+        self.utterances = queue.Queue(max_pending)
+        self.eof = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """
+        Call listener(event, data, sample_rate) from the capture thread:
+        "start" with the pre-roll audio, "audio" per chunk, then "end" with
+        the Utterance or "discard" if the burst was too short to be speech.
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, event, data):
+        for listener in self._listeners:
+            try:
+                listener(event, data, self.source.sample_rate)
+            except Exception as e:
+                print(f"[Audio Listener Error] {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="newt-audio", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.source.close()
+
+    def next_utterance(self, timeout=None):
+        """Block until the next utterance is available. None on timeout or end of stream."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                return self.utterances.get(timeout=0.1 if remaining is None else min(0.1, remaining))
+            except queue.Empty:
+                if self.eof.is_set() and self.utterances.empty():
+                    return None
+                if deadline is not None and time.monotonic() >= deadline:
+                    return None
+
+    # ========== Capture loop ==========
+
+    def _recalibrate(self, now, force=False):
+        if self._ambient and (force or now - self._last_calibration >= RECALIBRATE_INTERVAL):
+            ambient = sorted(self._ambient)[len(self._ambient) // 2]  # median is robust to clicks
+            self.energy_threshold = max(MIN_ENERGY_THRESHOLD, ambient * THRESHOLD_MULTIPLIER)
+            self._last_calibration = now
+            self._calibrated = True
+
+    def _emit(self, frames, voiced_chunks, started_at):
+        if voiced_chunks * self._chunk_seconds < MIN_UTTERANCE:
+            self._notify("discard", None)
+            return  # a click or a cough, not speech
+        utterance = Utterance(b"".join(frames), self.source.sample_rate, self.source.sample_width, started_at)
+        utterance.streamed = bool(self._listeners)
+        self._notify("end", utterance)
+        try:
+            self.utterances.put_nowait(utterance)
+        except queue.Full:
+            print("⚠️ Utterance queue full, dropping the oldest.")
+            try:
+                self.utterances.get_nowait()
+            except queue.Empty:
+                pass
+            self.utterances.put_nowait(utterance)
+
+    def _run(self):
+        width = self.source.sample_width
+        frames, voiced, silent_for, speaking, started_at = [], 0, 0.0, False, None
+        try:
+            while not self._stop.is_set():
+                chunk = self.source.read()
+                if not chunk:
+                    break
+                now = time.monotonic()
+                energy = rms(chunk, width)
+
+                if not speaking:
+                    if self._calibrated and energy > self.energy_threshold:
+                        speaking, voiced, silent_for, started_at = True, 1, 0.0, time.time()
+                        frames = list(self._pre_roll) + [chunk]
+                        self._pre_roll.clear()
+                        self._notify("start", b"".join(frames))
+                        continue
+                    self._pre_roll.append(chunk)
+                    self._ambient.append(energy)
+                    if self._calibrated:
+                        self._recalibrate(now)
+                    elif len(self._ambient) * self._chunk_seconds >= INITIAL_CALIBRATION:
+                        # One-time calibration when the stream opens, never per command
+                        self._recalibrate(now, force=True)
+                    continue
+
+                frames.append(chunk)
+                self._notify("audio", chunk)
+                if energy > self.energy_threshold:
+                    voiced, silent_for = voiced + 1, 0.0
+                else:
+                    silent_for += self._chunk_seconds
+                too_long = len(frames) * self._chunk_seconds >= self.phrase_time_limit
+                if silent_for >= self.pause_threshold or too_long:
+                    self._emit(frames, voiced, started_at)
+                    frames, speaking = [], False
+            if speaking and frames:
+                self._emit(frames, voiced, started_at)
+        except Exception as e:
+            print(f"❌ Audio stream error: {e}")
+        finally:
+            self.eof.set()
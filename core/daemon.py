@@ -0,0 +1,162 @@
+# core/daemon.py
+
+import os
+import hmac
+import json
+import time
+import socket
+import secrets
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.lazy import warm_all
+from core.task_router import handle_commands
+from core.daemon_client import SOCKET_PATH, TOKEN_PATH, DAEMON_HOST, DAEMON_PORT, new_request_id
+from core.events import publish
+
+WORKERS = 4
+MAX_LINE = 64 * 1024   # longest request line accepted
+# A browser can be made to POST text/plain to localhost; its request line marks it
+HTTP_METHODS = tuple(m.encode() + b" " for m in ("GET", "POST", "PUT", "PATCH", "DELETE", "HEAD",
+                                                   "OPTIONS", "CONNECT", "TRACE"))
+
+
+class CommandDaemon:
+    """
+    Long-running command server: every module stays imported and warm, and
+    text commands arrive over a local UNIX socket (TCP on localhost where
+    AF_UNIX is missing) as JSON lines.
+
+    Commands run on a worker pool through handle_commands, so each one
+    gets a structured CommandResult with its own captured speech; a slow
+    command only occupies one worker. Responses are written as soon as
+    they finish, tagged with the request id they answer.
+
+    The first line that is not a JSON object closes the connection. Over
+    TCP, which any local program (or web page) can reach, every request
+    must also carry the token the daemon writes to data/daemon.token.
+    """
+
+    def __init__(self, socket_path=SOCKET_PATH, workers=WORKERS, speak_output=False, token_path=TOKEN_PATH):
+        self.socket_path = socket_path
+        self.token_path = token_path
+        self.token = None      # required in every request when set (TCP only)
+        self.speak_output = speak_output
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="newt-daemon")
+        self._server = None
+
+    def run(self, request):
+        """Execute one request dict on the calling thread and return the response dict."""
+        request_id = str(request.get("id") or new_request_id())
+        command = str(request.get("command") or "")
+        started = time.perf_counter()
+        result = next(handle_commands([command], speak_output=self.speak_output))
+        return {"id": request_id, **result.to_dict(),
+                "total_ms": round((time.perf_counter() - started) * 1000, 3)}
+
+    async def submit(self, request):
+        """run() on the worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.run, request)
+
+    # ========== Socket server ==========
+
+    async def _handle(self, reader, writer):
+        pending = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await self._write(writer, {"id": None, "outcome": "error", "error": "request line too long"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                if line.startswith(HTTP_METHODS):
+                    break  # not a client of ours; answer nothing
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("expected a JSON object")
+                except ValueError as e:
+                    await self._write(writer, {"id": None, "outcome": "error", "error": f"bad request: {e}"})
+                    break
+                if self.token is not None and not hmac.compare_digest(str(request.pop("token", "")), self.token):
+                    await self._write(writer, {"id": request.get("id"), "outcome": "error",
+                                               "error": "missing or wrong token"})
+                    break
+                task = asyncio.create_task(self._respond(request, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, request, writer):
+        request.setdefault("id", new_request_id())
+        try:
+            response = await self.submit(request)
+        except Exception as e:
+            response = {"id": request["id"], "command": request.get("command"), "outcome": "error",
+                        "error": f"{type(e).__name__}: {e}"}
+        await self._write(writer, response)
+
+    @staticmethod
+    async def _write(writer, response):
+        writer.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+        await writer.drain()
+
+    async def serve(self):
+        if hasattr(socket, "AF_UNIX"):
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)  # left over from a daemon that did not exit cleanly
+            self._server = await asyncio.start_unix_server(self._handle, self.socket_path, limit=MAX_LINE)
+            os.chmod(self.socket_path, 0o600)
+            where = self.socket_path
+        else:
+            self.token = secrets.token_urlsafe(32)
+            self._write_token()
+            self._server = await asyncio.start_server(self._handle, DAEMON_HOST, DAEMON_PORT, limit=MAX_LINE)
+            where = f"{DAEMON_HOST}:{DAEMON_PORT}"
+        print(f"🛰️ Newt daemon listening on {where}")
+        publish("daemon", state="started", address=where)
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            for path in (self.socket_path, self.token_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _write_token(self):
+        """Leave the TCP token where local clients (and only the user) can read it."""
+        os.makedirs(os.path.dirname(self.token_path) or ".", exist_ok=True)
+        if os.path.exists(self.token_path):
+            os.remove(self.token_path)
+        fd = os.open(self.token_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.token)
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_daemon(socket_path=SOCKET_PATH, workers=WORKERS, speak_output=False):
+    """Serve commands until interrupted."""
+    daemon = CommandDaemon(socket_path, workers, speak_output)
+    # Pay every feature module's import cost now rather than on someone's first command
+    threading.Thread(target=warm_all, name="newt-warm", daemon=True).start()
+    try:
+        asyncio.run(daemon.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
@@ -0,0 +1,112 @@
+# core/daemon_client.py
+#
+# Thin client for the command daemon (python main.py --daemon). It imports
+# nothing from the assistant, so a scripted command costs a socket round
+# trip instead of a cold start:
+#
+#   python -m core.daemon_client "what time is it"
+#   echo "list reminders" | python -m core.daemon_client --json -
+#
+# Protocol: one JSON object per line each way. A request is
+# {"command": "...", "id": "optional"}; the response is the CommandResult
+# dict plus "id" (generated when the request had none). Several requests may
+# be in flight on one connection; responses carry the id they answer.
+# Over TCP (no AF_UNIX), requests also carry "token", read from
+# data/daemon.token, and the first malformed line ends the connection.
+
+import os
+import sys
+import json
+import uuid
+import socket
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOCKET_PATH = os.path.join(ROOT_DIR, "data", "newt.sock")
+TOKEN_PATH = os.path.join(ROOT_DIR, "data", "daemon.token")  # written by a daemon listening on TCP
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8766          # used instead of the socket where AF_UNIX is unavailable (Windows)
+TIMEOUT = 30.0
+
+
+class DaemonUnavailable(Exception):
+    pass
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:12]
+
+
+def connect(socket_path=SOCKET_PATH, timeout=TIMEOUT):
+    """(socket, token): the token to send with each request, None on the UNIX socket."""
+    try:
+        if hasattr(socket, "AF_UNIX") and os.path.exists(socket_path):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            return sock, None
+        with open(TOKEN_PATH, "r", encoding="utf-8") as f:
+            token = f.read().strip()
+        sock = socket.create_connection((DAEMON_HOST, DAEMON_PORT), timeout)
+    except OSError as e:
+        raise DaemonUnavailable(f"the Newt daemon is not running ({e}); start it with: python main.py --daemon")
+    return sock, token
+
+
+def send_commands(commands, socket_path=SOCKET_PATH, timeout=TIMEOUT, request_ids=None):
+    """Send commands over one connection and return their responses in the same order."""
+    request_ids = request_ids or [new_request_id() for _ in commands]
+    requests = [{"id": str(i), "command": command} for i, command in zip(request_ids, commands)]
+    if not requests:
+        return []
+    sock, token = connect(socket_path, timeout)
+    if token is not None:
+        requests = [{**r, "token": token} for r in requests]
+    with sock:
+        sock.sendall("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in requests).encode("utf-8"))
+        responses = {}
+        with sock.makefile("r", encoding="utf-8") as lines:
+            for line in lines:
+                response = json.loads(line)
+                responses[response.get("id")] = response
+                if len(responses) == len(requests):
+                    break
+    missing = {"outcome": "error", "error": "no response from daemon"}
+    return [responses.get(r["id"], {**missing, "id": r["id"], "command": r["command"]}) for r in requests]
+
+
+def send_command(command, socket_path=SOCKET_PATH, timeout=TIMEOUT, request_id=None):
+    return send_commands([command], socket_path, timeout, [request_id] if request_id else None)[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send commands to a running Newt daemon")
+    parser.add_argument("command", nargs="+", help="command text, or '-' to read one command per line from stdin")
+    parser.add_argument("--json", action="store_true", help="print the full JSON response per command")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT)
+    args = parser.parse_args(argv)
+
+    if args.command == ["-"]:
+        commands = [line.strip() for line in sys.stdin if line.strip()]
+    else:
+        commands = [" ".join(args.command)]
+    try:
+        responses = send_commands(commands, timeout=args.timeout)
+    except (DaemonUnavailable, socket.timeout) as e:
+        print(e, file=sys.stderr)
+        return 2
+    failed = 0
+    for response in responses:
+        if args.json:
+            print(json.dumps(response, ensure_ascii=False))
+        else:
+            for text in response.get("spoken") or []:
+                print(text)
+            if response.get("error"):
+                print(f"[{response['outcome']}] {response['error']}", file=sys.stderr)
+        failed += response.get("outcome") not in ("ok", "custom")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+# core/datastore.py
+
+import os
+import copy
+import json
+import atexit
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+WRITE_DELAY = 0.25  # seconds a burst of writes is coalesced into one save
+
+
+def atomic_write_json(path, data, indent=None):
+    """Write JSON to a temp file, fsync it and rename it over path, so readers never see half a file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class FileLock:
+    """
+    Exclusive lock on a file shared by several processes (the assistant and
+    the web UI), taken with flock, or msvcrt.locking on Windows. It also
+    serialises threads, and a thread that holds it may take it again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                self._file = open(self.path, "a+b")
+                _lock_file(self._file)
+            except BaseException:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                _unlock_file(self._file)
+            finally:
+                self._file.close()
+                self._file = None
+        self._lock.release()
+
+
+def _lock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    while True:
+        f.seek(0)
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue  # LK_LOCK gives up after ten tries; keep waiting
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_ino, st.st_size
+
+
+class JSONFile:
+    """
+    One JSON file under data/, cached in memory.
+
+    read() costs a stat: the file is only parsed again when its mtime,
+    inode or size changed (edited by hand or by another process). write()
+    updates the cache at once and saves atomically after WRITE_DELAY, so a
+    burst of writes becomes one save. The object read() returns is shared;
+    change it only to write it back, or use update().
+    """
+
+    def __init__(self, path, default=None, indent=2, write_delay=WRITE_DELAY):
+        self.path = path
+        self.default = default
+        self.indent = indent
+        self.write_delay = write_delay
+        self._lock = threading.RLock()
+        self._data = None
+        self._signature = None
+        self._loaded = False
+        self._pending = None  # threading.Timer of the scheduled save
+
+    def _fresh_default(self):
+        return copy.deepcopy(self.default)
+
+    def read(self):
+        with self._lock:
+            if self._pending is not None:
+                return self._data  # our unsaved write is newer than the file
+            signature = _signature(self.path)
+            if self._loaded and signature == self._signature:
+                return self._data
+            self._data = self._load()
+            self._signature = signature
+            self._loaded = True
+            return self._data
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+            if not text.strip():
+                return self._fresh_default()  # created empty, never written
+            data = json.loads(text)
+        except FileNotFoundError:
+            return self._fresh_default()
+        except ValueError as e:
+            print(f"[Datastore] {self.path} is corrupt ({e}); starting from the default.")
+            return self._fresh_default()
+        if self.default is not None and not isinstance(data, type(self.default)):
+            print(f"[Datastore] {self.path} has the wrong shape; starting from the default.")
+            return self._fresh_default()
+        return data
+
+    def write(self, data):
+        with self._lock:
+            self._data = data
+            self._loaded = True
+            if self.write_delay <= 0:
+                self._save()
+            elif self._pending is None:
+                self._pending = threading.Timer(self.write_delay, self.flush)
+                self._pending.daemon = True
+                self._pending.start()
+
+    def update(self, func):
+        """Apply func(data) -> new data (or None to keep the mutated object) and write it."""
+        with self._lock:
+            data = self.read()
+            result = func(data)
+            self.write(data if result is None else result)
+            return self._data
+
+    def flush(self):
+        """Save a pending write now."""
+        with self._lock:
+            if self._pending is None:
+                return
+            self._pending.cancel()
+            self._save()
+
+    def _save(self):
+        self._pending = None
+        try:
+            atomic_write_json(self.path, self._data, self.indent)
+            self._signature = _signature(self.path)
+        except Exception as e:
+            print(f"[Datastore Save Error] {self.path}: {e}")
+
+
+_files = {}
+_files_lock = threading.Lock()
+
+
+def json_file(path, default=None, **options):
+    """The shared JSONFile for path; every caller of the same file gets the same cache."""
+    key = os.path.abspath(path)
+    with _files_lock:
+        if key not in _files:
+            _files[key] = JSONFile(path, default, **options)
+        return _files[key]
+
+
+@atexit.register
+def flush_all():
+    for store in list(_files.values()):
+        store.flush()
@@ -0,0 +1,225 @@
+# core/events.py
+
+import os
+import json
+import time
+import asyncio
+import threading
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+
+EVENT_HOST = "127.0.0.1"
+EVENT_PORT = 8765
+HISTORY_SIZE = 200     # recent events replayed to a client reconnecting with Last-Event-ID
+CLIENT_BUFFER = 256    # events queued per client before its oldest are dropped
+KEEPALIVE = 15.0       # seconds of silence before a comment line keeps proxies from closing the stream
+# Pages allowed to read the stream: the web UI (webui/app.py on Flask's default
+# port) unless NEWT_WEBUI_ORIGINS lists others, comma-separated. Requests from
+# any other page are refused, since events carry what the user said.
+WEBUI_ORIGINS = tuple(o.strip().rstrip("/") for o in os.environ.get(
+    "NEWT_WEBUI_ORIGINS", "http://127.0.0.1:5000,http://localhost:5000").split(",") if o.strip())
+
+
+class EventBus:
+    """
+    In-process publish/subscribe for assistant events (command recognized,
+    intent chosen, speech, reminder fired, timer started or done...).
+
+    publish() never blocks on a subscriber: subscribers are plain callables
+    that must return at once, typically by handing the event to a queue.
+    """
+
+    def __init__(self, history=HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._history = deque(maxlen=history)
+        self._next_id = 1
+
+    def publish(self, kind, **data):
+        with self._lock:
+            event = {"id": self._next_id, "type": kind, "time": time.time(), **data}
+            self._next_id += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber(event)
+            except Exception as e:
+                print(f"[Event Subscriber Error] {e}")
+        return event
+
+    def subscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def since(self, last_id):
+        """Events after last_id that are still in the history."""
+        with self._lock:
+            return [e for e in self._history if e["id"] > last_id]
+
+
+bus = EventBus()
+
+
+def publish(kind, **data):
+    """Broadcast an event on the shared bus."""
+    return bus.publish(kind, **data)
+
+
+class _Client:
+    """One connected browser: a bounded queue that drops its oldest events when the client lags."""
+
+    def __init__(self, types, size):
+        self.types = types
+        self.queue = asyncio.Queue(size)
+        self.dropped = 0
+
+    def offer(self, event):
+        if self.types and event["type"] not in self.types:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class EventServer:
+    """
+    Server-Sent Events endpoint (GET /events) on its own asyncio loop and thread.
+
+    The bus hands each event to the loop with one call_soon_threadsafe; the
+    loop copies it into every client's bounded queue. A slow or stalled
+    browser only ever loses its own oldest events (reported to it as a
+    "dropped" event), so it can never hold up the voice loop or other clients.
+    Clients may filter with ?types=intent,speech and resume with Last-Event-ID.
+    Browsers may only connect from allowed_origins; the CORS header names
+    that one origin, never "*".
+    """
+
+    def __init__(self, bus=bus, host=EVENT_HOST, port=EVENT_PORT, buffer_size=CLIENT_BUFFER,
+                 allowed_origins=WEBUI_ORIGINS):
+        self.bus = bus
+        self.host = host
+        self.port = port
+        self.allowed_origins = set(allowed_origins)
+        self.buffer_size = buffer_size
+        self._clients = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="newt-events", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as e:
+            print(f"[Event Server Error] {e}")
+        finally:
+            self._ready.set()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.bus.subscribe(self._on_event)
+        self._ready.set()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self.bus.unsubscribe(self._on_event)
+
+    def _on_event(self, event):
+        # Called on the publishing thread; everything else happens on our loop
+        self._loop.call_soon_threadsafe(self._fan_out, event)
+
+    def _fan_out(self, event):
+        for client in self._clients:
+            client.offer(event)
+
+    async def _handle(self, reader, writer):
+        try:
+            request = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            url = urlsplit(request[1] if len(request) > 1 else "/")
+            if request[:1] != ["GET"] or url.path != "/events":
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                return
+            origin = headers.get("origin")
+            if origin is not None and origin.rstrip("/") not in self.allowed_origins:
+                writer.write(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                return
+            query = parse_qs(url.query)
+            types = {t for value in query.get("types", []) for t in value.split(",") if t}
+            last_id = headers.get("last-event-id") or (query.get("since") or ["0"])[0]
+            await self._stream(writer, types, int(last_id) if last_id.isdigit() else 0, origin)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(self, writer, types, last_id, origin=None):
+        cors = f"Access-Control-Allow-Origin: {origin}\r\nVary: Origin\r\n" if origin else ""
+        writer.write(("HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                      f"{cors}Connection: keep-alive\r\n\r\nretry: 2000\n\n").encode("latin-1"))
+        client = _Client(types, self.buffer_size)
+        self._clients.add(client)
+        try:
+            if last_id:
+                for event in self.bus.since(last_id):
+                    client.offer(event)
+            reported = 0
+            while True:
+                try:
+                    event = await asyncio.wait_for(client.queue.get(), KEEPALIVE)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                else:
+                    if client.dropped != reported:
+                        writer.write(_frame({"type": "dropped", "count": client.dropped - reported}))
+                        reported = client.dropped
+                    writer.write(_frame(event))
+                await writer.drain()
+        finally:
+            self._clients.discard(client)
+
+    @property
+    def clients(self):
+        return len(self._clients)
+
+    def stop(self):
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+
+def _frame(event):
+    head = f"id: {event['id']}\n" if "id" in event else ""
+    return f"{head}event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def start_event_server(host=EVENT_HOST, port=EVENT_PORT):
+    """Serve the shared bus at http://host:port/events. Returns the EventServer, or None if it could not bind."""
+    server = EventServer(bus, host, port).start()
+    if server._server is None:
+        return None
+    print(f"📡 Live events at http://{server.host}:{server.port}/events")
+    return server
@@ -0,0 +1,89 @@
+# core/fuzzy_intent.py
+
+import zlib
+import threading
+
+from core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+NGRAM = 3
+DIMENSIONS = 1024        # hashed n-gram feature space
+FUZZY_THRESHOLD = 0.6    # minimum cosine similarity to accept a fuzzy match
+
+
+def ngram_features(text, n=NGRAM):
+    """Hashed character n-grams of text, padded so word edges count."""
+    padded = f" {' '.join(text.lower().split())} "
+    return [zlib.crc32(padded[i:i + n].encode("utf-8")) % DIMENSIONS
+            for i in range(max(1, len(padded) - n + 1))]
+
+
+class FuzzyMatch:
+    """Best fuzzy candidate: the canonical command it stands for and how close it was."""
+
+    def __init__(self, phrase, command, source, score):
+        self.phrase = phrase      # the known trigger that was closest
+        self.command = command    # what to run instead of the unmatched text
+        self.source = source      # "intent", "alias", "custom" or "app"
+        self.score = score
+
+    def __repr__(self):
+        return f"FuzzyMatch({self.phrase!r} -> {self.command!r}, {self.source}, {self.score:.2f})"
+
+
+class FuzzyIntentIndex:
+    """
+    L2-normalised character n-gram vectors for every known trigger phrase,
+    stacked into one NumPy matrix, so an unmatched command is scored against
+    all of them with a single matrix-vector product. Rows are appended in
+    place (capacity doubles), so teaching a command is O(1) amortised.
+    """
+
+    def __init__(self, capacity=256):
+        self._matrix = np.zeros((capacity, DIMENSIONS), dtype=np.float32)
+        self._entries = []
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _vector(self, text):
+        vec = np.bincount(ngram_features(text), minlength=DIMENSIONS).astype(np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def add(self, phrase, command=None, source="intent"):
+        """Index a trigger phrase; command is what runs when it is the best match."""
+        phrase = phrase.lower().strip()
+        if not phrase:
+            return
+        with self._lock:
+            entry = (phrase, command or phrase, source)
+            if phrase in self._rows:
+                # Re-teaching a phrase replaces its target
+                self._entries[self._rows[phrase]] = entry
+                return
+            if len(self._entries) == self._matrix.shape[0]:
+                grown = np.zeros((self._matrix.shape[0] * 2, DIMENSIONS), dtype=np.float32)
+                grown[:len(self._entries)] = self._matrix[:len(self._entries)]
+                self._matrix = grown
+            row = len(self._entries)
+            self._matrix[row] = self._vector(phrase)
+            self._entries.append(entry)
+            self._rows[phrase] = row
+
+    def best(self, command, threshold=FUZZY_THRESHOLD):
+        """Return the closest FuzzyMatch at or above threshold, or None."""
+        if not self._entries or not command.strip():
+            return None
+        query = self._vector(command)
+        with self._lock:
+            scores = self._matrix[:len(self._entries)] @ query
+            row = int(np.argmax(scores))
+            score = float(scores[row])
+            phrase, target, source = self._entries[row]
+        if score < threshold:
+            return None
+        return FuzzyMatch(phrase, target, source, score)
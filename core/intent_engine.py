@@ -0,0 +1,225 @@
+# core/intent_engine.py
+
+import re
+import time
+from collections import deque
+
+from core.lazy import is_installed
+
+
+class Intent:
+    """A routable intent: its trigger phrases, optional regex guard and handler."""
+
+    def __init__(self, name, handler, phrases=(), prefixes=(), pattern=None, priority=0, order=0, requires=(),
+                 fuzzy=True):
+        self.name = name
+        self.handler = handler
+        self.phrases = tuple(p.lower() for p in phrases)
+        self.prefixes = tuple(p.lower() for p in prefixes)
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.priority = priority
+        self.order = order
+        self.requires = tuple(requires)
+        self.fuzzy = fuzzy
+        self.enabled = True
+        self.disabled_reason = ""
+
+    def __repr__(self):
+        return f"Intent({self.name!r})"
+
+
+class IntentMatch:
+    """Result of routing a command: which intent matched, on what trigger and where."""
+
+    def __init__(self, intent, command, trigger, kind, start, end, groups=None):
+        self.intent = intent
+        self.command = command
+        self.trigger = trigger
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.groups = groups or {}
+
+    @property
+    def name(self):
+        return self.intent.name
+
+    @property
+    def rest(self):
+        """Text following the matched trigger, stripped."""
+        return self.command[self.end:].strip()
+
+    @property
+    def reason(self):
+        why = f"{self.kind} '{self.trigger}' at {self.start}-{self.end}"
+        if self.groups:
+            why += f" with {self.groups}"
+        return why
+
+    def __repr__(self):
+        return f"IntentMatch({self.name!r}, {self.reason})"
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class IntentEngine:
+    """
+    Registration-based intent router.
+
+    Every trigger phrase of every intent is compiled into one Aho-Corasick
+    automaton, so a command is scanned once no matter how many intents exist.
+    When several triggers match, the longest one wins (so "delete memory"
+    beats "delete" and "start timer" beats "time"), then the higher
+    priority, then the earlier registration.
+    """
+
+    def __init__(self):
+        self.intents = {}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._compiled = False
+        self.compile_time = 0.0
+
+    # ========== Registration ==========
+
+    def register(self, name, handler, phrases=(), prefixes=(), pattern=None, priority=0, requires=(),
+                 fuzzy=True):
+        """
+        Register an intent.
+        :param phrases: trigger phrases matched anywhere on word boundaries.
+        :param prefixes: trigger phrases matched only at the start of the command.
+        :param pattern: optional regex that must also match; named groups become arguments.
+        :param priority: tie-breaker between triggers of the same length.
+        :param requires: importable modules the handler's backend needs.
+        :param fuzzy: whether a misheard command may be guessed into this intent.
+        """
+        if not phrases and not prefixes:
+            raise ValueError(f"Intent '{name}' needs at least one trigger phrase.")
+        self.intents[name] = Intent(name, handler, phrases, prefixes, pattern, priority,
+                                    len(self.intents), requires, fuzzy)
+        self._compiled = False
+        return self.intents[name]
+
+    def intent(self, name, **triggers):
+        """Decorator form of register()."""
+        def decorator(func):
+            self.register(name, func, **triggers)
+            return func
+        return decorator
+
+    def disable(self, name, reason=""):
+        """Keep the intent routable, but refuse to run its handler."""
+        if name in self.intents:
+            self.intents[name].enabled = False
+            self.intents[name].disabled_reason = reason
+
+    def enable(self, name):
+        if name in self.intents:
+            self.intents[name].enabled = True
+            self.intents[name].disabled_reason = ""
+
+    def check_requirements(self):
+        """
+        Disable every intent whose backend modules are not installed.
+        Only locates the modules, so nothing heavy is imported.
+        Returns {intent name: [missing modules]}.
+        """
+        missing = {}
+        for intent in self.intents.values():
+            absent = [m for m in intent.requires if not is_installed(m)]
+            if absent:
+                missing[intent.name] = absent
+                self.disable(intent.name, f"missing {', '.join(absent)}")
+        return missing
+
+    # ========== Compilation ==========
+
+    def compile(self):
+        """Build the Aho-Corasick automaton over every trigger phrase."""
+        started = time.perf_counter()
+        goto, out = [{}], [[]]
+
+        for intent in self.intents.values():
+            for kind, triggers in (("phrase", intent.phrases), ("prefix", intent.prefixes)):
+                for trigger in triggers:
+                    state = 0
+                    for ch in trigger:
+                        nxt = goto[state].get(ch)
+                        if nxt is None:
+                            nxt = len(goto)
+                            goto[state][ch] = nxt
+                            goto.append({})
+                            out.append([])
+                        state = nxt
+                    out[state].append((trigger, kind, intent))
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto, self._fail, self._out = goto, fail, out
+        self._compiled = True
+        self.compile_time = time.perf_counter() - started
+
+    # ========== Matching ==========
+
+    def candidates(self, command):
+        """All trigger hits in the command, in a single pass, best first."""
+        if not self._compiled:
+            self.compile()
+
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = []
+        state = 0
+        length = len(command)
+        for i, ch in enumerate(command):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for trigger, kind, intent in out[state]:
+                start = i - len(trigger) + 1
+                end = i + 1
+                if kind == "prefix" and start != 0:
+                    continue
+                if _is_word_char(trigger[0]) and start > 0 and _is_word_char(command[start - 1]):
+                    continue
+                if _is_word_char(trigger[-1]) and end < length and _is_word_char(command[end]):
+                    continue
+                hits.append((trigger, kind, intent, start, end))
+
+        hits.sort(key=lambda h: (-len(h[0]), -h[2].priority, h[2].order, h[3]))
+        return hits
+
+    def match(self, command):
+        """
+        Return the best IntentMatch for the command, or None.
+        Disabled intents still match, so callers can say the feature is unavailable
+        instead of misrouting the command to a weaker intent.
+        """
+        for trigger, kind, intent, start, end in self.candidates(command):
+            groups = {}
+            if intent.pattern is not None:
+                m = intent.pattern.search(command)
+                if not m:
+                    continue
+                groups = {k: v for k, v in m.groupdict().items() if v is not None}
+            return IntentMatch(intent, command, trigger, kind, start, end, groups)
+        return None
+
+    def dispatch(self, command):
+        """Route the command and run the winning handler. Returns the match or None."""
+        match = self.match(command)
+        if match and match.intent.enabled:
+            match.intent.handler(command, match)
+        return match
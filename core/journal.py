@@ -0,0 +1,77 @@
+# core/journal.py
+
+import os
+import json
+import threading
+
+from core.datastore import atomic_write_json
+
+
+class Journal:
+    """
+    Append-only JSON-lines log next to a JSON snapshot, for state that lives
+    in memory and changes a little at a time (reminders, timers).
+
+    Each change costs one appended line instead of rewriting the file;
+    compact() folds the log into the snapshot once it has grown. Loading
+    returns the snapshot plus the operations logged since, to be replayed
+    by the owner. A torn last line (crash mid-write) is ignored.
+    """
+
+    def __init__(self, path, snapshot_path, default=None, fsync=True):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.default = default
+        self.fsync = fsync
+        self.ops = 0  # lines appended since the last compaction
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def load(self):
+        """(snapshot, [op, ...]) as currently on disk."""
+        snapshot = self.default
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                text = f.read()
+            if text.strip():
+                snapshot = json.loads(text)
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            print(f"[Journal] {self.snapshot_path} is corrupt ({e}); starting from the log alone.")
+        ops = []
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        ops.append(json.loads(line))
+                    except ValueError:
+                        print(f"[Journal] skipping a corrupt line in {self.path}")
+        except FileNotFoundError:
+            pass
+        self.ops = len(ops)
+        return snapshot, ops
+
+    def append(self, *ops):
+        """Log operations with one write (and one fsync)."""
+        data = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops).encode("utf-8")
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.ops += len(ops)
+
+    def compact(self, state, indent=None):
+        """Replace the snapshot with state and start an empty log."""
+        with self._lock:
+            atomic_write_json(self.snapshot_path, state, indent)
+            tmp = f"{self.path}.tmp"
+            open(tmp, "wb").close()
+            os.replace(tmp, self.path)
+            self.ops = 0
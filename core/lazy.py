@@ -0,0 +1,120 @@
+# core/lazy.py
+
+import re
+import sys
+import time
+import importlib
+import importlib.util
+import subprocess
+
+# module name -> seconds spent importing it on first use
+LOAD_TIMES = {}
+_registry = {}
+
+
+class BackendUnavailable(ImportError):
+    """Raised when a lazily imported backend turns out to be missing or broken."""
+
+    def __init__(self, module_name, cause):
+        super().__init__(f"{module_name} is unavailable: {cause}")
+        self.module_name = module_name
+        self.cause = cause
+
+
+class LazyModule:
+    """Stand-in for a module that is only imported the first time an attribute is used."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._error = None
+
+    def _load(self):
+        if self._module is not None:
+            return self._module
+        if self._error is not None:
+            raise BackendUnavailable(self._name, self._error)
+        started = time.perf_counter()
+        try:
+            self._module = importlib.import_module(self._name)
+        except Exception as e:
+            self._error = e
+            print(f"[Lazy Import Error] {self._name}: {e}")
+            raise BackendUnavailable(self._name, e) from e
+        finally:
+            LOAD_TIMES[self._name] = time.perf_counter() - started
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def available(self):
+        """Import now if needed; True if the module could be loaded."""
+        try:
+            self._load()
+            return True
+        except BackendUnavailable:
+            return False
+
+    def __repr__(self):
+        state = "loaded" if self._module else ("failed" if self._error else "pending")
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy_import(name):
+    """Return a shared LazyModule proxy for the given dotted module name."""
+    if name not in _registry:
+        _registry[name] = LazyModule(name)
+    return _registry[name]
+
+
+def is_installed(name):
+    """Cheap availability probe: locate the module without executing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def warm_all():
+    """Import every installed lazy module now (for long-running processes). Returns how many loaded."""
+    loaded = 0
+    for name, proxy in list(_registry.items()):
+        if proxy._module is None and proxy._error is None and is_installed(name.split(".")[0]):
+            loaded += proxy.available()
+    return loaded
+
+
+def lazy_status():
+    """(name, state, seconds) for every lazy proxy created so far."""
+    rows = []
+    for name, proxy in sorted(_registry.items()):
+        state = "loaded" if proxy._module else ("failed" if proxy._error else "pending")
+        rows.append((name, state, LOAD_TIMES.get(name)))
+    return rows
+
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_time_report(module="main", top=15):
+    """
+    Import a module in a fresh interpreter under -X importtime and
+    return the slowest imports as (cumulative_us, self_us, depth, name).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_LINE.match(line)
+        if m:
+            self_us, cumulative_us, indent, name = m.groups()
+            rows.append((int(cumulative_us), int(self_us), len(indent) // 2, name))
+    rows.sort(reverse=True)
+    return rows[:top], proc.returncode
@@ -0,0 +1,253 @@
+# core/memory_dedupe.py
+
+import re
+import zlib
+import random
+import threading
+
+from core.memory_store import get_store
+from core.lazy import lazy_import, is_installed
+
+np = lazy_import("numpy")
+
+NUM_PERM = 64
+BANDS = 16                 # 16 bands of 4 rows: pairs above ~0.5 Jaccard become candidates
+ROWS = NUM_PERM // BANDS
+SIMILAR_THRESHOLD = 0.5    # related memory: both are kept and the similarity is reported
+DUPLICATE_THRESHOLD = 0.9  # same fact again (exact Jaccard of normalized text): not stored twice
+_PRIME = (1 << 31) - 1
+_rng = random.Random(1)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+BATCH_DOCS = 4096          # documents hashed per NumPy step when indexing in bulk
+
+
+def shingles(text):
+    """Word unigrams and bigrams, hashed to 32 bits."""
+    words = re.findall(r"\w+", text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return {zlib.crc32(g.encode("utf-8")) for g in grams}
+
+
+def normalize(text):
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def jaccard(text_a, text_b):
+    """Exact Jaccard similarity of two texts' shingles."""
+    a, b = shingles(text_a), shingles(text_b)
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def is_duplicate(text_a, text_b, threshold=DUPLICATE_THRESHOLD):
+    """
+    The same fact again, checked exactly rather than by the MinHash estimate:
+    "my wifi password is hunter2" and "... is swordfish" share most words but
+    are different facts.
+    """
+    return normalize(text_a) == normalize(text_b) or jaccard(text_a, text_b) >= threshold
+
+
+def signature(text):
+    """MinHash signature: the minimum of each of NUM_PERM universal hashes over the shingles."""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    rows = [[(a * h + b) % _PRIME for a, b in _PERMS] for h in hashes]
+    return tuple(map(min, zip(*rows)))
+
+
+def batch_signatures(texts):
+    """
+    signature() for many texts at once. With NumPy every permutation is
+    applied to a whole batch of shingles in one step (a * h + b stays below
+    2**63, so the results match signature() exactly).
+    """
+    if not is_installed("numpy"):
+        return [signature(text) for text in texts]
+    a = np.array([p[0] for p in _PERMS], dtype=np.uint64)[:, None]
+    b = np.array([p[1] for p in _PERMS], dtype=np.uint64)[:, None]
+    results = []
+    for start in range(0, len(texts), BATCH_DOCS):
+        sets = [shingles(text) for text in texts[start:start + BATCH_DOCS]]
+        sizes = [len(s) for s in sets]
+        flat = np.fromiter((h for s in sets for h in s), dtype=np.uint64, count=sum(sizes))
+        if not len(flat):
+            results.extend(None for _ in sets)
+            continue
+        hashed = (a * flat[None, :] + b) % np.uint64(_PRIME)
+        offsets = np.cumsum([0] + sizes[:-1])
+        nonempty = [i for i, n in enumerate(sizes) if n]
+        mins = np.minimum.reduceat(hashed, offsets[nonempty], axis=1)
+        columns = iter(mins.T.tolist())
+        results.extend(tuple(next(columns)) if n else None for n in sizes)
+    return results
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+
+class DedupeIndex:
+    """
+    MinHash LSH over every stored memory. A new memory is hashed once and
+    only compared with the few memories sharing one of its band buckets,
+    so a check costs the same at a hundred entries or a hundred thousand.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signatures = {}
+        self._buckets = {}
+
+    def _bands(self, sig):
+        return [(band, sig[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+    def _add(self, record_id, text, sig=None):
+        self._remove(record_id)
+        sig = sig or signature(text)
+        if sig is None:
+            return
+        self._signatures[record_id] = sig
+        for key in self._bands(sig):
+            self._buckets.setdefault(key, set()).add(record_id)
+
+    def _remove(self, record_id):
+        sig = self._signatures.pop(record_id, None)
+        if sig is None:
+            return
+        for key in self._bands(sig):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(record_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def __call__(self, op):
+        """MemoryStore listener."""
+        kind = op.get("op")
+        with self._lock:
+            if kind in ("add", "update"):
+                self._add(op["record"]["id"], op["record"]["text"])
+            elif kind == "add_many":
+                records = op["records"]
+                for record, sig in zip(records, batch_signatures([r["text"] for r in records])):
+                    self._add(record["id"], record["text"], sig)
+            elif kind == "delete":
+                self._remove(op["id"])
+            elif kind == "delete_many":
+                for record_id in op["ids"]:
+                    self._remove(record_id)
+            elif kind in ("clear", "reset"):
+                self._signatures, self._buckets = {}, {}
+                records = op.get("records", ())
+                for record, sig in zip(records, batch_signatures([r["text"] for r in records])):
+                    self._add(record["id"], record["text"], sig)
+
+    def candidates(self, sig):
+        ids = set()
+        for key in self._bands(sig):
+            ids |= self._buckets.get(key, set())
+        return ids
+
+    def find(self, text, threshold=SIMILAR_THRESHOLD):
+        """(record id, similarity) of the closest stored memory at or above threshold, or None."""
+        sig = signature(text)
+        if sig is None:
+            return None
+        with self._lock:
+            scored = [(similarity(sig, self._signatures[i]), i) for i in self.candidates(sig)]
+        best = max(scored, default=None)
+        if best is None or best[0] < threshold:
+            return None
+        return best[1], best[0]
+
+    def groups(self, threshold=SIMILAR_THRESHOLD):
+        """Clusters of record ids that are near-duplicates of each other (single link)."""
+        with self._lock:
+            parent = {}
+
+            def root(i):
+                while parent.get(i, i) != i:
+                    i = parent[i]
+                return i
+
+            for bucket in self._buckets.values():
+                if len(bucket) < 2:
+                    continue
+                members = sorted(bucket)
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        if root(a) != root(b) and similarity(self._signatures[a], self._signatures[b]) >= threshold:
+                            parent[root(b)] = root(a)
+            clusters = {}
+            for record_id in parent:
+                clusters.setdefault(root(record_id), set()).add(record_id)
+        return [sorted(c | {r}) for r, c in clusters.items()]
+
+
+def add_or_merge(text, source="voice", pinned=False, expires=None):
+    """
+    Store a memory unless it is already known. Returns (outcome, record):
+    "duplicate" with the existing record when the same fact is stored
+    already, "similar" with the closest existing record when the new memory
+    was added next to a related one, or "added" with the new record.
+    Existing memories are never rewritten. Pinning or an expiry asked for
+    again on a duplicate is applied to the existing record.
+    """
+    store = get_store()
+    found = get_dedupe_index().find(text)
+    existing = store.get(found[0]) if found is not None else None
+    if existing is not None and is_duplicate(existing["text"], text):
+        if pinned or expires:
+            store.set_retention(existing["id"], pinned=pinned or existing.get("pinned", False), expires=expires)
+        return "duplicate", store.get(existing["id"])
+    record = store.add(text, source=source, pinned=pinned, expires=expires)
+    if existing is not None:
+        return "similar", existing
+    return "added", record
+
+
+def dedupe(threshold=DUPLICATE_THRESHOLD, confirm=False):
+    """
+    Bulk pass over existing memories. Returns the groups of duplicates
+    (ids, oldest first), each checked exactly against its newest entry;
+    only with confirm=True are all but the newest of each group deleted.
+    Pinned memories are never deleted.
+    """
+    store = get_store()
+    groups = []
+    for group in get_dedupe_index().groups(threshold):
+        records = [r for r in map(store.get, group) if r is not None]
+        if len(records) < 2:
+            continue
+        newest = records[-1]  # ids grow with time
+        same = [r["id"] for r in records[:-1]
+                if not r.get("pinned") and is_duplicate(r["text"], newest["text"], threshold)]
+        if same:
+            groups.append(same + [newest["id"]])
+    if confirm:
+        store.delete_many([record_id for group in groups for record_id in group[:-1]])
+    return groups
+
+
+def similar_groups(threshold=SIMILAR_THRESHOLD):
+    """Groups of related memories (above threshold, below duplicate), for review; nothing is changed."""
+    duplicates = {record_id for group in dedupe() for record_id in group}
+    return [g for g in get_dedupe_index().groups(threshold) if not set(g) <= duplicates]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_dedupe_index():
+    """The DedupeIndex of the shared store, built on first use."""
+    global _index
+    store = get_store()
+    with _index_lock:
+        if _index is None:
+            _index = DedupeIndex()
+            store.add_listener(_index)
+    store.refresh()
+    return _index
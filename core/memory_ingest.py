@@ -0,0 +1,178 @@
+# core/memory_ingest.py
+
+import io
+import os
+import re
+import sys
+import json
+import time
+from datetime import datetime
+
+from core.memory_store import get_store, TIMESTAMP_FORMAT
+from core.memory_search import get_index
+from core.memory_vectors import get_vector_index
+
+BATCH_SIZE = 1000         # memories per journal line / index transaction
+MAX_PARAGRAPH = 4000      # characters; longer Markdown paragraphs are cut into several memories
+FORMATS = ("jsonl", "text", "markdown")
+_EXTENSIONS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl", ".md": "markdown",
+               ".markdown": "markdown", ".txt": "text"}
+_BULLET_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(?:\[[ xX]\]\s+)?")
+_RULE_RE = re.compile(r"^[-*_](?:\s*[-*_]){2,}$")
+
+
+def guess_format(name):
+    return _EXTENSIONS.get(os.path.splitext(name or "")[1].lower(), "text")
+
+
+def _timestamp(value):
+    """Accept the record schema or isoformat (as memory.jsonl used); anything else means now."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, TIMESTAMP_FORMAT).strftime(TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(value).strftime(TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def read_jsonl(lines):
+    """{"text"|"input", "timestamp", "source", "pinned", "expires"} objects, or bare JSON strings."""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError as e:
+            print(f"[Ingest] line {number}: {e}", file=sys.stderr)
+            continue
+        if isinstance(entry, str):
+            entry = {"text": entry}
+        if not isinstance(entry, dict):
+            continue
+        yield {"text": entry.get("text") or entry.get("input"), "timestamp": _timestamp(entry.get("timestamp")),
+               "source": entry.get("source"), "pinned": entry.get("pinned"), "expires": entry.get("expires")}
+
+
+def read_text(lines):
+    """One memory per non-empty line."""
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield {"text": line}
+
+
+def read_markdown(lines):
+    """
+    One memory per list item or paragraph. Headings, code blocks and rules
+    are skipped; only the current paragraph is ever held in memory.
+    """
+    paragraph, fenced = [], False
+
+    def flush():
+        text = " ".join(paragraph)
+        paragraph.clear()
+        for start in range(0, len(text), MAX_PARAGRAPH):
+            yield {"text": text[start:start + MAX_PARAGRAPH]}
+
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith(("```", "~~~")):
+            fenced = not fenced
+            yield from flush()
+            continue
+        if fenced:
+            continue
+        if not stripped or stripped.startswith("#") or _RULE_RE.match(stripped):
+            yield from flush()
+            continue
+        bullet = _BULLET_RE.match(line)
+        if bullet:
+            yield from flush()
+            stripped = line[bullet.end():].strip()
+        paragraph.append(stripped.lstrip("> "))
+    yield from flush()
+
+
+READERS = {"jsonl": read_jsonl, "text": read_text, "markdown": read_markdown}
+
+
+def _batches(entries, size):
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Counted:
+    """Iterate lines of a stream while counting the bytes read."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.bytes = 0
+
+    def __iter__(self):
+        for line in self.lines:
+            self.bytes += len(line.encode("utf-8"))
+            yield line
+
+
+def ingest(stream, fmt="text", source="import", batch_size=BATCH_SIZE, progress=None, store=None):
+    """
+    Stream memories from a text stream (or iterable of lines) into the store.
+
+    Input is read line by line and written BATCH_SIZE memories at a time:
+    each batch is one journal line with one fsync, one SQLite transaction
+    and one vector/MinHash bulk update, so memory use depends on the batch
+    size rather than on the input. Returns {"memories", "batches", "bytes",
+    "seconds", "rate"}; progress(report) is called after every batch.
+
+    Pass store to write to another process's MemoryStore (the web UI); its
+    indexes then catch up from the journal, still one batch at a time.
+    """
+    if store is None:
+        store = get_store()
+        # Attach the indexes first so they are fed each batch instead of rebuilding later
+        get_index()
+        get_vector_index()
+    counted = _Counted(stream)
+    report = {"memories": 0, "batches": 0, "bytes": 0, "seconds": 0.0, "rate": 0.0}
+    started = time.perf_counter()
+
+    def measure():
+        elapsed = time.perf_counter() - started
+        report.update(bytes=counted.bytes, seconds=elapsed, rate=report["memories"] / elapsed if elapsed else 0.0)
+
+    for batch in _batches(READERS[fmt](counted), batch_size):
+        for entry in batch:
+            entry["source"] = entry.get("source") or source
+        report["memories"] += len(store.add_many(batch))
+        report["batches"] += 1
+        if progress is not None:
+            measure()
+            progress(report)
+    measure()
+    return report
+
+
+def ingest_file(path, fmt=None, source="import", batch_size=BATCH_SIZE, progress=None):
+    """ingest() a file path, or stdin for "-". The format is guessed from the extension."""
+    fmt = fmt or guess_format(path)
+    if path == "-":
+        return ingest(io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", errors="replace"),
+                      fmt, source, batch_size, progress)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return ingest(f, fmt, source, batch_size, progress)
+
+
+def format_report(report):
+    return (f"🧠 Ingested {report['memories']} memories in {report['batches']} batches, "
+            f"{report['bytes'] / 1e6:.1f} MB in {report['seconds']:.2f}s ({report['rate']:.0f}/s)")
@@ -0,0 +1,227 @@
+# core/memory_search.py
+
+import os
+import re
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from core.memory_store import get_store, TIMESTAMP_FORMAT
+
+INDEX_FILE = "memory.db"
+TOP_K = 3
+PAGE_SIZE = 5
+STOPWORDS = {"a", "an", "the", "my", "i", "me", "about", "of", "to", "and", "or", "is", "was",
+             "that", "what", "do", "you", "anything", "something"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memories (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS memories_timestamp ON memories(timestamp);
+CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts USING fts5(
+    text, content='memories', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS memories_ai AFTER INSERT ON memories BEGIN
+    INSERT INTO memories_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS memories_ad AFTER DELETE ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS memories_au AFTER UPDATE ON memories BEGIN
+    INSERT INTO memories_fts(memories_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO memories_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+
+def fts_query(text):
+    """Turn free speech into an FTS5 query: any remaining word, as a prefix, ranked by bm25."""
+    words = [w for w in re.findall(r"\w+", text.lower()) if w not in STOPWORDS]
+    return " OR ".join(f'"{w}"*' for w in words)
+
+
+PERIOD_RE = re.compile(r"\b(?:(?:in the |during the )?(?:last|past) (\d+) (day|week|month)s?|yesterday|today"
+                       r"|(?:this|last) (?:week|month))\b")
+
+
+def parse_date_range(text, now=None):
+    """
+    (start, end) timestamps for a spoken period such as "yesterday",
+    "last week" or "in the last 3 days"; None if the text names no period.
+    """
+    m = PERIOD_RE.search(text.lower())
+    if not m:
+        return None
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    this_week = today - timedelta(days=today.weekday())
+    this_month = today.replace(day=1)
+    period = m.group(0)
+    if m.group(1):
+        days = int(m.group(1)) * {"day": 1, "week": 7, "month": 30}[m.group(2)]
+        start, end = now - timedelta(days=days), now
+    elif period == "yesterday":
+        start, end = today - timedelta(days=1), today
+    elif period == "today":
+        start, end = today, now
+    elif period == "this week":
+        start, end = this_week, now
+    elif period == "last week":
+        start, end = this_week - timedelta(days=7), this_week
+    elif period == "this month":
+        start, end = this_month, now
+    else:
+        start, end = (this_month - timedelta(days=1)).replace(day=1), this_month
+    # end is exclusive; "now" has to include memories stored this second
+    if end is now:
+        end += timedelta(seconds=1)
+    return start.strftime(TIMESTAMP_FORMAT), end.strftime(TIMESTAMP_FORMAT)
+
+
+def strip_period(text):
+    """The text without its period phrase, leaving only what to search for."""
+    return " ".join(PERIOD_RE.sub(" ", text.lower()).split())
+
+
+def _row(record):
+    return record["id"], record["text"], record["timestamp"], record.get("source")
+
+
+def _fingerprint(rows):
+    """Hash of (id, text, timestamp, source) rows in id order."""
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        digest.update(repr(tuple(row)).encode())
+    return digest.digest()
+
+
+class MemoryIndex:
+    """
+    SQLite mirror of the memory store with an FTS5 full-text index.
+
+    The journal stays the source of truth; this database is kept in step
+    through a store listener and can always be rebuilt from it, so it runs
+    without fsync. On start-up it is only rebuilt if a hash of its rows
+    differs from the same hash of the store's records, so edited text
+    is caught as well as added and deleted memories.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.executescript(SCHEMA)
+
+    # ========== Sync ==========
+
+    def __call__(self, op):
+        """MemoryStore listener."""
+        kind = op.get("op")
+        with self._lock, self._db:
+            if kind == "add":
+                self._insert([op["record"]])
+            elif kind == "add_many":
+                self._insert(op["records"])
+            elif kind == "update":
+                self._insert([op["record"]])
+            elif kind == "delete":
+                self._db.execute("DELETE FROM memories WHERE id = ?", (op["id"],))
+            elif kind == "delete_many":
+                self._db.executemany("DELETE FROM memories WHERE id = ?", [(i,) for i in op["ids"]])
+            elif kind == "clear":
+                self._clear()
+            elif kind == "reset":
+                self._sync(op["records"])
+
+    def _insert(self, records):
+        # An upsert, not INSERT OR REPLACE: REPLACE deletes without firing
+        # memories_ad, leaving the old text in the FTS index; the update
+        # trigger removes it first
+        self._db.executemany(
+            "INSERT INTO memories (id, text, timestamp, source) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET text = excluded.text, "
+            "timestamp = excluded.timestamp, source = excluded.source",
+            [_row(r) for r in records])
+
+    def _clear(self):
+        self._db.execute("DELETE FROM memories")
+        self._db.execute("INSERT INTO memories_fts(memories_fts) VALUES ('delete-all')")
+
+    def _sync(self, records):
+        expected = _fingerprint(sorted(map(_row, records)))
+        actual = _fingerprint(self._db.execute(
+            "SELECT id, text, timestamp, source FROM memories ORDER BY id"))
+        if actual != expected:
+            self._clear()
+            self._insert(records)
+
+    # ========== Queries ==========
+
+    def _range_clause(self, start, end, column="timestamp"):
+        clauses, params = [], []
+        if start:
+            clauses.append(f"{column} >= ?")
+            params.append(start)
+        if end:
+            clauses.append(f"{column} < ?")
+            params.append(end)
+        return clauses, params
+
+    def search(self, text, limit=TOP_K, offset=0, start=None, end=None):
+        """Best full-text matches for text, best first."""
+        query = fts_query(text)
+        if not query:
+            return []
+        clauses, params = self._range_clause(start, end, "m.timestamp")
+        where = "".join(f" AND {c}" for c in clauses)
+        sql = ("SELECT m.id, m.text, m.timestamp, m.source FROM memories_fts f "
+               "JOIN memories m ON m.id = f.rowid "
+               f"WHERE memories_fts MATCH ?{where} ORDER BY bm25(memories_fts) LIMIT ? OFFSET ?")
+        with self._lock:
+            rows = self._db.execute(sql, [query, *params, limit, offset]).fetchall()
+        return [dict(row) for row in rows]
+
+    def page(self, offset=0, limit=PAGE_SIZE, start=None, end=None, newest_first=True):
+        """One page of memories in time order, optionally within [start, end)."""
+        clauses, params = self._range_clause(start, end)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "DESC" if newest_first else "ASC"
+        sql = (f"SELECT id, text, timestamp, source FROM memories{where} "
+               f"ORDER BY timestamp {order}, id {order} LIMIT ? OFFSET ?")
+        with self._lock:
+            rows = self._db.execute(sql, [*params, limit, offset]).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, start=None, end=None):
+        clauses, params = self._range_clause(start, end)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            return self._db.execute(f"SELECT count(*) FROM memories{where}", params).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """The MemoryIndex next to the shared store, attached on first use and caught up on every call."""
+    global _index
+    store = get_store()
+    with _index_lock:
+        if _index is None:
+            _index = MemoryIndex(os.path.join(store.data_dir, INDEX_FILE))
+            store.add_listener(_index)
+    store.refresh()
+    return _index
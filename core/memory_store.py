@@ -0,0 +1,508 @@
+# core/memory_store.py
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from core.datastore import FileLock, atomic_write_json, json_file
+
+DATA_DIR = "data"
+JOURNAL_FILE = "memory.log"             # append-only, one JSON operation per line
+SNAPSHOT_FILE = "memory.snapshot.json"  # compacted state the journal is replayed onto
+LOCK_FILE = "memory.lock"               # held by whichever process is writing
+LEGACY_FILE = "memory.json"              # migrated once, when no store exists yet
+LEGACY_LOGS = ("memory.jsonl", "memories.jsonl")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+CONFIG_FILE = "config.json"             # optional "memory_retention" settings
+COMPACT_AFTER = 500       # journal operations before a background compaction
+COMPACT_INTERVAL = 30.0   # seconds between maintenance checks
+IDLE_SECONDS = 60.0       # maintenance only runs after the store has been untouched this long
+
+
+def _now():
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+def make_record(record_id, text, timestamp=None, source="voice", pinned=False, expires=None, recalled=None):
+    """The one memory record schema shared by the assistant and the web UI."""
+    return {"id": record_id, "text": text, "timestamp": timestamp or _now(), "source": source,
+            "pinned": pinned, "expires": expires, "recalled": recalled}
+
+
+def record_bytes(record):
+    return len(record["text"].encode("utf-8"))
+
+
+class RetentionPolicy:
+    """
+    How long memories are kept, from "memory_retention" in data/config.json:
+    {"ttl_days": 90, "max_entries": 5000, "max_bytes": 1000000, "idle_seconds": 60}.
+    Any limit may be null. Pinned memories are never removed.
+    """
+
+    def __init__(self, ttl_days=None, max_entries=None, max_bytes=None, idle_seconds=IDLE_SECONDS):
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+
+    @classmethod
+    def load(cls, data_dir=DATA_DIR):
+        settings = json_file(os.path.join(data_dir, CONFIG_FILE), default={}).read().get("memory_retention") or {}
+        return cls(settings.get("ttl_days"), settings.get("max_entries"), settings.get("max_bytes"),
+                   settings.get("idle_seconds", IDLE_SECONDS))
+
+    def cutoff(self, now):
+        """Timestamp before which unpinned memories are past ttl_days, or None."""
+        if self.ttl_days is None:
+            return None
+        return (datetime.strptime(now, TIMESTAMP_FORMAT) - timedelta(days=self.ttl_days)).strftime(TIMESTAMP_FORMAT)
+
+    def select(self, records, now=None):
+        """Ids to remove: expired ones, then the least recently recalled until under the caps."""
+        now = now or _now()
+        cutoff = self.cutoff(now)
+
+        def expired(record):
+            if record.get("pinned"):
+                return False
+            if record.get("expires") and record["expires"] <= now:
+                return True
+            return cutoff is not None and record["timestamp"] < cutoff
+
+        doomed = [r["id"] for r in records if expired(r)]
+        gone = set(doomed)
+        kept = [r for r in records if r["id"] not in gone]
+        count, size = len(kept), sum(record_bytes(r) for r in kept)
+
+        def over():
+            return ((self.max_entries is not None and count > self.max_entries) or
+                    (self.max_bytes is not None and size > self.max_bytes))
+
+        if over():
+            # A memory never recalled counts as last recalled when it was stored
+            for record in sorted((r for r in kept if not r.get("pinned")),
+                                 key=lambda r: (r.get("recalled") or r["timestamp"], r["id"])):
+                if not over():
+                    break
+                doomed.append(record["id"])
+                count, size = count - 1, size - record_bytes(record)
+        return doomed
+
+
+class MemoryStore:
+    """
+    Log-structured memory store.
+
+    Every change is one line appended to the journal, so writing costs the
+    same however many memories exist. Records live in an in-memory index
+    loaded once; while the assistant is idle a background thread applies
+    the RetentionPolicy and folds the journal into a snapshot. Other processes (the web UI) share the same files: a
+    cheap stat before each read picks up lines they appended, and every
+    write holds a lock on memory.lock from that catch-up until its line is
+    appended, so ids are never handed out twice and compaction never swaps
+    the journal under a writer.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, compact_after=COMPACT_AFTER, background=True):
+        self.data_dir = data_dir
+        self.journal_path = os.path.join(data_dir, JOURNAL_FILE)
+        self.snapshot_path = os.path.join(data_dir, SNAPSHOT_FILE)
+        self._file_lock = FileLock(os.path.join(data_dir, LOCK_FILE))
+        self.compact_after = compact_after
+        self.background = background
+        self._lock = threading.RLock()
+        self._records = {}
+        self._next_id = 1
+        self._journal_ops = 0
+        self._offset = 0           # journal bytes already applied
+        self._journal_id = None    # (inode, device) of the journal we replayed
+        self._snapshot_mtime = None
+        self._compactor = None
+        self._stop = threading.Event()
+        self._listeners = []
+        self._last_access = time.monotonic()
+        self.last_maintenance = None  # {"evicted", "reclaimed", "at"} of the latest run
+        self.version = 0              # bumped on every change, for caches built on the store
+        self.changed_at = None        # wall-clock time of the latest change
+        os.makedirs(data_dir, exist_ok=True)
+        with self._lock, self._file_lock:
+            self._load()  # one process migrates the legacy files, not two
+        if background:
+            self._ensure_compactor()
+
+    # ========== Loading ==========
+
+    def _load(self):
+        with self._lock:
+            self._records, self._next_id, self._journal_ops, self._offset = {}, 1, 0, 0
+            fresh = not os.path.exists(self.snapshot_path) and not os.path.exists(self.journal_path)
+            try:
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                for record in snapshot.get("records", []):
+                    self._records[record["id"]] = record
+                self._next_id = snapshot.get("next_id", 1)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"[Memory Snapshot Error] {e}")
+            self._snapshot_mtime = self._mtime(self.snapshot_path)
+            if not os.path.exists(self.journal_path):
+                open(self.journal_path, "a", encoding="utf-8").close()
+            self._replay()
+            if fresh:
+                self._migrate()
+            self._notify({"op": "reset", "records": list(self._records.values())})
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _replay(self):
+        """Apply journal lines past the current offset."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                st = os.fstat(f.fileno())
+                self._journal_id = (st.st_ino, st.st_dev)
+                f.seek(self._offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # a write in progress; pick it up next time
+                    self._offset += len(line)
+                    try:
+                        self._apply(json.loads(line))
+                        self._journal_ops += 1
+                    except ValueError:
+                        print("[Memory Journal] skipping a corrupt line")
+        except FileNotFoundError:
+            self._journal_id = None
+
+    def add_listener(self, listener):
+        """
+        Call listener(op) after every change, including ones replayed from
+        another process. It is called at once with a "reset" op carrying
+        every record, and again whenever the store reloads from disk.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            listener({"op": "reset", "records": list(self._records.values())})
+
+    def _notify(self, op):
+        self.version += 1
+        if op.get("op") == "reset":
+            mtimes = [self._mtime(p) or 0 for p in (self.journal_path, self.snapshot_path)]
+            self.changed_at = max(mtimes) / 1e9
+        else:
+            self.changed_at = time.time()
+        for listener in self._listeners:
+            try:
+                listener(op)
+            except Exception as e:
+                print(f"[Memory Listener Error] {e}")
+
+    def _apply(self, op):
+        self._apply_op(op)
+        self._notify(op)
+
+    def _apply_op(self, op):
+        kind = op.get("op")
+        if kind in ("add", "update"):  # "update" lines are no longer written, only replayed
+            record = op["record"]
+            self._records[record["id"]] = record
+            self._next_id = max(self._next_id, record["id"] + 1)
+        elif kind == "add_many":
+            for record in op["records"]:
+                self._records[record["id"]] = record
+            self._next_id = max(self._next_id, op["records"][-1]["id"] + 1)
+        elif kind == "delete":
+            self._records.pop(op["id"], None)
+        elif kind == "delete_many":
+            for record_id in op["ids"]:
+                self._records.pop(record_id, None)
+        elif kind == "clear":
+            self._records.clear()
+        elif kind == "retain":
+            record = self._records.get(op["id"])
+            if record is not None:
+                record.update({k: op[k] for k in ("pinned", "expires") if k in op})
+        elif kind == "recall":
+            for record_id in op["ids"]:
+                if record_id in self._records:
+                    self._records[record_id]["recalled"] = op["at"]
+
+    def refresh(self):
+        """Catch up with changes another process made to the files."""
+        with self._lock:
+            self._refresh()
+
+    @contextmanager
+    def _writing(self):
+        """Both locks, with the index caught up, for as long as a change takes."""
+        with self._lock, self._file_lock:
+            self._refresh()
+            yield
+
+    def _refresh(self):
+        self._last_access = time.monotonic()
+        try:
+            st = os.stat(self.journal_path)
+        except FileNotFoundError:
+            st = None
+        compacted = self._mtime(self.snapshot_path) != self._snapshot_mtime
+        rotated = st is None or (st.st_ino, st.st_dev) != self._journal_id or st.st_size < self._offset
+        if compacted or rotated:
+            self._load()
+        elif st.st_size > self._offset:
+            self._replay()
+
+    def _migrate(self):
+        """
+        Import the old files: data/memory.json (bare strings or {text, timestamp}
+        objects), then any {input, timestamp} lines of the .jsonl logs not already in it.
+        """
+        seen, imported = set(), 0
+        try:
+            with open(os.path.join(self.data_dir, LEGACY_FILE), "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (FileNotFoundError, ValueError):
+            entries = []
+        for entry in entries if isinstance(entries, list) else []:
+            if isinstance(entry, str):
+                entry = {"text": entry}
+            if isinstance(entry, dict) and self._import(entry.get("text"), entry.get("timestamp"), seen):
+                imported += 1
+        for name in LEGACY_LOGS:
+            try:
+                with open(os.path.join(self.data_dir, name), "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        if isinstance(entry, dict) and self._import(entry.get("input") or entry.get("text"),
+                                                                    entry.get("timestamp"), seen):
+                            imported += 1
+            except FileNotFoundError:
+                continue
+        if imported:
+            print(f"🧠 Migrated {imported} memories into the journal.")
+
+    def _import(self, text, timestamp, seen):
+        text = str(text or "").strip()
+        if not text or text.lower() in seen:
+            return False
+        seen.add(text.lower())
+        if timestamp and "T" in timestamp:
+            # memory.jsonl used isoformat(); normalise to the record schema
+            try:
+                timestamp = datetime.fromisoformat(timestamp).strftime(TIMESTAMP_FORMAT)
+            except ValueError:
+                timestamp = None
+        self.add(text, timestamp=timestamp, source="import")
+        return True
+
+    # ========== Writing ==========
+
+    def _append(self, op):
+        line = (json.dumps(op, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.journal_path, "ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._offset += len(line)
+        self._journal_ops += 1
+        self._apply(op)
+        if self.background:
+            self._ensure_compactor()
+
+    def add(self, text, timestamp=None, source="voice", pinned=False, expires=None):
+        """
+        Store one memory and return its record.
+        :param pinned: never expire or evict it.
+        :param expires: timestamp after which it is forgotten.
+        """
+        text = text.strip()
+        if not text:
+            raise ValueError("Cannot remember empty text.")
+        with self._writing():
+            record = make_record(self._next_id, text, timestamp, source, pinned, expires)
+            self._append({"op": "add", "record": record})
+            return dict(record)
+
+    def delete(self, record_id):
+        with self._writing():
+            if record_id not in self._records:
+                return False
+            self._append({"op": "delete", "id": record_id})
+            return True
+
+    def add_many(self, entries):
+        """
+        Store a batch of memories with one journal line and one fsync, and
+        hand listeners a single "add_many" op so they can index in bulk.
+        entries are dicts with "text" and optionally "timestamp", "source",
+        "pinned" and "expires". Returns the new records.
+        """
+        with self._writing():
+            records = []
+            for entry in entries:
+                text = str(entry.get("text") or "").strip()
+                if text:
+                    records.append(make_record(self._next_id + len(records), text, entry.get("timestamp"),
+                                               entry.get("source") or "import", bool(entry.get("pinned")),
+                                               entry.get("expires")))
+            if records:
+                self._append({"op": "add_many", "records": records})
+            return records
+
+    def delete_many(self, record_ids):
+        """Remove several memories with one journal line. Returns how many existed."""
+        with self._writing():
+            ids = [i for i in record_ids if i in self._records]
+            if ids:
+                self._append({"op": "delete_many", "ids": ids})
+            return len(ids)
+
+    def clear(self):
+        with self._writing():
+            self._append({"op": "clear"})
+
+    def set_retention(self, record_id, **fields):
+        """Change pinned and/or expires of a memory."""
+        fields = {k: v for k, v in fields.items() if k in ("pinned", "expires")}
+        with self._writing():
+            if record_id not in self._records or not fields:
+                return False
+            self._append({"op": "retain", "id": record_id, **fields})
+            return True
+
+    def mark_recalled(self, record_ids):
+        """Note that memories were just spoken back, which protects them from eviction."""
+        with self._writing():
+            ids = [i for i in record_ids if i in self._records]
+            if ids:
+                self._append({"op": "recall", "ids": ids, "at": _now()})
+
+    # ========== Reading ==========
+
+    def all(self):
+        """Every record, oldest first."""
+        with self._lock:
+            self._refresh()
+            return [dict(r) for r in self._records.values()]
+
+    def get(self, record_id):
+        with self._lock:
+            self._refresh()
+            record = self._records.get(record_id)
+            return dict(record) if record else None
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._records)
+
+    # ========== Compaction ==========
+
+    def _disk_bytes(self):
+        return sum(os.path.getsize(p) for p in (self.journal_path, self.snapshot_path) if os.path.exists(p))
+
+    def compact(self):
+        """
+        Fold the journal into the snapshot. Returns the bytes reclaimed.
+
+        The snapshot is written outside the locks from a copy of the index, so
+        adds and searches carry on meanwhile; they are only taken again to
+        carry the journal lines appended in the meantime over to the new
+        journal and swap both files in, with no other process writing.
+        """
+        with self._writing():
+            if not self._journal_ops:
+                return 0
+            before = self._disk_bytes()
+            state = {"next_id": self._next_id, "records": [dict(r) for r in self._records.values()]}
+            offset, journal_id = self._offset, self._journal_id
+        pending = f"{self.snapshot_path}.{os.getpid()}.{threading.get_ident()}.next"
+        atomic_write_json(pending, state)
+        with self._writing():
+            if self._journal_id != journal_id or self._offset < offset:
+                os.remove(pending)  # another process compacted first
+                return 0
+            with open(self.journal_path, "rb") as f:
+                f.seek(offset)
+                tail = f.read(self._offset - offset)
+            tmp = f"{self.journal_path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(pending, self.snapshot_path)
+            os.replace(tmp, self.journal_path)
+            self._snapshot_mtime = self._mtime(self.snapshot_path)
+            st = os.stat(self.journal_path)
+            self._journal_id, self._offset, self._journal_ops = (st.st_ino, st.st_dev), len(tail), tail.count(b"\n")
+            return max(before - self._disk_bytes(), 0)
+
+    def enforce(self, policy):
+        """Forget what the RetentionPolicy no longer allows. Returns how many were removed."""
+        with self._writing():
+            doomed = policy.select(list(self._records.values()))
+            return self.delete_many(doomed) if doomed else 0
+
+    def maintain(self, policy=None, force=False):
+        """
+        Apply retention and compact. Without force this only runs once the
+        store has been idle for policy.idle_seconds and there is work to do.
+        Returns {"evicted", "reclaimed", "at"} or None when skipped.
+        """
+        policy = policy or RetentionPolicy.load(self.data_dir)
+        if not force and time.monotonic() - self._last_access < policy.idle_seconds:
+            return None
+        evicted = self.enforce(policy)
+        reclaimed = 0
+        if force or evicted or self._journal_ops >= self.compact_after:
+            reclaimed = self.compact()
+        if not (force or evicted or reclaimed):
+            return None
+        self.last_maintenance = {"evicted": evicted, "reclaimed": reclaimed, "at": _now()}
+        return self.last_maintenance
+
+    def _ensure_compactor(self):
+        if self._compactor is None:
+            self._compactor = threading.Thread(target=self._compact_loop, name="newt-memory-compact",
+                                               daemon=True)
+            self._compactor.start()
+
+    def _compact_loop(self):
+        while not self._stop.wait(COMPACT_INTERVAL):
+            try:
+                report = self.maintain()
+            except Exception as e:
+                print(f"[Memory Maintenance Error] {e}")
+                continue
+            if report:
+                print(f"🧹 Memory maintenance: evicted {report['evicted']}, "
+                      f"reclaimed {report['reclaimed'] / 1024:.1f} KB")
+
+    def close(self):
+        self._stop.set()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The shared MemoryStore for data/, created on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MemoryStore()
+        return _store
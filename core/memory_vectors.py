@@ -0,0 +1,244 @@
+# core/memory_vectors.py
+
+import os
+import re
+import json
+import zlib
+import threading
+from functools import lru_cache
+
+from core.lazy import lazy_import, is_installed
+from core.memory_store import get_store
+from core.datastore import atomic_write_json
+
+np = lazy_import("numpy")
+
+VECTORS_FILE = "memory_vectors.f32"   # rows of hashed term frequencies, memory-mapped
+IDS_FILE = "memory_vectors.ids"       # record id of each row (-1 once deleted)
+HASHES_FILE = "memory_vectors.hash"   # CRC of the text each row was built from
+META_FILE = "memory_vectors.json"
+LAYOUT = 2                            # bumped when the files change shape; older ones are rebuilt
+DIMENSIONS = 512
+INITIAL_CAPACITY = 1024
+MAX_DEAD_FRACTION = 0.25              # deleted rows tolerated before live rows are packed together
+MIN_SIMILARITY = 0.15
+STOPWORDS = {"a", "an", "the", "my", "i", "me", "about", "of", "to", "and", "or", "is", "was",
+             "that", "what", "do", "you", "it", "for", "on", "in", "at", "with"}
+
+
+@lru_cache(maxsize=65536)
+def _word_features(word):
+    features = [zlib.crc32(word.encode("utf-8")) % DIMENSIONS]
+    if len(word) > 3:
+        padded = f"<{word}>"
+        features.extend(zlib.crc32(f"#{padded[i:i + 3]}".encode("utf-8")) % DIMENSIONS
+                        for i in range(len(padded) - 2))
+    return features
+
+
+def text_hash(text):
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def term_features(text):
+    """Hashed features: each word, plus character trigrams so "shop" and "shopping" overlap."""
+    features = []
+    for word in re.findall(r"\w+", text.lower()):
+        if word not in STOPWORDS:
+            features.extend(_word_features(word))
+    return features
+
+
+class VectorIndex:
+    """
+    TF-IDF recall index over memories, kept entirely offline.
+
+    Rows are weighted SMART "lnc.ltc" style: each memory is a unit vector of
+    log term frequencies in a memory-mapped float32 matrix, and IDF is applied
+    to the query alone. Adding a memory therefore writes one row and never
+    rescales the others, and a query is a single matrix-vector product over
+    all rows followed by a top-k partial sort.
+
+    Deleting a memory zeroes its row; once more than MAX_DEAD_FRACTION of
+    the rows are dead the live ones are moved together, so the files stop
+    growing. Each row remembers a hash of its text, so a memory edited
+    while the assistant was not running is re-indexed on the next load.
+    """
+
+    def __init__(self, data_dir):
+        self.vectors_path = os.path.join(data_dir, VECTORS_FILE)
+        self.ids_path = os.path.join(data_dir, IDS_FILE)
+        self.hashes_path = os.path.join(data_dir, HASHES_FILE)
+        self.meta_path = os.path.join(data_dir, META_FILE)
+        self._lock = threading.Lock()
+        self._open()
+
+    # ========== Storage ==========
+
+    def _open(self):
+        meta = {}
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            pass
+        if (meta.get("dimensions") != DIMENSIONS or meta.get("layout") != LAYOUT
+                or not all(os.path.exists(p) for p in (self.vectors_path, self.ids_path, self.hashes_path))):
+            meta = {}
+        self.rows = meta.get("rows", 0)
+        self.capacity = meta.get("capacity", INITIAL_CAPACITY)
+        self.df = np.array(meta.get("df", [0] * DIMENSIONS), dtype=np.float64)
+        self.live = meta.get("live", 0)
+        mode = "r+" if meta else "w+"
+        self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode=mode,
+                                 shape=(self.capacity, DIMENSIONS))
+        self._ids = np.memmap(self.ids_path, dtype=np.int64, mode=mode, shape=(self.capacity,))
+        self._hashes = np.memmap(self.hashes_path, dtype=np.int64, mode=mode, shape=(self.capacity,))
+        self._row_of = {int(i): row for row, i in enumerate(self._ids[:self.rows]) if i >= 0}
+
+    def _save_meta(self):
+        self._matrix.flush()
+        self._ids.flush()
+        self._hashes.flush()
+        atomic_write_json(self.meta_path, {"dimensions": DIMENSIONS, "layout": LAYOUT, "rows": self.rows,
+                                           "capacity": self.capacity, "live": self.live, "df": self.df.tolist()})
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+        self._matrix.flush()
+        self._ids.flush()
+        self._hashes.flush()
+        del self._matrix, self._ids, self._hashes
+        # Extending the files keeps existing rows in place; only the tail is new
+        for path, itemsize in ((self.vectors_path, 4 * DIMENSIONS), (self.ids_path, 8), (self.hashes_path, 8)):
+            with open(path, "r+b") as f:
+                f.truncate(capacity * itemsize)
+        self.capacity = capacity
+        self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, DIMENSIONS))
+        self._ids = np.memmap(self.ids_path, dtype=np.int64, mode="r+", shape=(capacity,))
+        self._hashes = np.memmap(self.hashes_path, dtype=np.int64, mode="r+", shape=(capacity,))
+
+    def _pack(self):
+        """Move the live rows to the front, in order, dropping the dead ones."""
+        live = np.flatnonzero(self._ids[:self.rows] >= 0)
+        for array, empty in ((self._matrix, 0), (self._ids, -1), (self._hashes, 0)):
+            array[:len(live)] = array[live]
+            array[len(live):self.rows] = empty
+        self.rows = len(live)
+        self._row_of = {int(i): row for row, i in enumerate(self._ids[:self.rows])}
+
+    def _reset(self):
+        del self._matrix, self._ids, self._hashes  # unmap first; Windows cannot delete a mapped file
+        for path in (self.vectors_path, self.ids_path, self.hashes_path, self.meta_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._open()
+
+    # ========== Updates ==========
+
+    def _vector(self, text):
+        vec = np.bincount(term_features(text), minlength=DIMENSIONS).astype(np.float32)
+        nonzero = vec > 0
+        vec[nonzero] = 1.0 + np.log(vec[nonzero])
+        return vec
+
+    def _add(self, records):
+        """Append rows for records; a batch is normalised and written as one block."""
+        self._grow(self.rows + len(records))
+        for record in records:
+            if record["id"] in self._row_of:
+                self._delete(record["id"])
+        block = np.zeros((len(records), DIMENSIONS), dtype=np.float32)
+        for i, record in enumerate(records):
+            block[i] = self._vector(record["text"])
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        block /= np.where(norms > 0, norms, 1.0)
+        end = self.rows + len(records)
+        self._matrix[self.rows:end] = block
+        self._ids[self.rows:end] = [r["id"] for r in records]
+        self._hashes[self.rows:end] = [text_hash(r["text"]) for r in records]
+        self.df += (block > 0).sum(axis=0)
+        self._row_of.update((r["id"], row) for row, r in enumerate(records, self.rows))
+        self.rows, self.live = end, self.live + len(records)
+
+    def _delete(self, record_id):
+        row = self._row_of.pop(record_id, None)
+        if row is None:
+            return
+        self.df -= self._matrix[row] > 0
+        self._matrix[row] = 0
+        self._ids[row] = -1
+        self._hashes[row] = 0
+        self.live -= 1
+
+    def __call__(self, op):
+        """MemoryStore listener."""
+        kind = op.get("op")
+        with self._lock:
+            if kind in ("add", "update"):
+                self._add([op["record"]])
+            elif kind == "add_many":
+                self._add(op["records"])
+            elif kind == "delete":
+                self._delete(op["id"])
+            elif kind == "delete_many":
+                for record_id in op["ids"]:
+                    self._delete(record_id)
+            elif kind == "clear":
+                self._reset()
+                return
+            elif kind == "reset":
+                indexed = {i: int(self._hashes[row]) for i, row in self._row_of.items()}
+                if indexed == {r["id"]: text_hash(r["text"]) for r in op["records"]}:
+                    return
+                self._reset()
+                self._add(op["records"])
+            else:
+                return
+            if self.rows - self.live > MAX_DEAD_FRACTION * self.rows:
+                self._pack()
+            self._save_meta()
+
+    # ========== Queries ==========
+
+    def search(self, text, k=3, min_similarity=MIN_SIMILARITY):
+        """[(record id, similarity)] of the k closest memories, best first."""
+        with self._lock:
+            if not self.live:
+                return []
+            idf = np.log((1.0 + self.live) / (1.0 + self.df)).astype(np.float32) + 1.0
+            query = self._vector(text) * idf
+            norm = np.linalg.norm(query)
+            if not norm:
+                return []
+            scores = self._matrix[:self.rows] @ (query / norm)
+            ids = self._ids[:self.rows]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[row]), float(scores[row])) for row in top
+                if ids[row] >= 0 and scores[row] >= min_similarity]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index():
+    """The VectorIndex next to the shared store, or None without NumPy."""
+    global _index
+    if not is_installed("numpy"):
+        return None
+    store = get_store()
+    with _index_lock:
+        if _index is None:
+            _index = VectorIndex(store.data_dir)
+            store.add_listener(_index)
+    store.refresh()
+    return _index
@@ -1,47 +1,162 @@
 import os
-import json
+import re
+import sys
+import time
+import threading
+from functools import lru_cache
+
+from core.datastore import json_file
 
 NLP_RULES_FILE = "data/nlp_rules.json"
+CACHE_SIZE = 1024
+RELOAD_CHECK_INTERVAL = 1.0  # seconds between checks of the rules file
+
+DEFAULT_RULES = {
+    "junk_phrases": [],
+    "synonyms": {},
+    "command_aliases": {},
+    "start_patterns": {},
+    "fallback_prefix": ""
+}
+
+rules_file = json_file(NLP_RULES_FILE)
 
 # Load rules
 def load_nlp_rules():
-    if not os.path.exists(NLP_RULES_FILE):
-        return {
-            "junk_phrases": [],
-            "synonyms": {},
-            "command_aliases": {},
-            "start_patterns": {},
-            "fallback_prefix": ""
-        }
-    with open(NLP_RULES_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-rules = load_nlp_rules()
+    data = rules_file.read()
+    if data is None:
+        if os.path.exists(NLP_RULES_FILE):
+            raise ValueError(f"{NLP_RULES_FILE} could not be parsed")
+        return dict(DEFAULT_RULES)
+    return {**DEFAULT_RULES, **data}
 
-def preprocess(command: str) -> str:
-    command = command.lower().strip()
 
-    # 1. Remove junk phrases
-    for junk in rules["junk_phrases"]:
-        if junk in command:
-            command = command.replace(junk, "").strip()
+def _trie_regex(node):
+    """Turn a character trie into a nested regex; shared prefixes are tested once."""
+    terminal = "" in node
+    branches, singles = [], []
+    for ch in sorted(k for k in node if k):
+        sub = _trie_regex(node[ch])
+        if sub:
+            branches.append(re.escape(ch) + sub)
+        else:
+            singles.append(re.escape(ch))
+    if singles:
+        branches.append(singles[0] if len(singles) == 1 else f"[{''.join(singles)}]")
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    if terminal:
+        # Greedy, so the longest phrase ("right now") is tried before its prefix ("right")
+        body = f"(?:{body})?"
+    return body
+
+
+def _alternation(phrases, bounded=True):
+    """Compile phrases into one trie-shaped alternation regex."""
+    trie = {}
+    for phrase in {p for p in phrases if p}:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    if not trie:
+        return None
+    body = _trie_regex(trie)
+    if bounded:
+        return re.compile(rf"(?<!\w)(?:{body})(?!\w)")
+    return re.compile(rf"^(?:{body})")
+
+
+class CompiledRules:
+    """nlp_rules.json compiled into a handful of regexes."""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.junk_re = _alternation(rules["junk_phrases"])
+        self.synonyms = {k.lower(): v for k, v in rules["synonyms"].items()}
+        self.synonym_re = _alternation(self.synonyms)
+        self.aliases = rules["command_aliases"]
+        self.start_patterns = rules["start_patterns"]
+        self.start_re = _alternation(self.start_patterns, bounded=False)
+        self.fallback_prefix = rules.get("fallback_prefix") or ""
+
+    def apply(self, command: str, fallback=True) -> str:
+        command = command.lower().strip()
+
+        # 1. Remove junk phrases (whole words only)
+        if self.junk_re:
+            command = " ".join(self.junk_re.sub(" ", command).split())
+
+        # 2. Replace synonyms in one pass (e.g., "run" → "open", but not inside "brunch")
+        if self.synonym_re:
+            command = self.synonym_re.sub(lambda m: self.synonyms[m.group(0)], command)
 
-    # 2. Replace synonyms (e.g., "run" → "open")
-    for word, replacement in rules["synonyms"].items():
-        if word in command:
-            command = command.replace(word, replacement)
+        # 3. Expand aliases (e.g., "focus mode" → "open notepad and turn off wi-fi")
+        if command in self.aliases:
+            return self.aliases[command]
 
-    # 3. Expand aliases (e.g., "focus mode" → "open notepad and turn off wi-fi")
-    if command in rules["command_aliases"]:
-        return rules["command_aliases"][command]
+        # 4. Normalize patterns (e.g., "search for", "look up")
+        if self.start_re:
+            for _ in range(len(self.start_patterns)):
+                m = self.start_re.match(command)
+                if not m or self.start_patterns[m.group(0)] == m.group(0):
+                    break
+                command = (self.start_patterns[m.group(0)] + command[m.end():]).strip()
 
-    # 4. Normalize patterns (e.g., "search for", "look up")
-    for pattern, replacement in rules["start_patterns"].items():
-        if command.startswith(pattern):
-            command = command.replace(pattern, replacement, 1).strip()
+        # 5. Add fallback prefix (if defined)
+        if fallback and self.fallback_prefix and not command.startswith(self.fallback_prefix):
+            command = self.fallback_prefix + command
+
+        return command
+
+
+_lock = threading.Lock()
+_compiled = CompiledRules(load_nlp_rules())
+_source = rules_file.read()  # the parsed file the compiled rules came from
+_last_check = time.monotonic()
+rules = _compiled.rules
+
+
+def reload_rules(force=False):
+    """Recompile the rules if the file changed on disk (or always, with force=True)."""
+    global _compiled, _source, _last_check, rules
+    with _lock:
+        _last_check = time.monotonic()
+        # The datastore only re-parses the file when it changed, handing back the same object otherwise
+        source = rules_file.read()
+        if not force and source is _source:
+            return False
+        try:
+            compiled = CompiledRules(load_nlp_rules())
+        except Exception as e:
+            print(f"[NLP Rules Reload Error] {e}", file=sys.stderr)
+            return False
+        _compiled, _source, rules = compiled, source, compiled.rules
+        _preprocess_cached.cache_clear()
+        _normalize_cached.cache_clear()
+        print("🔁 NLP rules reloaded.", file=sys.stderr)  # may run on a watcher thread mid-batch
+        return True
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _preprocess_cached(command: str) -> str:
+    return _compiled.apply(command)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _normalize_cached(command: str) -> str:
+    return _compiled.apply(command, fallback=False)
+
+
+def preprocess(command: str) -> str:
+    if time.monotonic() - _last_check >= RELOAD_CHECK_INTERVAL:
+        reload_rules()
+    return _preprocess_cached(command)
 
-    # 5. Add fallback prefix (if defined)
-    if rules.get("fallback_prefix") and not command.startswith(rules["fallback_prefix"]):
-        command = rules["fallback_prefix"] + command
 
-    return command
+def normalize(command: str) -> str:
+    """Like preprocess(), but without the fallback prefix."""
+    if time.monotonic() - _last_check >= RELOAD_CHECK_INTERVAL:
+        reload_rules()
+    return _normalize_cached(command)
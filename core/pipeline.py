@@ -0,0 +1,148 @@
+# core/pipeline.py
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.speech import say_and_wait, capture_speech
+from core.events import publish
+
+_STOP = object()
+
+
+class AssistantPipeline:
+    """
+    Listen → recognize → execute → speak, as four asyncio stages joined by queues.
+
+    Every stage calls blocking code (microphone, recognizer, feature modules,
+    TTS) in its own executor, so the microphone keeps capturing the next
+    command while the previous one is still being executed or spoken.
+    Bounded queues apply back-pressure instead of buffering without limit.
+    """
+
+    def __init__(self, capture, recognize, execute, say=say_and_wait, queue_size=8, command_workers=1):
+        """
+        :param capture: () -> audio or None; blocking microphone read, raises EOFError when exhausted.
+        :param recognize: (audio) -> text or None.
+        :param execute: (text) -> any; runs a command, calling speak() as it goes.
+        :param say: (text) -> None; blocking TTS output.
+        :param command_workers: commands executed concurrently (1 keeps them in order).
+        """
+        self.capture = capture
+        self.recognize = recognize
+        self.execute = execute
+        self.say = say
+        self.queue_size = queue_size
+        self.command_workers = command_workers
+        self._executors = {
+            "capture": ThreadPoolExecutor(1, thread_name_prefix="newt-capture"),
+            "recognize": ThreadPoolExecutor(1, thread_name_prefix="newt-recognize"),
+            "execute": ThreadPoolExecutor(command_workers, thread_name_prefix="newt-execute"),
+            "speak": ThreadPoolExecutor(1, thread_name_prefix="newt-speak"),
+        }
+        self.stats = {"captured": 0, "recognized": 0, "executed": 0, "spoken": 0, "errors": 0}
+        self._running = False
+
+    async def _blocking(self, stage, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executors[stage], func, *args)
+
+    # ========== Stages ==========
+
+    async def _capture_stage(self, audio_q):
+        while self._running:
+            try:
+                audio = await self._blocking("capture", self.capture)
+            except EOFError:
+                # A finite source (e.g. a WAV file) ran out: drain and finish
+                await audio_q.put(_STOP)
+                return
+            if audio is not None:
+                self.stats["captured"] += 1
+                await audio_q.put(audio)
+
+    async def _recognize_stage(self, audio_q, command_q):
+        while True:
+            audio = await audio_q.get()
+            if audio is _STOP:
+                await command_q.put(_STOP)
+                return
+            text = await self._blocking("recognize", self.recognize, audio)
+            if text:
+                self.stats["recognized"] += 1
+                print(f"Command received: {text}")
+                publish("recognized", text=text)
+                await command_q.put(text)
+
+    def _run_command(self, command, forward):
+        # Runs on an executor thread: divert this thread's speech to the speech stage
+        started = time.perf_counter()
+        with capture_speech(mute=True, forward=forward):
+            try:
+                return self.execute(command)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"[Pipeline Command Error] {command}: {e}")
+                forward("I encountered an error while processing your command. Please try again.")
+            finally:
+                print(f"⚙️ '{command}' handled in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    async def _execute_stage(self, command_q, speech_q):
+        loop = asyncio.get_running_loop()
+
+        def forward(text):
+            loop.call_soon_threadsafe(speech_q.put_nowait, text)
+
+        while True:
+            command = await command_q.get()
+            if command is _STOP:
+                await command_q.put(_STOP)  # let sibling workers stop too
+                return
+            await self._blocking("execute", self._run_command, command, forward)
+            self.stats["executed"] += 1
+
+    async def _speech_stage(self, speech_q):
+        while True:
+            text = await speech_q.get()
+            if text is _STOP:
+                return
+            await self._blocking("speak", self.say, text)
+            self.stats["spoken"] += 1
+
+    # ========== Lifecycle ==========
+
+    async def run(self, commands=None):
+        """
+        Run until cancelled. If commands is given, it replaces the microphone:
+        those texts are fed to the execute stage and the pipeline drains and returns.
+        """
+        self._running = True
+        audio_q = asyncio.Queue(self.queue_size)
+        command_q = asyncio.Queue(self.queue_size)
+        speech_q = asyncio.Queue()
+
+        speaker = asyncio.create_task(self._speech_stage(speech_q))
+        workers = [asyncio.create_task(self._execute_stage(command_q, speech_q))
+                   for _ in range(self.command_workers)]
+        if commands is None:
+            producers = [asyncio.create_task(self._capture_stage(audio_q)),
+                         asyncio.create_task(self._recognize_stage(audio_q, command_q))]
+        else:
+            producers = []
+            for command in commands:
+                await command_q.put(command)
+            await command_q.put(_STOP)
+
+        try:
+            await asyncio.gather(*producers, *workers)
+        finally:
+            self._running = False
+            for task in producers + workers:
+                task.cancel()
+            speech_q.put_nowait(_STOP)
+            await speaker
+
+    def shutdown(self):
+        self._running = False
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
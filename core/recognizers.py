@@ -0,0 +1,241 @@
+# core/recognizers.py
+
+import os
+import json
+import time
+import queue
+import threading
+
+from core.lazy import lazy_import, is_installed
+
+sr = lazy_import("speech_recognition")
+vosk = lazy_import("vosk")
+
+VOSK_MODEL_PATH = os.path.join("models", "vosk-model-small-en-us-0.15")
+# Preferred order when no backend is chosen explicitly: offline engines first
+BACKEND_ORDER = ("vosk", "sphinx", "google")
+
+
+class Recognition:
+    """Final transcript of one utterance plus how long recognition took."""
+
+    def __init__(self, text, backend, audio_duration, processing, latency, partials=None):
+        self.text = text
+        self.backend = backend
+        self.audio_duration = audio_duration  # seconds of speech
+        self.processing = processing          # seconds spent decoding
+        self.latency = latency                # seconds from end of speech to final text
+        self.partials = partials or []
+
+    @property
+    def rtf(self):
+        """Real-time factor: decoding time / audio time (below 1 is faster than real time)."""
+        return self.processing / self.audio_duration if self.audio_duration else 0.0
+
+    def __repr__(self):
+        return (f"Recognition({self.text!r}, {self.backend}, latency={self.latency * 1000:.0f}ms, "
+                f"rtf={self.rtf:.2f})")
+
+
+class RecognizerBackend:
+    """
+    Speech-to-text engine. Batch backends implement transcribe(); streaming
+    ones also implement start()/feed()/finish() so text is decoded while the
+    user is still speaking and partial hypotheses are available early.
+    """
+
+    name = "base"
+    offline = True
+    streaming = False
+
+    def transcribe(self, utterance):
+        raise NotImplementedError
+
+    def recognize(self, utterance):
+        started = time.perf_counter()
+        text = self.transcribe(utterance)
+        took = time.perf_counter() - started
+        return Recognition(text, self.name, utterance.duration, took, took)
+
+    # Streaming interface
+    def start(self, sample_rate):
+        raise NotImplementedError
+
+    def feed(self, chunk):
+        """Decode a chunk; return the current partial hypothesis (may be empty)."""
+        raise NotImplementedError
+
+    def finish(self):
+        """Return the final text for the utterance fed since start()."""
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognizerBackend):
+    """The original online Google Web Speech recognizer."""
+
+    name = "google"
+    offline = False
+
+    def __init__(self):
+        self._recognizer = sr.Recognizer()
+
+    def transcribe(self, utterance):
+        audio = sr.AudioData(utterance.frame_data, utterance.sample_rate, utterance.sample_width)
+        try:
+            return self._recognizer.recognize_google(audio).lower()
+        except sr.UnknownValueError:
+            return ""
+
+
+class SphinxBackend(RecognizerBackend):
+    """Offline CMU PocketSphinx through speech_recognition (no partial results)."""
+
+    name = "sphinx"
+
+    def __init__(self):
+        self._recognizer = sr.Recognizer()
+
+    def transcribe(self, utterance):
+        audio = sr.AudioData(utterance.frame_data, utterance.sample_rate, utterance.sample_width)
+        try:
+            return self._recognizer.recognize_sphinx(audio).lower()
+        except sr.UnknownValueError:
+            return ""
+
+
+class _VoskDecoder:
+    """One utterance on a KaldiRecognizer of its own, with the segments Vosk closed so far."""
+
+    def __init__(self, model, sample_rate):
+        self._rec = vosk.KaldiRecognizer(model, sample_rate)
+        self._segments = []
+
+    def feed(self, chunk):
+        if self._rec.AcceptWaveform(chunk):
+            # Vosk closed a segment on its own (a pause inside the utterance)
+            segment = json.loads(self._rec.Result()).get("text", "")
+            if segment:
+                self._segments.append(segment)
+            return " ".join(self._segments)
+        partial = json.loads(self._rec.PartialResult()).get("partial", "")
+        return " ".join(self._segments + ([partial] if partial else []))
+
+    def finish(self):
+        last = json.loads(self._rec.FinalResult()).get("text", "")
+        return " ".join(self._segments + ([last] if last else [])).lower()
+
+
+class VoskBackend(RecognizerBackend):
+    """
+    Offline Kaldi/Vosk recognizer with streaming partial hypotheses.
+
+    The model is shared, but a KaldiRecognizer is not thread-safe: the
+    streaming session (start/feed/finish, on the decoder thread) and each
+    transcribe() call decode on recognizers of their own.
+    """
+
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"Vosk model not found at {model_path}")
+        vosk.SetLogLevel(-1)
+        self._model = vosk.Model(model_path)
+        self._stream = None
+
+    def start(self, sample_rate):
+        self._stream = _VoskDecoder(self._model, sample_rate)
+
+    def feed(self, chunk):
+        return self._stream.feed(chunk)
+
+    def finish(self):
+        stream, self._stream = self._stream, None
+        return stream.finish()
+
+    def transcribe(self, utterance):
+        decoder = _VoskDecoder(self._model, utterance.sample_rate)
+        decoder.feed(utterance.frame_data)
+        return decoder.finish()
+
+
+BACKENDS = {"vosk": VoskBackend, "sphinx": SphinxBackend, "google": GoogleBackend}
+
+
+def backend_available(name):
+    if name == "vosk":
+        return is_installed("vosk") and os.path.isdir(VOSK_MODEL_PATH)
+    if name == "sphinx":
+        return is_installed("speech_recognition") and is_installed("pocketsphinx")
+    if name == "google":
+        return is_installed("speech_recognition")
+    return False
+
+
+def create_backend(preferred=None):
+    """Instantiate the preferred backend, or the first available in BACKEND_ORDER."""
+    names = [preferred] if preferred else [n for n in BACKEND_ORDER if backend_available(n)]
+    for name in names:
+        try:
+            backend = BACKENDS[name]()
+            print(f"🧠 Speech recognition: {name} ({'offline' if backend.offline else 'online'})")
+            return backend
+        except Exception as e:
+            print(f"[Recognizer Error] {name}: {e}")
+    raise RuntimeError("No speech recognition backend is available.")
+
+
+class StreamingSession:
+    """
+    Feeds audio to a streaming backend as an AudioStream captures it, on a
+    decoder thread of its own so capture never waits for decoding.
+    The final Recognition is attached to the Utterance when speech ends.
+    """
+
+    def __init__(self, backend, on_partial=None):
+        self.backend = backend
+        self.on_partial = on_partial
+        self._events = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="newt-decoder", daemon=True)
+        self._thread.start()
+
+    def __call__(self, event, data, sample_rate):
+        """AudioStream listener callback (runs on the capture thread)."""
+        self._events.put((event, data, sample_rate))
+
+    def _run(self):
+        active, processing, partials, last = False, 0.0, [], ""
+        while True:
+            event, data, sample_rate = self._events.get()
+            try:
+                if event == "start":
+                    self.backend.start(sample_rate)
+                    active, processing, partials, last = True, 0.0, [], ""
+                    event, data = "audio", data
+                if event == "audio" and active:
+                    started = time.perf_counter()
+                    partial = self.backend.feed(data)
+                    processing += time.perf_counter() - started
+                    if partial and partial != last:
+                        last = partial
+                        partials.append((time.time(), partial))
+                        if self.on_partial:
+                            self.on_partial(partial)
+                elif event == "discard" and active:
+                    self.backend.finish()
+                    active = False
+                elif event == "end" and active:
+                    utterance = data
+                    started = time.perf_counter()
+                    text = self.backend.finish()
+                    processing += time.perf_counter() - started
+                    latency = max(0.0, time.time() - utterance.ended_at)
+                    utterance.attach_result(Recognition(text, self.backend.name, utterance.duration,
+                                                        processing, latency, partials))
+                    active = False
+            except Exception as e:
+                print(f"[Streaming Recognition Error] {e}")
+                if event == "end":
+                    data.attach_result(None)
+                active = False
@@ -0,0 +1,172 @@
+# core/recurrence.py
+
+import re
+import datetime
+from functools import lru_cache
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MAX_SEARCH_DAYS = 366 * 5   # a cron rule with no match in five years never fires (e.g. Feb 30)
+_UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+
+def _cron_field(text, low, high):
+    """Set of values for one cron field: *, n, a-b, a-b/s, */s, comma lists."""
+    values = set()
+    for part in text.split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = map(int, part.split("-"))
+        else:
+            start = end = int(part)
+        if not (low <= start <= end <= high):
+            raise ValueError(f"cron value {part!r} outside {low}-{high}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+
+class Recurrence:
+    """
+    A compact repeat rule, stored as a short string on the reminder:
+
+        "every 30m" / "every 2h" / "every 3d"   fixed interval from the previous occurrence
+        "cron 0 9 * * 1-5"                       minute hour day-of-month month day-of-week
+
+    Day-of-week is 0-6 from Monday. Daily, weekday, weekly and monthly rules
+    are all cron rules. Only the next occurrence is ever computed; a series
+    is never expanded, except lazily by occurrences().
+    """
+
+    def __init__(self, rule):
+        self.rule = rule
+        kind, _, spec = rule.partition(" ")
+        self.interval = None
+        if kind == "every":
+            m = re.fullmatch(r"(\d+)([mhd])", spec)
+            if not m or int(m.group(1)) <= 0:
+                raise ValueError(f"bad interval {spec!r}")
+            self.interval = datetime.timedelta(seconds=int(m.group(1)) * _UNITS[m.group(2)])
+        elif kind == "cron":
+            fields = spec.split()
+            if len(fields) != 5:
+                raise ValueError(f"cron needs 5 fields, got {spec!r}")
+            self.minutes = sorted(_cron_field(fields[0], 0, 59))
+            self.hours = sorted(_cron_field(fields[1], 0, 23))
+            self.days = _cron_field(fields[2], 1, 31)
+            self.months = _cron_field(fields[3], 1, 12)
+            self.weekdays = _cron_field(fields[4], 0, 6)
+            # As in cron: when both day fields are restricted, either may match
+            self._either_day = fields[2] != "*" and fields[4] != "*"
+        else:
+            raise ValueError(f"unknown repeat rule {rule!r}")
+
+    def _day_matches(self, day):
+        if day.month not in self.months:
+            return False
+        dom, dow = day.day in self.days, day.weekday() in self.weekdays
+        return (dom or dow) if self._either_day else (dom and dow)
+
+    def next_after(self, previous, now=None):
+        """The first occurrence after both previous and now."""
+        after = max(previous, now) if now is not None else previous
+        if self.interval is not None:
+            steps = (after - previous) // self.interval + 1
+            return previous + steps * self.interval
+        start = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        for offset in range(MAX_SEARCH_DAYS):
+            day = start.date() + datetime.timedelta(days=offset)
+            if not self._day_matches(day):
+                continue
+            earliest = (start.hour, start.minute) if offset == 0 else (0, 0)
+            for hour in self.hours:
+                if hour < earliest[0]:
+                    continue
+                for minute in self.minutes:
+                    if (hour, minute) >= earliest:
+                        return datetime.datetime.combine(day, datetime.time(hour, minute))
+        return None
+
+    def occurrences(self, first, start, end):
+        """Occurrences in [start, end) of a series whose next one is first, generated one at a time."""
+        when = first
+        if when < start:
+            when = self.next_after(when, start - datetime.timedelta(microseconds=1))
+        while when is not None and when < end:
+            yield when
+            when = self.next_after(when)
+
+    def describe(self):
+        if self.interval is not None:
+            count, unit = int(self.rule[6:-1]), {"m": "minute", "h": "hour", "d": "day"}[self.rule[-1]]
+            return f"every {unit}" if count == 1 else f"every {count} {unit}s"
+        if len(self.months) < 12:
+            return "on a custom schedule"
+        if self.days != set(range(1, 32)):
+            return "monthly" if len(self.days) == 1 else "on set days of the month"
+        if self.weekdays == set(range(7)):
+            return "daily"
+        if self.weekdays == set(range(5)):
+            return "every weekday"
+        if self.weekdays == {5, 6}:
+            return "every weekend"
+        return "every " + " and ".join(WEEKDAYS[d].title() for d in sorted(self.weekdays))
+
+    def __repr__(self):
+        return f"Recurrence({self.rule!r})"
+
+
+@lru_cache(maxsize=1024)
+def parse_rule(rule):
+    """Shared Recurrence for a rule string; thousands of reminders with one rule share one object."""
+    return Recurrence(rule)
+
+
+# ========== Spoken rules ==========
+
+_DAY = r"(?:mon|tue|tues|wed|thu|thur|thurs|fri|sat|sun)(?:day)?s?"
+SPOKEN_RE = re.compile(
+    r"\b(?:every|each)\s+(?:(?P<count>\d+)\s+)?(?P<unit>minute|hour|day)s?\b"
+    r"|\b(?P<simple>daily|hourly|weekdays|every weekday|every weekend|weekends|every month|monthly"
+    r"|every (?:morning|afternoon|evening|night))\b"
+    r"|\b(?:every|each)\s+(?P<days>" + _DAY + r"(?:(?:\s*,\s*|\s+and\s+|\s+)" + _DAY + r")*)\b"
+    r"(?:\s+and\s+(?=" + _DAY + r"))?"
+)
+
+
+def _weekday(word):
+    word = word.lower().rstrip("s")
+    return next(i for i, name in enumerate(WEEKDAYS) if name.startswith(word[:3]))
+
+
+def spoken_rule(text, hour=9, minute=0, day_of_month=1):
+    """
+    (rule, (start, end) span of the phrase) for "every weekday", "every 20 minutes",
+    "every monday and thursday", "daily", "monthly"...; None if text repeats nothing.
+    hour/minute place calendar rules in the day.
+    """
+    m = SPOKEN_RE.search(text.lower())
+    if not m:
+        return None
+    if m.group("unit"):
+        count = int(m.group("count") or 1)
+        unit = m.group("unit")
+        if unit == "day":
+            rule = f"cron {minute} {hour} * * *" if count == 1 else f"every {count}d"
+        else:
+            rule = f"every {count}{unit[0]}"
+    elif m.group("simple"):
+        simple = m.group("simple")
+        if simple.startswith("every") and simple.split()[1] in ("morning", "afternoon", "evening", "night"):
+            simple = "daily"
+        rule = {"daily": f"cron {minute} {hour} * * *",
+                "hourly": "every 1h",
+                "weekdays": f"cron {minute} {hour} * * 0-4",
+                "every weekday": f"cron {minute} {hour} * * 0-4",
+                "every weekend": f"cron {minute} {hour} * * 5,6",
+                "weekends": f"cron {minute} {hour} * * 5,6"}.get(simple, f"cron {minute} {hour} {day_of_month} * *")
+    else:
+        days = sorted({_weekday(w) for w in re.findall(_DAY, m.group("days"))})
+        rule = f"cron {minute} {hour} * * {','.join(map(str, days))}"
+    return rule, m.span()
+
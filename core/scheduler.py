@@ -0,0 +1,105 @@
+# core/scheduler.py
+
+import time
+import heapq
+import itertools
+import threading
+
+
+class Scheduler:
+    """
+    Runs callbacks at wall-clock deadlines from a single thread.
+
+    Deadlines sit in a min-heap; the thread sleeps on a condition variable
+    until the earliest one (or until schedule()/cancel() wakes it), so
+    nothing polls and a callback fires within milliseconds of its time.
+    schedule() is O(log n). cancel() is O(1): the heap entry is left behind
+    and skipped when it surfaces, and the heap is rebuilt once stale
+    entries outnumber live ones. Callbacks run on the scheduler thread and
+    must not block for long.
+    """
+
+    def __init__(self, name="newt-scheduler", clock=time.time):
+        self.name = name
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._heap = []            # (due, seq, key)
+        self._live = {}            # key -> (due, seq, callback)
+        self._seq = itertools.count()
+        self._thread = None
+        self._stopped = False
+
+    def schedule(self, key, due, callback):
+        """Call callback(key) at time due (replacing any earlier schedule for key)."""
+        with self._cond:
+            seq = next(self._seq)
+            self._live[key] = (due, seq, callback)
+            heapq.heappush(self._heap, (due, seq, key))
+            if self._heap[0][1] == seq:
+                self._cond.notify()  # new earliest deadline
+
+    def cancel(self, key):
+        with self._cond:
+            if self._live.pop(key, None) is None:
+                return False
+            if len(self._heap) > 64 and len(self._heap) > 2 * len(self._live):
+                self._heap = [(due, seq, k) for k, (due, seq, _) in self._live.items()]
+                heapq.heapify(self._heap)
+            return True
+
+    def due(self, key):
+        entry = self._live.get(key)
+        return entry[0] if entry else None
+
+    def __contains__(self, key):
+        return key in self._live
+
+    def __len__(self):
+        return len(self._live)
+
+    def _stale(self, entry):
+        live = self._live.get(entry[2])
+        return live is None or live[1] != entry[1]
+
+    def _next_batch(self):
+        """Block until something is due; return [(key, callback)] that are due now."""
+        with self._cond:
+            while not self._stopped:
+                while self._heap and self._stale(self._heap[0]):
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - self.clock()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                now, due = self.clock(), []
+                while self._heap and self._heap[0][0] <= now:
+                    entry = heapq.heappop(self._heap)
+                    if not self._stale(entry):
+                        due.append((entry[2], self._live.pop(entry[2])[2]))
+                return due
+            return []
+
+    def _run(self):
+        while not self._stopped:
+            for key, callback in self._next_batch():
+                try:
+                    callback(key)
+                except Exception as e:
+                    print(f"[Scheduler Error] {self.name} {key}: {e}")
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread = None
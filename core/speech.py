@@ -1,34 +1,359 @@
-import pyttsx3
+import re
+import time
+import heapq
 import platform
+import itertools
+import threading
+from contextlib import contextmanager
 
-# Initialize text-to-speech engine
-engine = pyttsx3.init()
-
-# === CONFIGURATION ===
-engine.setProperty("rate", 180)  # Speaking rate (words per minute)
-engine.setProperty("volume", 1.0)  # Max volume
-
-# Set default voice based on OS
-voices = engine.getProperty("voices")
-if platform.system() == "Windows":
-    # Prefer Zira (female) voice if available
-    for voice in voices:
-        if "zira" in voice.name.lower():
-            engine.setProperty("voice", voice.id)
-            break
-    else:
-        engine.setProperty("voice", voices[0].id)
-else:
-    # macOS/Linux: use first available voice
-    engine.setProperty("voice", voices[0].id)
+from core.tts_cache import UtteranceCache, play_clip
+from core.events import publish
 
-# === SPEAK FUNCTION ===
-def speak(text: str):
-    """Speak the given text using TTS engine."""
+# The TTS engine is created on first use: pyttsx3 start-up is slow, and
+# headless boxes may have no TTS backend at all (text output is used then).
+engine = None
+_engine_failed = False
+_engine_lock = threading.Lock()
+
+
+def _configure(tts):
+    # === CONFIGURATION ===
+    tts.setProperty("rate", 180)  # Speaking rate (words per minute)
+    tts.setProperty("volume", 1.0)  # Max volume
+
+    # Set default voice based on OS
+    voices = tts.getProperty("voices")
+    if platform.system() == "Windows":
+        # Prefer Zira (female) voice if available
+        for voice in voices:
+            if "zira" in voice.name.lower():
+                tts.setProperty("voice", voice.id)
+                break
+        else:
+            tts.setProperty("voice", voices[0].id)
+    elif voices:
+        # macOS/Linux: use first available voice
+        tts.setProperty("voice", voices[0].id)
+
+
+def get_engine():
+    """Return the shared pyttsx3 engine, initializing it on first call (None if unavailable)."""
+    global engine, _engine_failed
+    if engine is not None or _engine_failed:
+        return engine
+    with _engine_lock:
+        if engine is None and not _engine_failed:
+            try:
+                import pyttsx3
+                tts = pyttsx3.init()
+                _configure(tts)
+                engine = tts
+            except Exception as e:
+                _engine_failed = True
+                print(f"⚠️ TTS unavailable, falling back to text output: {e}")
+    return engine
+
+_capture = threading.local()
+
+# === CAPTURE ===
+@contextmanager
+def capture_speech(mute=True, forward=None):
+    """
+    Collect everything spoken on this thread into a list.
+    :param mute: if True, captured text is not sent to the TTS engine.
+    :param forward: optional callable handed each captured text as it is spoken.
+    """
+    spoken = []
+    previous = getattr(_capture, "sink", None)
+    _capture.sink = (spoken, mute, forward)
+    try:
+        yield spoken
+    finally:
+        _capture.sink = previous
+
+# === SPEECH WORKER ===
+# Lower number = more urgent. An urgent message barges in on less urgent speech.
+PRIORITY_ALERT = 0     # reminders, timers going off
+PRIORITY_NORMAL = 5    # replies to commands
+PRIORITY_CHATTER = 9   # greetings, status chatter
+PRIORITY_IDLE = 10     # background work such as pre-rendering cached phrases
+
+CACHE_ENABLED = True   # play frequent phrases from pre-rendered clips (core.tts_cache)
+WARM_UP_PHRASES = 20
+
+# Leading verbs ignored when deciding whether two queued messages say the same thing
+_COALESCE_VERBS = {"opening", "opened", "launching", "launched", "starting", "started",
+                   "running", "playing", "resuming"}
+
+
+def _coalesce_key(text):
+    words = re.sub(r"[^\w\s]", " ", text.lower()).split()
+    if words and words[0] in _COALESCE_VERBS:
+        words = words[1:]
+    return " ".join(words)
+
+
+class SpeechHandle:
+    """Completion handle returned by speak(): wait on it, or cancel/interrupt it."""
+
+    def __init__(self, text, priority, render_only=False):
+        self.text = text
+        self.priority = priority
+        self.render_only = render_only  # pre-render into the clip cache, don't speak
+        self.key = ("render:" if render_only else "") + _coalesce_key(text)
+        self.coalesced = False    # dropped as a duplicate of another queued message
+        self.interrupted = False  # cut off (or skipped) by barge-in or cancel()
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the utterance finished (or was dropped). Returns True if done."""
+        return self._done.wait(timeout)
+
+    def cancel(self):
+        """Drop the message if queued, or cut it off if it is being spoken."""
+        _worker.cancel(self)
+
+    def _finish(self):
+        self._done.set()
+
+    def __repr__(self):
+        state = "done" if self.done else "pending"
+        return f"SpeechHandle({self.text!r}, {state})"
+
+
+class SpeechWorker:
+    """
+    Owns the TTS engine on one thread and speaks from a priority queue.
+    Every other thread only enqueues, so pyttsx3 is never used concurrently.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._current = None
+        self._stop_current = threading.Event()
+        self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="newt-tts", daemon=True)
+            self._thread.start()
+
+    def submit(self, handle, interrupt=False):
+        with self._cond:
+            self._ensure_started()
+            # Coalesce with anything queued or being spoken that says the same thing
+            current = self._current
+            if current is not None and current.key == handle.key and not interrupt:
+                handle.coalesced = True
+                handle._finish()
+                return handle
+            for _, _, queued in self._heap:
+                if queued.key == handle.key and queued.priority <= handle.priority:
+                    handle.coalesced = True
+                    handle._finish()
+                    return handle
+
+            heapq.heappush(self._heap, (handle.priority, next(self._seq), handle))
+            if current is not None and (interrupt or handle.priority < current.priority):
+                self._stop_current.set()
+            self._cond.notify()
+        return handle
+
+    def cancel(self, handle):
+        with self._cond:
+            if self._current is handle:
+                self._stop_current.set()
+                return
+            for i, (_, _, queued) in enumerate(self._heap):
+                if queued is handle:
+                    self._heap.pop(i)
+                    heapq.heapify(self._heap)
+                    break
+            else:
+                return
+        handle.interrupted = True
+        handle._finish()
+
+    def interrupt(self, clear_queue=False):
+        """Barge-in: stop the current utterance, optionally dropping everything queued."""
+        with self._cond:
+            dropped = []
+            if clear_queue:
+                dropped = [h for _, _, h in self._heap]
+                self._heap.clear()
+            if self._current is not None:
+                self._stop_current.set()
+        for handle in dropped:
+            handle.interrupted = True
+            handle._finish()
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap) + (1 if self._current else 0)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, handle = heapq.heappop(self._heap)
+                self._current = handle
+                self._stop_current.clear()
+            try:
+                self._say(handle)
+            finally:
+                with self._cond:
+                    self._current = None
+                handle._finish()
+
+    def _say(self, handle):
+        try:
+            tts = get_engine()
+            if tts is None:
+                return
+            cache = get_cache()
+            if handle.render_only:
+                if cache is not None:
+                    cache.render(tts, handle.text, _drive)
+                return
+
+            if cache is not None and self._play_cached(tts, cache, handle):
+                return
+            tts.say(handle.text)
+            _drive(tts, self._stop_current)
+            if self._stop_current.is_set():
+                handle.interrupted = True
+            elif cache is not None and cache.record_use(handle.text):
+                # Spoken often enough: render it in the background for next time
+                self.submit(SpeechHandle(handle.text, PRIORITY_IDLE, render_only=True))
+        except Exception as e:
+            print(f"❌ Speech error: {e}")
+            print(f"(Fallback) {handle.text}")
+
+    def _play_cached(self, tts, cache, handle):
+        path = cache.lookup(handle.text, tts.getProperty("voice"), tts.getProperty("rate"))
+        if path is None or not play_clip(path, self._stop_current):
+            return False
+        cache.record_use(handle.text)
+        if self._stop_current.is_set():
+            handle.interrupted = True
+        return True
+
+
+def _drive(tts, stop=None):
+    """Run the engine until its queued say/save job is done."""
+    if not _iterate_loop(tts, stop or threading.Event()):
+        tts.runAndWait()
+
+
+_cache = None
+_cache_failed = False
+
+
+def get_cache():
+    """The shared UtteranceCache, or None if caching is off or unusable."""
+    global _cache, _cache_failed
+    if _cache is None and CACHE_ENABLED and not _cache_failed:
+        try:
+            _cache = UtteranceCache()
+        except Exception as e:
+            _cache_failed = True
+            print(f"[TTS Cache Error] {e}")
+    return _cache
+
+
+_external_loop = None  # None = untested, False = driver has no external loop
+
+
+def _iterate_loop(tts, stop):
+    """
+    Drive the engine with its external event loop so the utterance can be
+    stopped mid-sentence. Returns False if the driver cannot do that, in
+    which case the caller falls back to (uninterruptible) runAndWait().
+    """
+    global _external_loop
+    if _external_loop is False:
+        return False
     try:
-        print(f"🗣️ Speaking: {text}")
-        engine.say(text)
-        engine.runAndWait()
+        if _external_loop is None:
+            tts.startLoop(False)
+            _external_loop = True
+        while tts.isBusy():
+            if stop.is_set():
+                tts.stop()
+                break
+            tts.iterate()
+            time.sleep(0.01)
+        return True
     except Exception as e:
-        print(f"❌ Speech error: {e}")
-        print(f"(Fallback) {text}")
+        if _external_loop is None:
+            print(f"⚠️ TTS driver has no external loop, speech is not interruptible: {e}")
+            _external_loop = False
+            return False
+        raise
+
+
+_worker = SpeechWorker()
+
+
+def interrupt(clear_queue=False):
+    """Stop whatever is being said right now (barge-in)."""
+    _worker.interrupt(clear_queue)
+
+
+def warm_up(top_n=WARM_UP_PHRASES):
+    """Queue the most frequently spoken phrases for pre-rendering at idle priority."""
+    cache = get_cache()
+    if cache is None:
+        return 0
+    phrases = cache.top_phrases(top_n)
+    for text in phrases:
+        _worker.submit(SpeechHandle(text, PRIORITY_IDLE, render_only=True))
+    return len(phrases)
+
+
+def flush(timeout=None):
+    """Wait until everything queued has been spoken. Returns False on timeout."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while _worker.pending():
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+# === SPEAK FUNCTION ===
+def speak(text: str, priority=PRIORITY_NORMAL, interrupt=False, wait=False):
+    """
+    Queue text for the speech worker and return a SpeechHandle immediately.
+    :param priority: PRIORITY_ALERT pre-empts normal speech; see the PRIORITY_* constants.
+    :param interrupt: cut off the current utterance regardless of priority.
+    :param wait: block until the text has been spoken.
+    """
+    handle = SpeechHandle(text, priority)
+    publish("speech", text=text, priority=priority)
+    sink = getattr(_capture, "sink", None)
+    if sink is not None:
+        spoken, mute, forward = sink
+        spoken.append(text)
+        if forward is not None:
+            forward(text)
+        if mute:
+            handle._finish()
+            return handle
+    print(f"🗣️ Speaking: {text}")
+    _worker.submit(handle, interrupt=interrupt)
+    if wait:
+        handle.wait()
+    return handle
+
+
+def say_and_wait(text: str):
+    """Blocking speak(), for callers that pace themselves on speech output."""
+    speak(text, wait=True)
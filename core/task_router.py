@@ -1,338 +1,746 @@
-from core.speech import speak
+from core.speech import speak, capture_speech
 from core.memory import Memory
-from core.nlp_parser import preprocess
-from memory.context_memory import add_to_memory, list_memory, clear_memory
-from modules.reminder import add_reminder, list_reminders
-from modules.timer import start_timer, cancel_timer
-from modules.file_manager import create_folder, delete_file, search_files, open_folder
-from modules.custom_commands import teach_new_command, execute_custom_command
-from modules import open_apps, browser_automation, spotify_control, system
+from core import nlp_parser
+from core.nlp_parser import normalize
+from core.intent_engine import IntentEngine
+from core.fuzzy_intent import FuzzyIntentIndex
+from core.lazy import lazy_import, is_installed, BackendUnavailable
+from core.events import publish
+from core import recurrence, timeparse
 
 import datetime
 import os
+import time
+import threading
 import subprocess
-import pyautogui
-import psutil
-from dateutil import parser as date_parser
 import re
+import sys
+
+# Feature modules and their third-party backends are imported on first use
+context_memory = lazy_import("memory.context_memory")
+reminder = lazy_import("modules.reminder")
+timer = lazy_import("modules.timer")
+file_manager = lazy_import("modules.file_manager")
+custom_commands = lazy_import("modules.custom_commands")
+open_apps = lazy_import("modules.open_apps")
+browser_automation = lazy_import("modules.browser_automation")
+spotify_control = lazy_import("modules.spotify_control")
+system = lazy_import("modules.system")
+pyautogui = lazy_import("pyautogui")
+psutil = lazy_import("psutil")
 
 memory = Memory()
+engine = IntentEngine()
+_fuzzy = None
+_fuzzy_rules = None
+_fuzzy_lock = threading.Lock()
+
+# Known locations and system tools reachable with "open <key>"
+FILE_PATHS = {
+    "downloads": os.path.join(os.path.expanduser("~"), "Downloads"),
+    "documents": os.path.join(os.path.expanduser("~"), "Documents"),
+    "desktop": os.path.join(os.path.expanduser("~"), "Desktop")
+}
+
+TOOLS = {
+    "control panel": "control",
+    "task manager": "taskmgr",
+    "terminal": "cmd",
+    "powershell": "powershell",
+    "system info": "msinfo32",
+    "registry editor": "regedit",
+    "calculator": "calc",
+    "notepad": "notepad",
+    "paint": "mspaint",
+    "snipping tool": "snippingtool",
+    "file explorer": "explorer",
+    "settings": ["start", "ms-settings:"]
+}
+
+VOLUME_APPS = ["spotify", "brave"]
+
+
+class CommandResult:
+    """Structured outcome of one command: what it routed to, what happened, how long it took."""
+
+    def __init__(self, command: str):
+        self.command = command
+        self.normalized = ""
+        self.intent = None
+        self.arguments = {}
+        self.reason = ""
+        self.outcome = "pending"  # ok | custom | unmatched | unavailable | empty | error
+        self.error = None
+        self.spoken = []
+        self.elapsed = 0.0
+
+    @property
+    def ok(self):
+        return self.outcome in ("ok", "custom")
+
+    def to_dict(self):
+        return {
+            "command": self.command,
+            "normalized": self.normalized,
+            "intent": self.intent,
+            "arguments": self.arguments,
+            "reason": self.reason,
+            "outcome": self.outcome,
+            "error": self.error,
+            "spoken": self.spoken,
+            "elapsed_ms": round(self.elapsed * 1000, 3),
+        }
+
+    def __repr__(self):
+        return f"CommandResult({self.command!r} -> {self.intent}, {self.outcome})"
+
+
+def route(command: str):
+    """Return the IntentMatch an already preprocessed command would be dispatched to."""
+    return engine.match(command)
+
+
+def prewarm(partial: str):
+    """
+    Route a partial transcript while the user is still speaking and import
+    the likely intent's backends in the background, so execution starts warm.
+    """
+    match = engine.match(normalize(partial))
+    if match is None or not match.intent.enabled:
+        return None
+    cold = [name for name in match.intent.requires if not lazy_import(name).loaded]
+    if cold:
+        threading.Thread(target=lambda: [lazy_import(name).available() for name in cold], daemon=True).start()
+    return match
+
+
+def handle_command(command: str) -> CommandResult:
+    result = CommandResult(command)
+    _handle(command, result)
+    return result
+
+
+def _handle(command, result):
+    started = time.perf_counter()
+    try:
+        _route_and_run(command, result)
+    finally:
+        result.elapsed = time.perf_counter() - started
+        publish("command", **result.to_dict())
+
 
-def handle_command(command: str):
-    command = preprocess(command.lower().strip())
+def _route_and_run(command, result):
+    command = normalize(command.lower().strip())
+    result.normalized = command
     if not command:
+        result.outcome = "empty"
         speak("Please say a command.")
         return
 
-    # === APP LAUNCH ===
-    if command.startswith(("open", "start", "launch")):
-        for prefix in ["open", "start", "launch"]:
-            if command.startswith(prefix):
-                app_name = command[len(prefix):].strip()
-                if app_name:
-                    try:
-                        open_apps.launch_app(app_name)
-                        speak(f"Opening {app_name}.")
-                    except Exception as e:
-                        print(f"[App Launch Error] {e}")
-                        speak(f"Failed to open {app_name}.")
-                else:
-                    speak("Please specify the app name.")
-                return
-
-    # === CUSTOM COMMANDS ===
-    if command.startswith("next time i say"):
-        try:
-            parts = command[len("next time i say"):].strip()
-            if "do" in parts:
-                trigger, actions = parts.split("do", 1)
-                trigger = trigger.strip().strip("'\"")
-                actions_list = [a.strip() for a in actions.split(" and ")]
-                teach_new_command(trigger, actions_list)
-                speak(f"Got it. When you say '{trigger}', I will do {', '.join(actions_list)}.")
-            else:
-                speak("Please tell me what to do after the trigger.")
-        except Exception as e:
-            print(f"[Teach Error] {e}")
-            speak("I couldn’t understand that. Try again.")
+    # Taught routines are an exact-match lookup, checked before built-in intents
+    if custom_commands.execute_custom_command(command):
+        result.intent = f"custom:{command}"
+        result.outcome = "custom"
         return
 
-    if execute_custom_command(command):
+    match = engine.match(command)
+    reason = match.reason if match else ""
+    if match is None or match.intent.priority < 0:
+        # Nothing, or only the bare "open <anything>" catch-all, matched: try the closest known trigger
+        guess = fuzzy_match(command)
+        if guess is not None:
+            reason = f"fuzzy '{guess.phrase}' ({guess.score:.2f})"
+            print(f"[Fuzzy] '{command}' -> '{guess.command}' ({guess.score:.2f})")
+            if guess.source == "custom":
+                if custom_commands.execute_custom_command(guess.command):
+                    result.intent = f"custom:{guess.command}"
+                    result.reason = reason
+                    result.outcome = "custom"
+                    return
+            else:
+                match = engine.match(guess.command) or match
+                command = match.command
+    if match is None:
+        result.outcome = "unmatched"
+        speak("Sorry, I didn’t understand that command.")
         return
 
-    # === MEMORY ===
-    if command.startswith("remember that"):
-        info = command[len("remember that"):].strip()
-        if info:
-            add_to_memory(info)
-            speak("Okay, I've remembered that.")
-        else:
-            speak("What would you like me to remember?")
+    print(f"[Intent] {match.name}: {reason}")
+    publish("intent", command=command, intent=match.name, reason=reason)
+    result.intent = match.name
+    result.arguments = {"rest": match.rest, **match.groups}
+    result.reason = reason
+    if not match.intent.enabled:
+        _unavailable(match, result)
         return
-
-    if "clear memory" in command or "delete memory" in command:
-        clear_memory()
-        speak("Memory cleared.")
+    try:
+        match.intent.handler(command, match)
+    except BackendUnavailable as e:
+        engine.disable(match.name, str(e))
+        _unavailable(match, result)
         return
+    result.outcome = "ok"
+
+
+def _unavailable(match, result):
+    result.outcome = "unavailable"
+    result.error = match.intent.disabled_reason
+    print(f"[Intent Disabled] {match.name}: {match.intent.disabled_reason}")
+    speak("Sorry, that feature isn't available on this system.")
+
+
+def fuzzy_index():
+    """
+    The n-gram index of every known trigger, built on first use (and again
+    when nlp_rules.json changes). None if NumPy is not installed.
+    """
+    global _fuzzy, _fuzzy_rules
+    if not is_installed("numpy"):
+        return None
+    with _fuzzy_lock:
+        if _fuzzy is not None and _fuzzy_rules is nlp_parser.rules:
+            return _fuzzy
+        rules = nlp_parser.rules
+        index = FuzzyIntentIndex()
+        for intent in engine.intents.values():
+            if intent.fuzzy:
+                for phrase in intent.phrases + intent.prefixes:
+                    # Also keyed by the normalized form ("start timer" is heard as "open timer")
+                    index.add(phrase, phrase, "intent")
+                    index.add(normalize(phrase), phrase, "intent")
+        for alias, expansion in rules["command_aliases"].items():
+            index.add(alias, expansion, "alias")
+        for trigger in custom_commands.load_custom_commands():
+            index.add(trigger, trigger, "custom")
+        # The fallback prefix now only applies to app names we actually know
+        prefix = rules.get("fallback_prefix") or ""
+        for app in open_apps.load_app_paths():
+            index.add(f"open {app}", f"open {app}", "app")
+            if prefix:
+                index.add(app, f"{prefix}{app}", "app")
+        _fuzzy, _fuzzy_rules = index, rules
+        return index
+
+
+def fuzzy_match(command):
+    """Best FuzzyMatch for an unmatched command, or None."""
+    index = fuzzy_index()
+    return index.best(command) if index is not None else None
+
+
+def handle_commands(commands, speak_output=False):
+    """
+    Run a stream of commands headlessly, yielding a CommandResult for each.
+    Speech is captured into result.spoken; it is only voiced if speak_output is True.
+    Handler errors are recorded on the result instead of stopping the batch.
+    """
+    for command in commands:
+        result = CommandResult(command)
+        with capture_speech(mute=not speak_output) as spoken:
+            try:
+                _handle(command, result)
+            except Exception as e:
+                result.outcome = "error"
+                result.error = f"{type(e).__name__}: {e}"
+        result.spoken = spoken
+        yield result
 
-    if "what do you remember" in command or "what's in memory" in command or "show memory" in command:
-        list_memory()
-        return
 
-    # === REMINDERS ===
-    if "remind me" in command:
-        handle_reminder_command(command)
-        return
+# === APP LAUNCH ===
+# Lowest priority: any more specific "open ..." intent wins over a bare launch.
 
-    if "what are my reminders" in command or "list reminders" in command or "upcoming reminders" in command:
-        list_reminders()
-        return
+@engine.intent("app.launch", prefixes=("open", "start", "launch"), priority=-1, fuzzy=False)
+def launch_app(command, match):
+    app_name = match.rest
+    if app_name:
+        try:
+            open_apps.launch_app(app_name)
+            speak(f"Opening {app_name}.")
+        except Exception as e:
+            print(f"[App Launch Error] {e}")
+            speak(f"Failed to open {app_name}.")
+    else:
+        speak("Please specify the app name.")
 
-    # === TIMER ===
-    if "start timer" in command or "start countdown" in command:
-        match = re.search(r"\b(\d+)\s*(minute|minutes)?", command)
-        minutes = int(match.group(1)) if match else 1
-        start_timer(minutes)
-        speak(f"Timer started for {minutes} minute{'s' if minutes != 1 else ''}.")
-        return
 
-    if "cancel timer" in command or "stop timer" in command:
-        cancel_timer()
-        speak("Timer cancelled.")
-        return
+# === CUSTOM COMMANDS ===
 
-    # === BATTERY / TIME / DATE ===
-    if "battery" in command:
-        battery = psutil.sensors_battery()
-        if battery:
-            plugged = "plugged in" if battery.power_plugged else "not plugged in"
-            speak(f"Battery is at {battery.percent} percent and is {plugged}.")
+@engine.intent("custom.teach", prefixes=("next time i say",))
+def teach_command(command, match):
+    try:
+        parts = match.rest
+        if "do" in parts:
+            trigger, actions = parts.split("do", 1)
+            trigger = trigger.strip().strip("'\"")
+            actions_list = [a.strip() for a in actions.split(" and ")]
+            custom_commands.teach_new_command(trigger, actions_list)
+            if _fuzzy is not None:
+                _fuzzy.add(trigger, trigger, "custom")
+            speak(f"Got it. When you say '{trigger}', I will do {', '.join(actions_list)}.")
         else:
-            speak("Couldn't get battery info.")
-        return
+            speak("Please tell me what to do after the trigger.")
+    except Exception as e:
+        print(f"[Teach Error] {e}")
+        speak("I couldn’t understand that. Try again.")
 
-    if "time" in command:
-        now = datetime.datetime.now()
-        speak(f"The current time is {now.strftime('%I:%M %p')}.")
-        return
 
-    if "date" in command:
-        today = datetime.datetime.now()
-        speak(f"Today's date is {today.strftime('%B %d, %Y')}.")
-        return
+# === MEMORY ===
 
-    # === SCREENSHOT ===
-    if "take screenshot" in command or "capture screen" in command:
-        try:
-            os.makedirs("screenshots", exist_ok=True)
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            path = f"screenshots/screenshot_{timestamp}.png"
-            pyautogui.screenshot(path)
-            speak(f"Screenshot saved as {path}.")
-        except Exception as e:
-            print(f"❌ Screenshot error: {e}")
-            speak("Failed to take screenshot.")
-        return
+@engine.intent("memory.remember", prefixes=("remember that",))
+def remember(command, match):
+    info = match.rest
+    if info:
+        context_memory.add_to_memory(info)
+    else:
+        speak("What would you like me to remember?")
 
-    # === SYSTEM ACTIONS ===
-    if any(k in command for k in ["shutdown", "restart", "lock", "sleep", "hibernate", "cancel shutdown"]):
-        try:
-            system.handle_system_command(command)
-            speak("System command executed.")
-        except Exception as e:
-            print(f"[System Command Error] {e}")
-            speak("Failed to execute system command.")
-        return
 
-    # === VOLUME CONTROLS ===
-    if "set volume to" in command:
-        try:
-            level_str = command.split("set volume to")[-1].replace("%", "").strip()
-            level = int(level_str)
-            system.set_master_volume(level)
-            speak(f"Volume set to {level} percent.")
-        except Exception:
-            speak("Please say a valid volume level.")
-        return
+@engine.intent("memory.remember_pinned", prefixes=("remember forever that", "always remember that"))
+def remember_pinned(command, match):
+    if match.rest:
+        context_memory.add_to_memory(match.rest, pinned=True)
+    else:
+        speak("What should I never forget?")
 
-    if "mute system" in command:
-        system.mute_system(True)
-        speak("System muted.")
-        return
 
-    if "unmute system" in command:
-        system.mute_system(False)
-        speak("System unmuted.")
-        return
+RETENTION_UNITS = {"hour": 1 / 24, "day": 1, "week": 7, "month": 30, "year": 365}
 
-    for app in ["spotify", "brave"]:
-        if f"set {app} volume to" in command:
-            try:
-                level_str = command.split(f"set {app} volume to")[-1].replace("%", "").strip()
-                level = int(level_str)
-                system.set_app_volume(app, level)
-                speak(f"{app.capitalize()} volume set to {level} percent.")
-            except Exception:
-                speak("Please say a valid volume level.")
-            return
 
-        if f"mute {app}" in command:
-            system.mute_app(app, True)
-            speak(f"{app.capitalize()} muted.")
-            return
+@engine.intent("memory.remember_for", prefixes=("remember for",),
+               pattern=r"^remember for (?P<amount>\d+|a|an|one) (?P<unit>hour|day|week|month|year)s? that (?P<info>.+)")
+def remember_for(command, match):
+    amount = match.groups["amount"]
+    days = (int(amount) if amount.isdigit() else 1) * RETENTION_UNITS[match.groups["unit"]]
+    expires = (datetime.datetime.now() + datetime.timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+    context_memory.add_to_memory(match.groups["info"], expires=expires)
 
-        if f"unmute {app}" in command:
-            system.mute_app(app, False)
-            speak(f"{app.capitalize()} unmuted.")
-            return
 
-    # === FILE MANAGEMENT ===
-    if "create folder" in command:
-        parts = command.split("create folder")[-1].strip()
-        if " in " in parts:
-            folder, location = parts.split(" in ", 1)
-            create_folder(folder.strip(), location.strip())
-            speak(f"Created folder {folder.strip()} in {location.strip()}.")
-        else:
-            create_folder(parts.strip())
-            speak(f"Created folder {parts.strip()}.")
-        return
+@engine.intent("memory.pin", prefixes=("pin memory about", "pin the memory about"))
+def pin_memory(command, match):
+    if match.rest:
+        context_memory.pin_memory(match.rest)
+    else:
+        speak("Which memory should I keep forever?")
 
-    if "delete" in command:
-        parts = command.split("delete")[-1].strip()
-        if " from " in parts:
-            filename, location = parts.split(" from ", 1)
-            delete_file(filename.strip(), location.strip())
-            speak(f"Deleted {filename.strip()} from {location.strip()}.")
-        else:
-            delete_file(parts.strip())
-            speak(f"Deleted {parts.strip()}.")
-        return
 
-    if "search" in command and "file" in command:
-        parts = command.split("search for")[-1].strip()
-        if " in " in parts:
-            ext, location = parts.split(" in ", 1)
-            search_files(ext.strip(), location.strip())
-            speak(f"Searching for {ext.strip()} files in {location.strip()}.")
-        else:
-            search_files(parts.strip())
-            speak(f"Searching for {parts.strip()} files.")
-        return
+@engine.intent("memory.unpin", prefixes=("unpin memory about", "unpin the memory about"))
+def unpin_memory(command, match):
+    if match.rest:
+        context_memory.pin_memory(match.rest, pinned=False)
+    else:
+        speak("Which memory should I unpin?")
 
-    if "open folder" in command:
-        folder = command.split("open folder")[-1].strip()
-        open_folder(folder)
-        speak(f"Opened folder {folder}.")
-        return
 
-    # === KNOWN FILE LOCATIONS ===
-    file_paths = {
-        "downloads": os.path.join(os.path.expanduser("~"), "Downloads"),
-        "documents": os.path.join(os.path.expanduser("~"), "Documents"),
-        "desktop": os.path.join(os.path.expanduser("~"), "Desktop")
-    }
-    for key, path in file_paths.items():
-        if f"open {key}" in command:
-            try:
-                os.startfile(path)
-                speak(f"Opened {key}.")
-            except Exception as e:
-                print(f"[Open Folder Error] {e}")
-                speak(f"Failed to open {key}.")
-            return
+@engine.intent("memory.clear", phrases=("clear memory", "delete memory"), fuzzy=False)
+def forget_all(command, match):
+    context_memory.clear_memory()
+    speak("Memory cleared.")
 
-    # === SYSTEM TOOLS ===
-    tools = {
-        "control panel": "control",
-        "task manager": "taskmgr",
-        "terminal": "cmd",
-        "powershell": "powershell",
-        "system info": "msinfo32",
-        "registry editor": "regedit",
-        "calculator": "calc",
-        "notepad": "notepad",
-        "paint": "mspaint",
-        "snipping tool": "snippingtool",
-        "file explorer": "explorer",
-        "settings": ["start", "ms-settings:"]
-    }
-    for key, cmd in tools.items():
-        if f"open {key}" in command:
-            try:
-                subprocess.Popen(cmd)
-                speak(f"Opened {key}.")
-            except Exception as e:
-                print(f"[Open Tool Error] {e}")
-                speak(f"Failed to open {key}.")
-            return
 
-    # === SPOTIFY CONTROLS ===
-    if "pause spotify" in command:
-        spotify_control.pause()
-        speak("Spotify paused.")
-        return
+@engine.intent("memory.dedupe", phrases=("remove duplicate memories", "deduplicate memory"), fuzzy=False)
+def forget_duplicates(command, match):
+    context_memory.remove_duplicates()
 
-    if "play spotify" in command:
-        spotify_control.play()
-        speak("Spotify playing.")
-        return
 
-    if "next song" in command:
-        spotify_control.next_track()
-        speak("Playing next song.")
-        return
+@engine.intent("memory.cleanup", phrases=("clean up memory", "compact memory", "tidy up memory"), fuzzy=False)
+def clean_up_memory(command, match):
+    context_memory.clean_up_memory()
 
-    if "previous song" in command:
-        spotify_control.previous_track()
-        speak("Playing previous song.")
-        return
 
-    if "play song" in command:
-        song = command.replace("play song", "").strip()
-        if song:
-            spotify_control.play_song(song)
-            speak(f"Playing song {song}.")
-        else:
-            speak("What song do you want me to play?")
-        return
+@engine.intent("memory.list", phrases=("what do you remember", "what's in memory", "show memory",
+                                       "what did i remember", "what did i tell you"))
+def recall_all(command, match):
+    context_memory.list_memory(match.rest)
 
-    # === BROWSER AUTOMATION ===
-    if "search" in command:
-        browser_automation.handle_search_command(command)
-        return
 
-    if "youtube" in command and "play" in command:
-        browser_automation.play_youtube_video(command)
-        return
+@engine.intent("memory.more", phrases=("more memories", "next memories"))
+def recall_more(command, match):
+    context_memory.more_memories()
 
-    if "open" in command and ".com" in command:
-        browser_automation.open_custom_website(command)
-        return
 
-    # === FALLBACK ===
-    speak("Sorry, I didn’t understand that command.")
+# Longer than "what do you remember", so it wins when there is a topic
+@engine.intent("memory.search", phrases=("what do you remember about", "what do you know about",
+                                         "what did i tell you about", "do you remember"))
+def recall_search(command, match):
+    if match.rest:
+        context_memory.search_memory(match.rest)
+    else:
+        context_memory.list_memory()
 
 
-def handle_reminder_command(command):
+# === REMINDERS ===
+
+@engine.intent("reminder.add", phrases=("remind me",))
+def reminder_add(command, match):
+    handle_reminder_command(command)
+
+
+@engine.intent("reminder.list", phrases=("what are my reminders", "list reminders", "upcoming reminders"))
+def reminder_list(command, match):
+    reminder.list_reminders(match.rest)
+
+
+# === TIMER ===
+
+# Words around "timer" that are not part of its name ("start the pasta timer")
+TIMER_FILLER = {"a", "an", "the", "my", "new", "another", "start", "open", "set", "cancel", "stop", "delete",
+                "remove", "clear", "pause", "resume", "continue", "unpause", "how", "much", "long", "time",
+                "is", "left", "on", "in", "of", "for", "what", "whats", "what's", "and", "up", "to", "please"}
+TIMER_ACTIONS = r"\b(?:cancel|stop|delete|remove|clear|pause|resume|continue|unpause)\b"
+
+
+def timer_name(command, noun="timer"):
+    """"pasta" in "start the pasta timer for 10 minutes"; None for a plain "timer"."""
+    found = re.search(rf"\b{noun}s?\s+(?:called|named)\s+([\w' -]+?)(?:\s+for\b|$)", command)
+    if found:
+        return found.group(1).strip()
+    duration = timeparse.parse_duration(command)
+    if duration:
+        start, end = duration[1]
+        command = command[:start] + " " + command[end:]
+    before = re.split(rf"\b{noun}s?\b", command, 1)[0].split()
+    words = []
+    for word in reversed(before):
+        if word in TIMER_FILLER or word.isdigit():
+            break
+        words.insert(0, word)
+    return " ".join(words[-3:]) or None
+
+
+@engine.intent("timer.start", phrases=("start timer", "start countdown", "timer"))
+def timer_start(command, match):
+    duration = timeparse.parse_duration(command)
+    timer.start_timer(command[slice(*duration[1])] if duration else match.rest or "1 min", timer_name(command))
+
+
+@engine.intent("timer.cancel", phrases=("cancel timer", "stop timer", "timer", "timers"),
+               pattern=r"\b(?:cancel|stop|delete|remove|clear)\b", priority=1)
+def timer_cancel(command, match):
+    name = "all" if re.search(r"\ball\b.*\btimers\b", command) else timer_name(command)
+    timer.cancel_timer(name)
+
+
+@engine.intent("timer.pause", phrases=("timer",), pattern=r"\bpause\b", priority=1)
+def timer_pause(command, match):
+    timer.pause_timer(timer_name(command))
+
+
+@engine.intent("timer.resume", phrases=("timer",), pattern=r"\b(?:resume|continue|unpause)\b", priority=1)
+def timer_resume(command, match):
+    timer.resume_timer(timer_name(command))
+
+
+@engine.intent("timer.status", phrases=("timer", "time left", "time is left", "how long left"),
+               pattern=r"\b(?:how (?:much|long)|time left|left on|remaining)\b", priority=1)
+def timer_status(command, match):
+    timer.timer_status(timer_name(command))
+
+
+@engine.intent("timer.list", phrases=("list timers", "what timers", "my timers", "timers running"), priority=1)
+def timer_list(command, match):
+    timer.list_timers()
+
+
+@engine.intent("stopwatch.start", phrases=("start stopwatch", "start the stopwatch", "stopwatch"))
+def stopwatch_start(command, match):
+    timer.start_stopwatch(timer_name(command, "stopwatch"))
+
+
+@engine.intent("stopwatch.stop", phrases=("stop stopwatch", "stop the stopwatch", "stopwatch"),
+               pattern=r"\b(?:stop|end|finish)\b", priority=1)
+def stopwatch_stop(command, match):
+    timer.stop_stopwatch(timer_name(command, "stopwatch"))
+
+
+@engine.intent("stopwatch.pause", phrases=("stopwatch",), pattern=r"\bpause\b", priority=1)
+def stopwatch_pause(command, match):
+    timer.pause_stopwatch(timer_name(command, "stopwatch"))
+
+
+@engine.intent("stopwatch.status", phrases=("stopwatch",), pattern=r"\b(?:how (?:much|long)|elapsed|time on)\b",
+               priority=1)
+def stopwatch_status(command, match):
+    timer.stopwatch_status(timer_name(command, "stopwatch"))
+
+
+# === BATTERY / TIME / DATE ===
+
+@engine.intent("status.battery", phrases=("battery",), requires=("psutil",))
+def battery_status(command, match):
+    battery = psutil.sensors_battery()
+    if battery:
+        plugged = "plugged in" if battery.power_plugged else "not plugged in"
+        speak(f"Battery is at {battery.percent} percent and is {plugged}.")
+    else:
+        speak("Couldn't get battery info.")
+
+
+@engine.intent("status.time", phrases=("time",))
+def tell_time(command, match):
+    now = datetime.datetime.now()
+    speak(f"The current time is {now.strftime('%I:%M %p')}.")
+
+
+@engine.intent("status.date", phrases=("date",))
+def tell_date(command, match):
+    today = datetime.datetime.now()
+    speak(f"Today's date is {today.strftime('%B %d, %Y')}.")
+
+
+# === SCREENSHOT ===
+
+@engine.intent("screenshot", phrases=("take screenshot", "capture screen"), requires=("pyautogui",))
+def screenshot(command, match):
     try:
-        if "remind me to" in command:
-            parts = command.split("remind me to")[1].strip()
-            if " at " in parts:
-                task, time_str = parts.rsplit(" at ", 1)
-            elif " tomorrow " in parts:
-                task, time_str = parts.split(" tomorrow ", 1)
-                time_str = "tomorrow " + time_str
-            else:
-                speak("Please include a time for the reminder.")
-                return
+        os.makedirs("screenshots", exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = f"screenshots/screenshot_{timestamp}.png"
+        pyautogui.screenshot(path)
+        speak(f"Screenshot saved as {path}.")
+    except Exception as e:
+        print(f"❌ Screenshot error: {e}")
+        speak("Failed to take screenshot.")
 
-            reminder_time = date_parser.parse(time_str, fuzzy=True)
-            formatted = reminder_time.strftime("%Y-%m-%d %H:%M")
-            add_reminder(task.strip(), formatted)
-            speak(f"Reminder set for {task.strip()} at {reminder_time.strftime('%I:%M %p on %B %d')}.")
-        else:
+
+# === SYSTEM ACTIONS ===
+
+@engine.intent("system.power", phrases=("shutdown", "restart", "lock", "sleep", "hibernate", "cancel shutdown"),
+               fuzzy=False)
+def power_action(command, match):
+    try:
+        system.handle_system_command(command)
+        speak("System command executed.")
+    except Exception as e:
+        print(f"[System Command Error] {e}")
+        speak("Failed to execute system command.")
+
+
+# === VOLUME CONTROLS ===
+
+@engine.intent("volume.set", phrases=("set volume to",), requires=("pycaw", "comtypes"))
+def volume_set(command, match):
+    try:
+        level = int(match.rest.replace("%", "").strip())
+        system.set_master_volume(level)
+        speak(f"Volume set to {level} percent.")
+    except Exception:
+        speak("Please say a valid volume level.")
+
+
+@engine.intent("volume.mute", phrases=("mute system",), requires=("pycaw", "comtypes"))
+def volume_mute(command, match):
+    system.mute_system(True)
+    speak("System muted.")
+
+
+@engine.intent("volume.unmute", phrases=("unmute system",), requires=("pycaw", "comtypes"))
+def volume_unmute(command, match):
+    system.mute_system(False)
+    speak("System unmuted.")
+
+
+@engine.intent("volume.app_set", phrases=tuple(f"set {app} volume to" for app in VOLUME_APPS),
+               pattern=r"set (?P<app>\w+) volume to", requires=("pycaw", "comtypes"))
+def app_volume_set(command, match):
+    app = match.groups["app"]
+    try:
+        level = int(match.rest.replace("%", "").strip())
+        system.set_app_volume(app, level)
+        speak(f"{app.capitalize()} volume set to {level} percent.")
+    except Exception:
+        speak("Please say a valid volume level.")
+
+
+@engine.intent("volume.app_mute", phrases=tuple(f"mute {app}" for app in VOLUME_APPS),
+               pattern=r"\bmute (?P<app>\w+)", requires=("pycaw", "comtypes"))
+def app_mute(command, match):
+    app = match.groups["app"]
+    system.mute_app(app, True)
+    speak(f"{app.capitalize()} muted.")
+
+
+@engine.intent("volume.app_unmute", phrases=tuple(f"unmute {app}" for app in VOLUME_APPS),
+               pattern=r"\bunmute (?P<app>\w+)", requires=("pycaw", "comtypes"))
+def app_unmute(command, match):
+    app = match.groups["app"]
+    system.mute_app(app, False)
+    speak(f"{app.capitalize()} unmuted.")
+
+
+# === FILE MANAGEMENT ===
+
+@engine.intent("file.create_folder", phrases=("create folder",))
+def file_create_folder(command, match):
+    parts = match.rest
+    if " in " in parts:
+        folder, location = parts.split(" in ", 1)
+        file_manager.create_folder(folder.strip(), location.strip())
+        speak(f"Created folder {folder.strip()} in {location.strip()}.")
+    else:
+        file_manager.create_folder(parts.strip())
+        speak(f"Created folder {parts.strip()}.")
+
+
+@engine.intent("file.delete", phrases=("delete",), fuzzy=False)
+def file_delete(command, match):
+    parts = match.rest
+    if " from " in parts:
+        filename, location = parts.split(" from ", 1)
+        file_manager.delete_file(filename.strip(), location.strip())
+        speak(f"Deleted {filename.strip()} from {location.strip()}.")
+    else:
+        file_manager.delete_file(parts.strip())
+        speak(f"Deleted {parts.strip()}.")
+
+
+# Same trigger as browser.search, but only when a file is mentioned
+@engine.intent("file.search", phrases=("search",), pattern=r"\bfiles?\b", priority=1)
+def file_search(command, match):
+    parts = command.split("search for")[-1].strip()
+    if " in " in parts:
+        ext, location = parts.split(" in ", 1)
+        file_manager.search_files(ext.strip(), location.strip())
+        speak(f"Searching for {ext.strip()} files in {location.strip()}.")
+    else:
+        file_manager.search_files(parts.strip())
+        speak(f"Searching for {parts.strip()} files.")
+
+
+@engine.intent("file.open_folder", phrases=("open folder",))
+def file_open_folder(command, match):
+    folder = match.rest
+    file_manager.open_folder(folder)
+    speak(f"Opened folder {folder}.")
+
+
+# === KNOWN FILE LOCATIONS ===
+
+@engine.intent("file.open_location", phrases=tuple(f"open {key}" for key in FILE_PATHS))
+def open_location(command, match):
+    key = match.trigger[len("open "):]
+    try:
+        os.startfile(FILE_PATHS[key])
+        speak(f"Opened {key}.")
+    except Exception as e:
+        print(f"[Open Folder Error] {e}")
+        speak(f"Failed to open {key}.")
+
+
+# === SYSTEM TOOLS ===
+
+@engine.intent("tool.open", phrases=tuple(f"open {key}" for key in TOOLS))
+def open_tool(command, match):
+    key = match.trigger[len("open "):]
+    try:
+        subprocess.Popen(TOOLS[key])
+        speak(f"Opened {key}.")
+    except Exception as e:
+        print(f"[Open Tool Error] {e}")
+        speak(f"Failed to open {key}.")
+
+
+# === SPOTIFY CONTROLS ===
+
+@engine.intent("spotify.pause", phrases=("pause spotify",), requires=("spotipy",))
+def spotify_pause(command, match):
+    spotify_control.pause()
+    speak("Spotify paused.")
+
+
+@engine.intent("spotify.play", phrases=("play spotify",), requires=("spotipy",))
+def spotify_play(command, match):
+    spotify_control.play()
+    speak("Spotify playing.")
+
+
+@engine.intent("spotify.next", phrases=("next song",), requires=("spotipy",))
+def spotify_next(command, match):
+    spotify_control.next_track()
+    speak("Playing next song.")
+
+
+@engine.intent("spotify.previous", phrases=("previous song",), requires=("spotipy",))
+def spotify_previous(command, match):
+    spotify_control.previous_track()
+    speak("Playing previous song.")
+
+
+@engine.intent("spotify.play_song", phrases=("play song",), requires=("spotipy",))
+def spotify_play_song(command, match):
+    song = match.rest
+    if song:
+        spotify_control.play_song(song)
+        speak(f"Playing song {song}.")
+    else:
+        speak("What song do you want me to play?")
+
+
+# === BROWSER AUTOMATION ===
+
+@engine.intent("browser.search", phrases=("search",))
+def browser_search(command, match):
+    browser_automation.handle_search_command(command)
+
+
+@engine.intent("browser.youtube", phrases=("youtube",), pattern=r"\bplay\b")
+def browser_youtube(command, match):
+    browser_automation.play_youtube_video(command)
+
+
+@engine.intent("browser.website", phrases=(".com",), pattern=r"\bopen\b")
+def browser_website(command, match):
+    browser_automation.open_custom_website(command)
+
+
+def handle_reminder_command(command):
+    try:
+        if recurrence.spoken_rule(command):
+            handle_recurring_reminder(command)
+            return
+        if "remind me" not in command:
             speak("I didn't catch the reminder task.")
+            return
+        found = timeparse.parse_when(command.split("remind me", 1)[1])
+        if found is None:
+            speak("Please include a time for the reminder.")
+            return
+        task = re.sub(r"^to\s+", "", found.rest)
+        if not task:
+            speak("I didn't catch the reminder task.")
+            return
+        reminder.add_reminder(task, reminder.format_reminder_time(found.when))
     except Exception as e:
         print(f"[Reminder Error] {e}")
         speak("There was an issue setting your reminder.")
+
+
+def handle_recurring_reminder(command):
+    """Recurring reminders: "remind me to stretch every weekday at 9", "remind me every 20 minutes to drink water"."""
+    text = command.split("remind me", 1)[1]
+    hour, minute, spans = timeparse.time_of_day(text) or (timeparse.DEFAULT_HOUR, 0, [])
+    at = bool(spans)
+    now = datetime.datetime.now()
+    rule, span = recurrence.spoken_rule(text, hour, minute, now.day)
+    task = re.sub(r"^to\s+", "", timeparse.without_spans(text, spans + [span]))
+    if not task:
+        speak("I didn't catch the reminder task.")
+        return
+
+    repeat = recurrence.parse_rule(rule)
+    if repeat.interval is None:
+        first = repeat.next_after(now)
+    elif at:
+        first = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if first <= now:
+            first = repeat.next_after(first, now)
+    else:
+        first = (now + repeat.interval).replace(second=0, microsecond=0)
+    reminder.add_reminder(task, reminder.format_reminder_time(first), rule)
+
+
+engine.compile()
+_disabled = engine.check_requirements()
+if _disabled:
+    # stderr: this runs at import, before --batch has redirected stdout
+    print(f"⚠️ Disabled {len(_disabled)} intent(s) with missing backends: {', '.join(sorted(_disabled))}",
+          file=sys.stderr)
@@ -1,31 +1,19 @@
-import json
 import os
 
+from core.datastore import json_file
+
 COMMAND_FILE = os.path.join("data", "custom_commands.json")
+commands_file = json_file(COMMAND_FILE, default={})
 
 # === File Utilities ===
 
-def ensure_command_file():
-    """Ensure the custom command file exists and is properly initialized."""
-    os.makedirs(os.path.dirname(COMMAND_FILE), exist_ok=True)
-    if not os.path.exists(COMMAND_FILE):
-        with open(COMMAND_FILE, "w", encoding="utf-8") as f:
-            json.dump({}, f)
-
 def load_custom_commands():
-    """Load all custom commands from JSON file."""
-    ensure_command_file()
-    try:
-        with open(COMMAND_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data if isinstance(data, dict) else {}
-    except json.JSONDecodeError:
-        return {}
+    """Load all custom commands (cached; re-read only when the file changes)."""
+    return commands_file.read()
 
 def save_custom_commands(data):
     """Save updated custom commands to file."""
-    with open(COMMAND_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    commands_file.write(data)
 
 # === Core Functions ===
 
@@ -0,0 +1,261 @@
+# core/timeparse.py
+#
+# Spoken time expressions for reminders and timers, matched by a handful of
+# regexes compiled once at import:
+#
+#   durations     "90 seconds", "1 hour 20 minutes", "2h30m", "an hour and a half"
+#   relative      "in 20 minutes", "half an hour from now"
+#   days          "today", "tomorrow", "the day after tomorrow", "(next) friday"
+#   clock times   "at 9", "7:30 pm", "5 o'clock", "noon", "midnight"
+#   parts of day  "morning", "this afternoon", "in the evening", "tonight"
+#
+# Text is lowercased once and matched without re.I, which halves the cost
+# of every search. Anything else falls back to dateutil's fuzzy parser
+# when it is installed.
+
+import re
+import datetime
+
+from core.lazy import lazy_import, is_installed
+
+date_parser = lazy_import("dateutil.parser")
+relativedelta = lazy_import("dateutil.relativedelta")
+
+_ONES = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+_TENS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50}
+WORD_NUMBERS = {
+    "a": 1, "an": 1, "a couple of": 2, "a few": 3,
+    **{word: i + 1 for i, word in enumerate(_ONES)},
+    "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19, "sixty": 60, "ninety": 90,
+    **_TENS,
+}
+UNIT_SECONDS = {"w": 604800, "d": 86400, "h": 3600, "m": 60, "s": 1}
+PARTS_OF_DAY = {"morning": 9, "afternoon": 15, "evening": 18, "night": 20, "tonight": 20}
+NAMED_TIMES = {"noon": 12, "midday": 12, "midnight": 0}
+DEFAULT_HOUR = 9   # "tomorrow", "on friday" with no time of day
+
+_NUM = "|".join(
+    [r"\d+(?:\.\d+)?", rf"(?:{'|'.join(_TENS)})[\s-](?:{'|'.join(_ONES)})"]
+    + [re.escape(w).replace(r"\ ", r"\s+") for w in sorted(WORD_NUMBERS, key=len, reverse=True)]
+)
+_UNIT = r"(?:weeks?|wks?|days?|hours?|hrs?|h|minutes?|mins?|m|seconds?|secs?|s)(?![a-z])"
+_PART = (rf"(?:(?:{_NUM})\s*{_UNIT}(?:\s+and\s+a\s+half)?"
+         r"|half\s+an?\s+(?:hour|minute)|(?:a\s+)?quarter\s+(?:of\s+an\s+)?hour)")
+_DURATION = rf"(?<![\w.]){_PART}(?:(?:\s*,\s*|\s+and\s+|\s*){_PART})*"
+
+PART_RE = re.compile(
+    rf"(?P<num>{_NUM})\s*(?P<unit>{_UNIT})(?P<half>\s+and\s+a\s+half)?"
+    r"|half\s+an?\s+(?P<half_unit>hour|minute)|(?P<quarter>(?:a\s+)?quarter\s+(?:of\s+an\s+)?hour)"
+)
+DURATION_RE = re.compile(_DURATION)
+AHEAD_RE = re.compile(rf"\b(?:in|after)\s+(?P<duration>{_DURATION})")
+LATER_RE = re.compile(rf"(?P<duration>{_DURATION})\s+(?:from\s+now|later)\b")
+
+_WEEKDAY_NAMES = r"monday|tuesday|wednesday|thursday|friday|saturday|sunday|tues|weds|thurs"
+DAY_RE = re.compile(
+    r"\b(?:(?:on|this|coming|(?P<next>next))\s+)?"
+    r"(?:(?P<after>(?:the\s+)?day\s+after\s+tomorrow)|(?P<day>today|tomorrow)"
+    rf"|(?P<weekday>{_WEEKDAY_NAMES}))\b"
+)
+CLOCK_RE = re.compile(
+    r"\b(?:(?:at|by)\s+)?(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*"
+    r"(?:(?P<meridiem>[ap])\.?\s?m\b\.?|o'?\s?clock\b)"
+    r"|\b(?:at|by)\s+(?P<at_hour>\d{1,2})(?::(?P<at_minute>\d{2}))?\b(?![:.]\d|\s*%)"
+    rf"(?!\s*(?:{_UNIT}|percent))"
+    r"|\b(?P<h24>\d{1,2}):(?P<m24>\d{2})\b"
+    r"|\b(?:(?:at|by)\s+)?(?P<named>noon|midday|midnight)\b"
+)
+PART_OF_DAY_RE = re.compile(
+    r"\b(?:(?:this|in\s+the|at|on)\s+)?(?P<part>morning|afternoon|evening|night|tonight)\b")
+_DANGLING_RE = re.compile(r"^(?:(?:at|on|in|by|for)(?:\s+the)?\s+)+|(?:\s+(?:at|on|in|by|for)(?:\s+the)?)+$", re.I)
+
+
+def _number(text):
+    text = " ".join(text.replace("-", " ").split())
+    if text in WORD_NUMBERS:
+        return WORD_NUMBERS[text]
+    if " " in text:
+        tens, ones = text.split()
+        return _TENS[tens] + _ONES.index(ones) + 1
+    return float(text)
+
+
+def duration_seconds(text):
+    """Total seconds of a duration phrase matched by DURATION_RE."""
+    total = 0.0
+    for m in PART_RE.finditer(text):
+        if m.group("quarter"):
+            total += 900
+        elif m.group("half_unit"):
+            total += UNIT_SECONDS[m.group("half_unit")[0]] / 2
+        else:
+            amount = _number(m.group("num")) + (0.5 if m.group("half") else 0)
+            total += amount * UNIT_SECONDS[m.group("unit")[0]]
+    return int(round(total))
+
+
+def parse_duration(text):
+    """(seconds, (start, end)) for the first duration in text ("1 hour 20 minutes"), or None."""
+    m = DURATION_RE.search(text.lower())
+    if not m:
+        return None
+    seconds = duration_seconds(m.group())
+    return (seconds, m.span()) if seconds > 0 else None
+
+
+def _clock(m):
+    """(hour, minute, meridiem) from a CLOCK_RE match, or None if out of range."""
+    if m.group("named"):
+        return NAMED_TIMES[m.group("named")], 0, "n"
+    hour = m.group("hour") or m.group("at_hour") or m.group("h24")
+    minute = m.group("minute") or m.group("at_minute") or m.group("m24") or 0
+    hour, minute = int(hour), int(minute)
+    meridiem = m.group("meridiem") or ""
+    if meridiem == "p" and hour < 12:
+        hour += 12
+    elif meridiem == "a" and hour == 12:
+        hour = 0
+    if m.group("h24") and hour > 12:
+        meridiem = "n"  # "19:30" needs no am/pm guess
+    if hour > 23 or minute > 59 or (meridiem in ("a", "p") and not 1 <= int(m.group("hour")) <= 12):
+        return None
+    return hour, minute, meridiem
+
+
+def _time_of_day(text):
+    clock = CLOCK_RE.search(text)
+    parsed = _clock(clock) if clock else None
+    part = PART_OF_DAY_RE.search(text)
+    part_name = part.group("part") if part else None
+    if parsed is None:
+        if part_name is None:
+            return None
+        return PARTS_OF_DAY[part_name], 0, [part.span()], False
+    hour, minute, meridiem = parsed
+    if not meridiem and hour < 12 and part_name in ("afternoon", "evening", "night", "tonight"):
+        hour += 12
+    spans = [clock.span()] + ([part.span()] if part else [])
+    return hour, minute, spans, not meridiem and part is None
+
+
+def time_of_day(text):
+    """(hour, minute, [spans]) for "at 7:30 pm", "in the evening", "at 6 in the morning"...; None if absent."""
+    found = _time_of_day(text.lower())
+    return found[:3] if found else None
+
+
+class TimeExpression:
+    """A parsed time: when, the text left once the time words are removed, and which parser matched."""
+
+    def __init__(self, when, rest, method):
+        self.when = when
+        self.rest = rest
+        self.method = method
+
+    def __repr__(self):
+        return f"TimeExpression({self.when!r}, rest={self.rest!r}, method={self.method!r})"
+
+
+def without_spans(text, spans):
+    """text with the (start, end) spans cut out (overlaps allowed) and dangling "at"/"on"/... trimmed."""
+    kept, position = [], 0
+    for start, end in sorted(spans):
+        kept.append(text[position:start])
+        position = max(position, end)
+    kept.append(text[position:])
+    return _DANGLING_RE.sub("", " ".join(" ".join(kept).split()))
+
+
+def parse_when(text, now=None, fallback=True):
+    """
+    TimeExpression for the first time expression in text, or None.
+
+    Relative offsets win; otherwise a day, clock time and part of day are
+    combined ("next friday evening", "tomorrow at 7:30 pm"). A time that
+    has already passed moves to its next occurrence, changing only what
+    was not said: "at 5" at noon is 5 pm, "today" with no time is the next
+    whole hour, "on the 1st" is next month's. dateutil's fuzzy parser is
+    the last resort.
+    """
+    now = (now or datetime.datetime.now()).replace(microsecond=0)
+    original, text = text, text.lower()
+    if len(text) != len(original):
+        original = text  # spans index the lowered text
+    relative = AHEAD_RE.search(text)
+    if relative is None and ("from now" in text or "later" in text):
+        relative = LATER_RE.search(text)
+    if relative:
+        seconds = duration_seconds(relative.group("duration"))
+        if seconds > 0:
+            return TimeExpression(now + datetime.timedelta(seconds=seconds),
+                                  without_spans(original, [relative.span()]), "grammar")
+
+    day = DAY_RE.search(text)
+    at = _time_of_day(text)
+    if day is None and at is None:
+        return _fallback(original, now) if fallback else None
+
+    spans = list(at[2]) if at else []
+    date = now.date()
+    if day is not None:
+        spans.append(day.span())
+        if day.group("after"):
+            date += datetime.timedelta(days=2)
+        elif day.group("day") == "tomorrow":
+            date += datetime.timedelta(days=1)
+        elif day.group("weekday"):
+            weekday = next(i for i, name in enumerate(_WEEKDAY_NAMES.split("|")[:7])
+                           if name.startswith(day.group("weekday")[:3]))
+            ahead = (weekday - date.weekday()) % 7
+            date += datetime.timedelta(days=ahead or (7 if day.group("next") else 0))
+    hour, minute = (at[0], at[1]) if at else (DEFAULT_HOUR, 0)
+    when = datetime.datetime.combine(date, datetime.time(hour, minute))
+
+    if when <= now:
+        if at and at[3] and hour < 12 and when + datetime.timedelta(hours=12) > now:
+            when += datetime.timedelta(hours=12)   # "at 5" said at noon
+        elif day is None or day.group("weekday"):
+            when += datetime.timedelta(days=7 if day is not None else 1)
+        elif at is None and day.group("day") == "today":
+            when = now.replace(minute=0, second=0) + datetime.timedelta(hours=1)
+    return TimeExpression(when, without_spans(original, spans), "grammar")
+
+
+def _fallback(text, now):
+    if not is_installed("dateutil"):
+        return None
+    default = now.replace(hour=DEFAULT_HOUR, minute=0, second=0)
+    try:
+        when, skipped = date_parser.parse(text, fuzzy_with_tokens=True, default=default)
+    except (ValueError, OverflowError):
+        return None
+    if when <= now:
+        when = _next_occurrence(text, when, default)
+    return TimeExpression(when, _DANGLING_RE.sub("", " ".join(" ".join(skipped).split())), "dateutil")
+
+
+def _next_occurrence(text, when, default):
+    """
+    A past dateutil result moved on by the largest unit the text left out:
+    "march 2" to next year, "the 1st" to next month, a bare time to tomorrow.
+    Parsing again on a default with a different year, month and day shows
+    which of them the text gave; a stated year is left alone.
+    """
+    probe_default = default.replace(year=default.year + 1, month=1 if default.month != 1 else 3,
+                                    day=1 if default.day != 1 else 2)
+    try:
+        probe = date_parser.parse(text, fuzzy=True, default=probe_default)
+        if probe.year == when.year:
+            return when
+        if probe.month == when.month:
+            return when.replace(year=when.year + 1)
+        if probe.day == when.day:
+            for months in (1, 2, 3):   # the next month that has this day ("the 31st")
+                later = when + relativedelta.relativedelta(months=months)
+                if later.day == when.day:
+                    return later
+            return when
+    except (ValueError, OverflowError):
+        return when  # e.g. the 29th of February next year
+    return when + datetime.timedelta(days=1)
@@ -0,0 +1,244 @@
+# core/tts_cache.py
+
+import os
+import json
+import time
+import atexit
+import shutil
+import hashlib
+import platform
+import threading
+import subprocess
+
+from core.datastore import atomic_write_json
+
+CACHE_DIR = os.path.join("data", "tts_cache")
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+RENDER_AFTER_USES = 3   # a phrase is pre-rendered once it has been spoken this often
+MAX_PHRASE_LENGTH = 120  # long, one-off sentences are not worth caching
+SAVE_EVERY = 20          # index writes are batched: flush after this many changes
+MAX_COUNTED = 500        # phrases whose uses are counted; the rarest are forgotten beyond twice this
+
+# Fixed replies worth having ready on a fresh install
+DEFAULT_PHRASES = [
+    "Hello! How can I assist you today?",
+    "Goodbye! Have a great day.",
+    "Timer cancelled.",
+    "Spotify paused.",
+    "Spotify playing.",
+    "Playing next song.",
+    "Playing previous song.",
+    "Memory cleared.",
+    "System muted.",
+    "System unmuted.",
+    "Sorry, I didn’t understand that command.",
+    "Sorry, I didn't catch that.",
+    "Sorry, that feature isn't available on this system.",
+]
+
+
+def cache_key(text, voice, rate):
+    return hashlib.sha1(f"{text}\x00{voice}\x00{rate}".encode("utf-8")).hexdigest()
+
+
+class UtteranceCache:
+    """
+    On-disk cache of pre-rendered phrases, keyed by text + voice + rate.
+
+    The index keeps each clip's size and last use (for LRU eviction once the
+    cache exceeds max_bytes) plus how often every phrase has been spoken,
+    which decides what gets rendered and what warm_up() pre-renders.
+    Only the speech worker thread renders or plays clips. Counts are kept
+    for the MAX_COUNTED most used phrases, so one-off replies with times or
+    numbers in them do not pile up, and pending changes are saved at exit.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self.hits = 0
+        self.misses = 0
+        self._load()
+        atexit.register(self.flush)
+
+    # ========== Index ==========
+
+    def _load(self):
+        self.clips, self.counts = {}, {}
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.clips = data.get("clips", {})
+            self.counts = data.get("counts", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[TTS Cache Load Error] {e}")
+        if len(self.counts) > MAX_COUNTED:
+            self._prune()  # an index written before counts were capped
+        # Drop entries whose audio file vanished
+        for key in [k for k, c in self.clips.items()
+                    if not os.path.exists(os.path.join(self.cache_dir, c["file"]))]:
+            del self.clips[key]
+
+    def save(self):
+        with self._lock:
+            data = {"clips": dict(self.clips), "counts": dict(self.counts)}
+            self._dirty = 0
+        try:
+            atomic_write_json(self.index_file, data)
+        except Exception as e:
+            print(f"[TTS Cache Save Error] {e}")
+
+    def flush(self):
+        """Save the index if it has unsaved changes."""
+        if self._dirty:
+            self.save()
+
+    def _touch(self):
+        self._dirty += 1
+        if self._dirty >= SAVE_EVERY:
+            self.save()
+
+    @property
+    def size(self):
+        return sum(c["size"] for c in self.clips.values())
+
+    # ========== Lookup ==========
+
+    def cacheable(self, text):
+        return 0 < len(text) <= MAX_PHRASE_LENGTH
+
+    def record_use(self, text):
+        """Count a spoken phrase. Returns True once it is worth rendering."""
+        if not self.cacheable(text):
+            return False
+        with self._lock:
+            count = self.counts.pop(text, 0) + 1
+            self.counts[text] = count   # re-inserted: the dict stays in order of last use
+            if len(self.counts) > 2 * MAX_COUNTED:
+                self._prune()
+        self._touch()
+        return count >= RENDER_AFTER_USES
+
+    def lookup(self, text, voice, rate):
+        """Path of the cached clip, or None."""
+        key = cache_key(text, voice, rate)
+        with self._lock:
+            clip = self.clips.get(key)
+            if clip is None:
+                self.misses += 1
+                return None
+            clip["last_used"] = time.time()
+            self.hits += 1
+        return os.path.join(self.cache_dir, clip["file"])
+
+    def _prune(self):
+        """Keep the MAX_COUNTED most used phrases, the most recently used first among equals."""
+        ranked = sorted(reversed(self.counts.items()), key=lambda kv: kv[1], reverse=True)
+        kept = {text for text, _ in ranked[:MAX_COUNTED]}
+        self.counts = {text: count for text, count in self.counts.items() if text in kept}
+
+    def top_phrases(self, n):
+        with self._lock:
+            ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        phrases = [text for text, _ in ranked[:n]]
+        for text in DEFAULT_PHRASES:
+            if len(phrases) >= n:
+                break
+            if text not in phrases:
+                phrases.append(text)
+        return phrases
+
+    # ========== Rendering ==========
+
+    def render(self, tts, text, drive):
+        """
+        Render text to a WAV file with the engine's save_to_file.
+        :param drive: callable that runs the engine until the queued job is done.
+        """
+        voice, rate = tts.getProperty("voice"), tts.getProperty("rate")
+        key = cache_key(text, voice, rate)
+        if key in self.clips:
+            return os.path.join(self.cache_dir, self.clips[key]["file"])
+        os.makedirs(self.cache_dir, exist_ok=True)
+        filename = f"{key}.wav"
+        path = os.path.join(self.cache_dir, filename)
+        tts.save_to_file(text, path)
+        drive(tts)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            print(f"[TTS Cache Render Error] nothing written for {text!r}")
+            return None
+        with self._lock:
+            self.clips[key] = {"file": filename, "text": text, "size": os.path.getsize(path),
+                               "last_used": time.time()}
+        self._evict()
+        self._touch()
+        return path
+
+    def _evict(self):
+        with self._lock:
+            total = sum(c["size"] for c in self.clips.values())
+            if total <= self.max_bytes:
+                return
+            for key, clip in sorted(self.clips.items(), key=lambda kv: kv[1]["last_used"]):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, clip["file"]))
+                except OSError:
+                    pass
+                total -= clip["size"]
+                del self.clips[key]
+
+    def clear(self):
+        with self._lock:
+            self.clips, self.counts = {}, {}
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+# ========== Playback ==========
+
+def play_clip(path, stop):
+    """
+    Play a WAV file, returning early if the stop event is set.
+    Returns False if no audio player is available (caller should speak live).
+    """
+    system = platform.system()
+    if system == "Windows":
+        import winsound
+        winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+        # winsound cannot report completion; wait out the clip length instead
+        deadline = time.monotonic() + _wav_duration(path)
+        while time.monotonic() < deadline:
+            if stop.is_set():
+                winsound.PlaySound(None, 0)
+                break
+            time.sleep(0.02)
+        return True
+
+    if system == "Darwin":
+        args = ["afplay", path]
+    elif shutil.which("aplay"):
+        args = ["aplay", "-q", path]
+    else:
+        return False
+    proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    while proc.poll() is None:
+        if stop.is_set():
+            proc.terminate()
+            break
+        time.sleep(0.02)
+    return True
+
+
+def _wav_duration(path):
+    import wave
+    try:
+        with wave.open(path, "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except Exception:
+        return 0.0
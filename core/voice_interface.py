@@ -1,37 +1,146 @@
-import speech_recognition as sr
+import time
+import threading
 from core.speech import speak
+from core.audio_stream import AudioStream, MicrophoneSource
+from core.recognizers import create_backend, StreamingSession
 
-recognizer = sr.Recognizer()
+RECOGNITION_TIMEOUT = 5.0  # seconds to wait for a streamed result before re-decoding
+RETRY_DELAY = 1.0          # seconds before trying a failed microphone again, doubled per failure
+MAX_RETRY_DELAY = 10.0
 
-def listen_command(timeout=5, phrase_time_limit=10):
+# One long-lived capture stream and one recognizer, created on first use
+_stream = None
+_backend = None
+_preferred_backend = None
+_partial_handler = None
+_stats = {"utterances": 0, "latency": 0.0, "audio": 0.0, "processing": 0.0}
+_stats_lock = threading.Lock()
+_capture_failures = 0      # consecutive capture errors; the user is told about the first only
+
+def set_backend(name):
+    """Choose a recognizer backend by name ("vosk", "sphinx", "google")."""
+    global _preferred_backend, _backend
+    _preferred_backend, _backend = name, None
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = create_backend(_preferred_backend)
+    return _backend
+
+def set_partial_handler(handler):
+    """handler(text) is called with each partial hypothesis while the user is still speaking."""
+    global _partial_handler
+    _partial_handler = handler
+
+def _on_partial(text):
+    print(f"💬 ... {text}")
+    if _partial_handler is not None:
+        _partial_handler(text)
+
+def use_source(source, **stream_options):
     """
-    Listen from the microphone and return the recognized command as text.
+    Replace the capture source, e.g. with core.audio_stream.WavFileSource to
+    run the pipeline without a microphone. Any running stream is stopped.
+    """
+    global _stream
+    if _stream is not None:
+        _stream.stop()
+    stream = AudioStream(source, **stream_options)
+    backend = get_backend()
+    if backend.streaming:
+        stream.add_listener(StreamingSession(backend, on_partial=_on_partial))
+    _stream = stream.start()
+    return _stream
+
+def get_stream():
+    if _stream is None:
+        print("🎙️ Opening microphone...")
+        use_source(MicrophoneSource())
+    return _stream
+
+def recognition_stats():
+    """Average latency (end of speech to text) and real-time factor so far."""
+    with _stats_lock:
+        n = _stats["utterances"]
+        return {
+            "utterances": n,
+            "avg_latency_ms": _stats["latency"] / n * 1000 if n else 0.0,
+            "rtf": _stats["processing"] / _stats["audio"] if _stats["audio"] else 0.0,
+        }
+
+def capture_audio(timeout=5, phrase_time_limit=10):
+    """
+    Return the next utterance segmented from the persistent capture stream.
     :param timeout: Max seconds to wait for speech to start.
     :param phrase_time_limit: Max seconds for the spoken phrase.
-    :return: Recognized speech as a string, or None on failure.
+    :return: Utterance, or None if nothing was heard.
+    :raises EOFError: when a finite source (a WAV file) has been used up.
+
+    A microphone that fails to open or read is retried after a growing
+    pause instead of at once, so a missing device does not spin a core.
     """
+    global _capture_failures
     try:
-        with sr.Microphone() as source:
-            print("🎙️ Listening...")
-            recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+        stream = get_stream()
+        stream.phrase_time_limit = phrase_time_limit
+        utterance = stream.next_utterance(timeout=timeout)
+    except Exception as e:
+        _capture_failures += 1
+        delay = min(RETRY_DELAY * 2 ** (_capture_failures - 1), MAX_RETRY_DELAY)
+        if _capture_failures == 1:
+            speak("Unexpected error during voice input.")
+        print(f"❌ Voice input error: {e} (retrying in {delay:.0f}s)")
+        time.sleep(delay)
+        return None
+    _capture_failures = 0
+    if utterance is None:
+        if stream.eof.is_set():
+            raise EOFError("Capture source exhausted.")
+        print("⏱️ No speech detected within timeout.")
+    return utterance
 
+def recognize_audio(audio):
+    """
+    Turn a captured Utterance into lower-case text. Streaming backends have
+    usually finished decoding by the time speech ends, so this only collects
+    the result; other backends decode here.
+    :return: Recognized speech as a string, or None on failure.
+    """
+    try:
         print("🔊 Processing...")
-        query = recognizer.recognize_google(audio).lower()
-        print(f"🔈 You said: {query}")
-        return query
-
-    except sr.WaitTimeoutError:
-        print("⏱️ No speech detected within timeout.")
+        result = audio.wait_result(RECOGNITION_TIMEOUT)
+        if result is None:
+            result = get_backend().recognize(audio)
+    except Exception as e:
+        speak("There was an issue with the speech service.")
+        print(f"❌ Speech recognition error: {e}")
         return None
-    except sr.UnknownValueError:
+
+    with _stats_lock:
+        _stats["utterances"] += 1
+        _stats["latency"] += result.latency
+        _stats["audio"] += result.audio_duration
+        _stats["processing"] += result.processing
+
+    if not result.text:
         speak("Sorry, I didn't catch that.")
         return None
-    except sr.RequestError as e:
-        speak("There was an issue with the speech service.")
-        print(f"❌ Speech recognition request error: {e}")
+    print(f"🔈 You said: {result.text} ({result.backend}, {result.latency * 1000:.0f} ms after speech, "
+          f"RTF {result.rtf:.2f})")
+    return result.text
+
+def listen_command(timeout=5, phrase_time_limit=10):
+    """
+    Listen from the microphone and return the recognized command as text.
+    :param timeout: Max seconds to wait for speech to start.
+    :param phrase_time_limit: Max seconds for the spoken phrase.
+    :return: Recognized speech as a string, or None on failure.
+    """
+    try:
+        audio = capture_audio(timeout=timeout, phrase_time_limit=phrase_time_limit)
+    except EOFError:
         return None
-    except Exception as e:
-        speak("Unexpected error during voice input.")
-        print(f"❌ Voice input error: {e}")
+    if audio is None:
         return None
+    return recognize_audio(audio)
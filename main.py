@@ -1,34 +1,201 @@
 # main.py (Offline version – LLM disabled)
 
-from core.speech import speak
-from core.voice_interface import listen_command
-from core.task_router import handle_command
+import sys
+import json
+import asyncio
+import time
+import argparse
+from collections import Counter
+from contextlib import redirect_stdout
+
+from core.speech import speak, warm_up, flush as flush_speech, PRIORITY_CHATTER
+from core.task_router import handle_command, handle_commands
 from modules.reminder import start_reminder_loop  # 🔔 Background reminder notifier
+from modules.timer import start_timer_service     # ⏲️ Timers carried over from the last run
+
+# Keys looked up, in order, when a batch line is a JSON object
+JSONL_COMMAND_KEYS = ("command", "text", "input")
+
+
+def read_commands(path):
+    """
+    Yield commands from a text file, a JSONL file or stdin ("-").
+    Blank lines and lines starting with '#' are skipped.
+    """
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line in stream:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"[Batch Parse Error] {e}: {line[:80]}", file=sys.stderr)
+                    continue
+                line = next((record[k] for k in JSONL_COMMAND_KEYS if record.get(k)), "")
+                if not line:
+                    continue
+            yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def run_batch(path, output=None, speak_output=False):
+    """Replay commands headlessly and write one JSON result per line."""
+    out = open(output, "w", encoding="utf-8") if output else sys.stdout
+    outcomes = Counter()
+    started = time.perf_counter()
+    try:
+        # Module chatter goes to stderr so stdout stays machine-readable
+        with redirect_stdout(sys.stderr):
+            for result in handle_commands(read_commands(path), speak_output=speak_output):
+                outcomes[result.outcome] += 1
+                out.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+            if speak_output:
+                flush_speech()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - started
+    total = sum(outcomes.values())
+    rate = total / elapsed if elapsed else 0.0
+    summary = ", ".join(f"{k}={v}" for k, v in sorted(outcomes.items()))
+    print(f"📦 {total} commands in {elapsed:.2f}s ({rate:.0f}/s) — {summary}", file=sys.stderr)
+    return outcomes
+
+
+def run_ingest(path, fmt=None):
+    """Bulk-load memories and print progress and throughput to stderr."""
+    from core.memory_ingest import ingest_file, format_report
+
+    report = ingest_file(path, fmt, progress=lambda r: print(f"\r  {r['memories']} memories, {r['rate']:.0f}/s",
+                                                               end="", file=sys.stderr))
+    print(f"\n{format_report(report)}", file=sys.stderr)
+    return report
+
+
+def run_daemon(workers=4, speak_output=False, events_port=None):
+    """Serve text commands with every module warm; see core/daemon_client.py for the client."""
+    from core.daemon import run_daemon as serve
+
+    start_reminder_loop()
+    start_timer_service()
+    if events_port != 0:
+        from core.events import start_event_server, EVENT_PORT
+        start_event_server(port=events_port or EVENT_PORT)
+    serve(workers=workers, speak_output=speak_output)
+
+
+def startup_report(top=15):
+    """Print where start-up time goes and which intents are disabled."""
+    from core.lazy import import_time_report, lazy_status
+    from core.task_router import engine
+
+    rows, code = import_time_report("main", top=top)
+    print(f"⏱️ Slowest start-up imports (fresh interpreter, exit code {code}):")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, depth, name in rows:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{name}")
+
+    print("\n💤 Lazy modules:")
+    for name, state, seconds in lazy_status():
+        took = f"{seconds * 1000:.1f} ms" if seconds is not None else "-"
+        print(f"  {name:32} {state:8} {took}")
+
+    disabled = [i for i in engine.intents.values() if not i.enabled]
+    print(f"\n🚫 Disabled intents: {len(disabled)} of {len(engine.intents)}")
+    for intent in disabled:
+        print(f"  {intent.name:24} {intent.disabled_reason}")
+
+
+def main(audio_file=None, recognizer=None, events_port=None):
+    from core.voice_interface import (capture_audio, recognize_audio, use_source,
+                                      set_backend, set_partial_handler, recognition_stats)
+    from core.task_router import prewarm
+    from core.pipeline import AssistantPipeline
+
+    if recognizer:
+        set_backend(recognizer)
+    # Partial transcripts are routed early so the intent's backend is warm
+    set_partial_handler(prewarm)
+
+    if audio_file:
+        # Replay a recording instead of opening the microphone
+        from core.audio_stream import WavFileSource
+        use_source(WavFileSource(audio_file, realtime=True))
 
-def main():
     # Start the reminder notification thread (non-blocking)
     start_reminder_loop()
+    start_timer_service()
+
+    # Push commands, speech, reminders and timer changes to web UI clients
+    if events_port != 0:
+        from core.events import start_event_server, EVENT_PORT
+        start_event_server(port=events_port or EVENT_PORT)
 
     # Greet the user on startup
-    speak("Hello! How can I assist you today?")
+    speak("Hello! How can I assist you today?", priority=PRIORITY_CHATTER)
+    # Pre-render frequent replies in the background so they play instantly
+    warm_up()
 
+    # Capture, recognition, execution and speech run as concurrent stages,
+    # so the next command can be heard while the last one is still running
+    pipeline = AssistantPipeline(capture_audio, recognize_audio, handle_command)
     try:
-        while True:
-            command = listen_command()
-            if command:
-                print(f"Command received: {command}")
-                handle_command(command)
-            else:
-                # Optional: prompt if no command detected after a pause
-                # speak("I didn't catch that. Please say your command again.")
-                pass
+        asyncio.run(pipeline.run())
     except KeyboardInterrupt:
         # Gracefully handle Ctrl+C exit
-        speak("Goodbye! Have a great day.")
+        speak("Goodbye! Have a great day.", interrupt=True, wait=True)
     except Exception as e:
         # Log and notify errors without crashing
         print(f"Error: {e}")
-        speak("I encountered an error while processing your command. Please try again.")
+        speak("I encountered an error while processing your command. Please try again.", wait=True)
+    finally:
+        pipeline.shutdown()
+        stats = recognition_stats()
+        if stats["utterances"]:
+            print(f"🧠 {stats['utterances']} utterances, avg latency {stats['avg_latency_ms']:.0f} ms, "
+                  f"RTF {stats['rtf']:.2f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Newt voice assistant")
+    parser.add_argument("--batch", metavar="PATH",
+                        help="run commands headlessly from a text/JSONL file, or '-' for stdin")
+    parser.add_argument("--output", metavar="PATH", help="write batch results here instead of stdout")
+    parser.add_argument("--speak", action="store_true", help="also voice batch replies through TTS")
+    parser.add_argument("--audio-file", metavar="WAV",
+                        help="listen to a mono WAV recording instead of the microphone")
+    parser.add_argument("--recognizer", choices=("vosk", "sphinx", "google"),
+                        help="speech recognition backend (default: first available, offline first)")
+    parser.add_argument("--ingest", metavar="PATH",
+                        help="bulk-load memories from a JSONL/text/Markdown file, or '-' for stdin")
+    parser.add_argument("--format", choices=("jsonl", "text", "markdown"),
+                        help="format of the --ingest input (default: from the file extension)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep running without the microphone and take text commands from "
+                             "python -m core.daemon_client and the web UI")
+    parser.add_argument("--workers", type=int, default=4, help="commands the daemon runs at once")
+    parser.add_argument("--events-port", type=int, metavar="PORT",
+                        help="port of the live event stream for the web UI (default 8765, 0 disables)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="show import times, lazy modules and disabled intents, then exit")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.startup_report:
+        startup_report()
+    elif args.daemon:
+        run_daemon(workers=args.workers, speak_output=args.speak, events_port=args.events_port)
+    elif args.ingest:
+        run_ingest(args.ingest, fmt=args.format)
+    elif args.batch:
+        run_batch(args.batch, output=args.output, speak_output=args.speak)
+    else:
+        main(audio_file=args.audio_file, recognizer=args.recognizer, events_port=args.events_port)
@@ -1,51 +1,134 @@
-import os
-import json
 from core.speech import speak
+from core.memory_store import get_store
+from core.memory_search import get_index, parse_date_range, strip_period, PAGE_SIZE, TOP_K
+from core.memory_vectors import get_vector_index
+from core.memory_dedupe import add_or_merge, dedupe, similar_groups
 
-MEMORY_FILE = "data/memory.json"
+# Where "more memories" carries on from
+_listing = {"offset": 0, "range": None}
 
-# Ensure memory file exists
-if not os.path.exists("data"):
-    os.makedirs("data")
 
-if not os.path.exists(MEMORY_FILE):
-    with open(MEMORY_FILE, "w") as f:
-        json.dump([], f)
-
-def _load_memory():
-    try:
-        with open(MEMORY_FILE, "r") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"[Memory Load Error] {e}")
-        return []
-
-def _save_memory(memory_list):
+def add_to_memory(info: str, pinned=False, expires=None):
+    info = info.strip()
+    if not info:
+        speak("You didn’t say what to remember.")
+        return
     try:
-        with open(MEMORY_FILE, "w") as f:
-            json.dump(memory_list, f, indent=2)
+        outcome, record = add_or_merge(info, pinned=pinned, expires=expires)
     except Exception as e:
         print(f"[Memory Save Error] {e}")
+        speak("I couldn’t save that memory.")
+        return
+    if outcome == "duplicate":
+        speak(f"I already remember that: {record['text']}")
+    elif outcome == "similar":
+        speak(f"I’ve remembered that: {info}. I also remember something similar: {record['text']}")
+    elif pinned:
+        speak(f"I’ll always remember that: {info}")
+    elif expires:
+        speak(f"I’ll remember that until {expires[:10]}: {info}")
+    else:
+        speak(f"I’ve remembered that: {info}")
 
-def add_to_memory(info: str):
-    info = info.strip()
-    if not info:
-        speak("You didn’t say what to remember.")
+def pin_memory(query: str, pinned=True):
+    """Pin (or unpin) the memory that best matches the query."""
+    results = get_index().search(query, 1) or _similar(query, 1, set())
+    if not results:
+        speak(f"I don’t remember anything about {query}.")
+        return
+    record = results[0]
+    if pinned:
+        get_store().set_retention(record["id"], pinned=True, expires=None)
+    else:
+        get_store().set_retention(record["id"], pinned=False)
+    if pinned:
+        speak(f"I’ll never forget: {record['text']}")
+    else:
+        speak(f"That memory can be forgotten again: {record['text']}")
+
+def remove_duplicates():
+    """Delete exact repeats only; memories that are merely similar are counted, not touched."""
+    groups = dedupe(confirm=True)
+    removed = sum(len(group) - 1 for group in groups)
+    if removed:
+        speak(f"I removed {removed} duplicate memor{'ies' if removed != 1 else 'y'}.")
+    else:
+        speak("I didn’t find any duplicate memories.")
+    similar = len(similar_groups())
+    if similar:
+        speak(f"{similar} group{'s' if similar != 1 else ''} of similar memories look related but differ, "
+              f"so I kept {'them' if similar != 1 else 'it'}.")
+
+def clean_up_memory():
+    """Remove duplicates, apply the retention policy and compact the files now."""
+    removed = sum(len(group) - 1 for group in dedupe(confirm=True))
+    report = get_store().maintain(force=True)
+    kilobytes = report["reclaimed"] / 1024
+    speak(f"I removed {removed} duplicate and {report['evicted']} expired memor"
+          f"{'ies' if report['evicted'] != 1 else 'y'}, and freed {kilobytes:.0f} kilobytes.")
+
+def list_memory(period=""):
+    """Speak the newest memories one page at a time, optionally within a spoken period."""
+    date_range = parse_date_range(period) if period else None
+    start, end = date_range or (None, None)
+    total = get_index().count(start, end)
+    if not total:
+        speak("I don’t remember anything from then." if date_range else "I don’t remember anything yet.")
         return
-    memory_list = _load_memory()
-    memory_list.append(info)
-    _save_memory(memory_list)
-    speak(f"I’ve remembered that: {info}")
-
-def list_memory():
-    memory_list = _load_memory()
-    if not memory_list:
-        speak("I don’t remember anything yet.")
+    speak(f"I remember {total} thing{'s' if total != 1 else ''}. Here’s the latest:" if total > PAGE_SIZE
+          else "Here’s what I remember:")
+    _listing.update(offset=0, range=date_range)
+    more_memories()
+
+def more_memories():
+    start, end = _listing["range"] or (None, None)
+    entries = get_index().page(_listing["offset"], PAGE_SIZE, start, end)
+    if not entries:
+        speak("That’s everything I remember.")
         return
-    speak("Here’s what I remember:")
-    for i, item in enumerate(memory_list, start=1):
-        speak(f"{i}. {item}")
+    for i, item in enumerate(entries, start=_listing["offset"] + 1):
+        speak(f"{i}. {item['text']}")
+    get_store().mark_recalled([item["id"] for item in entries])
+    _listing["offset"] += len(entries)
+    if get_index().count(start, end) > _listing["offset"]:
+        speak("Say more memories to hear the next ones.")
+
+def search_memory(query: str):
+    """Speak only the best full-text matches for the query."""
+    date_range = parse_date_range(query)
+    start, end = date_range or (None, None)
+    terms = strip_period(query)
+    if not terms:
+        list_memory(query)
+        return
+    results = get_index().search(terms, TOP_K, start=start, end=end)
+    if len(results) < TOP_K:
+        # Worded differently from how it was stored: fill up with TF-IDF neighbours
+        results += _similar(terms, TOP_K - len(results), {r["id"] for r in results}, start, end)
+    if not results:
+        speak(f"I don’t remember anything about {terms}.")
+        return
+    speak(f"Here’s what I remember about {terms}:")
+    for item in results:
+        speak(f"{item['text']} — from {item['timestamp'][:10]}")
+    get_store().mark_recalled([item["id"] for item in results])
+
+def _similar(text, k, exclude, start=None, end=None):
+    vectors = get_vector_index()
+    if vectors is None:
+        return []
+    store, found = get_store(), []
+    for record_id, _ in vectors.search(text, k + len(exclude) + (10 if start or end else 0)):
+        record = store.get(record_id)
+        if record is None or record_id in exclude:
+            continue
+        if (start and record["timestamp"] < start) or (end and record["timestamp"] >= end):
+            continue
+        found.append(record)
+        if len(found) == k:
+            break
+    return found
 
 def clear_memory():
-    _save_memory([])
+    get_store().clear()
     speak("I’ve cleared all remembered items.")
@@ -1,36 +1,17 @@
-import json
 import os
 from core.speech import speak
+from core.datastore import json_file
 
 COMMAND_FILE = os.path.join("data", "custom_commands.json")
-
-# Ensure the data folder and command file exist
-os.makedirs(os.path.dirname(COMMAND_FILE), exist_ok=True)
-if not os.path.exists(COMMAND_FILE):
-    with open(COMMAND_FILE, "w", encoding="utf-8") as f:
-        json.dump({}, f)
+commands_file = json_file(COMMAND_FILE, default={})
 
 def load_custom_commands():
-    """Load all stored custom commands."""
-    try:
-        with open(COMMAND_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        speak("I found a corrupted custom command file. Resetting it.")
-        with open(COMMAND_FILE, "w", encoding="utf-8") as f:
-            json.dump({}, f)
-        return {}
-    except Exception as e:
-        print(f"[❌ load_custom_commands error] {e}")
-        return {}
+    """Load all stored custom commands (cached; re-read only when the file changes)."""
+    return commands_file.read()
 
 def save_custom_commands(data):
     """Save custom commands to file."""
-    try:
-        with open(COMMAND_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-    except Exception as e:
-        print(f"[❌ save_custom_commands error] {e}")
+    commands_file.write(data)
 
 def teach_new_command(trigger_phrase, command_sequence):
     """
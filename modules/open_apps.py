@@ -2,28 +2,21 @@
 
 import os
 import subprocess
-import json
 import platform
 import shutil
 from core.speech import speak
+from core.datastore import json_file
 
 APP_PATHS_FILE = "data/app_paths.json"
+app_paths_file = json_file(APP_PATHS_FILE, default={}, indent=4)
 
 def load_app_paths():
-    """Load stored app paths."""
-    if os.path.exists(APP_PATHS_FILE):
-        try:
-            with open(APP_PATHS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-    return {}
+    """Load stored app paths (cached; re-read only when the file changes)."""
+    return app_paths_file.read()
 
 def save_app_paths(paths):
     """Save app paths."""
-    os.makedirs(os.path.dirname(APP_PATHS_FILE), exist_ok=True)
-    with open(APP_PATHS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(paths, f, indent=4)
+    app_paths_file.write(paths)
 
 def remember_app_path(app_name, path):
     """Store a new app path."""
@@ -52,9 +45,9 @@ def try_direct_launch(app_name):
         print(f"❌ Direct launch failed: {e}")
         return False
 
-def find_similar_app(app_name):
+def find_similar_app(app_name, paths=None):
     """Try to match app name partially from saved paths."""
-    paths = load_app_paths()
+    paths = load_app_paths() if paths is None else paths
     for key in paths:
         if app_name.lower() in key:
             return paths[key]
@@ -81,7 +74,7 @@ def launch_app(app_name):
             speak(f"The saved path for {app_name} seems broken. Trying fallback.")
 
     # === 2. Try a similar match from saved paths
-    alt_path = find_similar_app(app_name)
+    alt_path = find_similar_app(app_name, paths)
     if alt_path and os.path.exists(alt_path):
         try:
             subprocess.Popen(alt_path)
@@ -1,111 +1,376 @@
 # modules/reminder.py
 
-import os
-import json
-import time
+import heapq
 import threading
 import datetime
-from core.speech import speak
+import itertools
+from core.speech import speak, PRIORITY_ALERT
+from core.lazy import lazy_import, is_installed
+from core.journal import Journal
+from core.scheduler import Scheduler
+from core.events import publish
+from core.recurrence import parse_rule
 
-try:
-    from win10toast import ToastNotifier
-    notifier = ToastNotifier()
-    TOAST_AVAILABLE = True
-except ImportError:
-    TOAST_AVAILABLE = False
-    notifier = None
+# Desktop toasts are optional (Windows only) and loaded with the first reminder
+win10toast = lazy_import("win10toast")
+TOAST_AVAILABLE = is_installed("win10toast")
+notifier = None
 
-REMINDER_FILE = "data/reminders.json"
-
-def load_reminders():
-    if not os.path.exists(REMINDER_FILE):
-        return []
+def show_toast(task):
+    global notifier, TOAST_AVAILABLE
+    if not TOAST_AVAILABLE:
+        return
     try:
-        with open(REMINDER_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        if notifier is None:
+            notifier = win10toast.ToastNotifier()
+        notifier.show_toast("Newt Reminder", task, duration=10, threaded=True)
     except Exception as e:
-        print(f"[Error loading reminders] {e}")
-        return []
+        TOAST_AVAILABLE = False
+        print(f"[Toast Error] {e}")
 
-def save_reminders(reminders):
-    os.makedirs(os.path.dirname(REMINDER_FILE), exist_ok=True)
-    with open(REMINDER_FILE, "w", encoding="utf-8") as f:
-        json.dump(reminders, f, indent=2)
+REMINDER_FILE = "data/reminders.json"   # snapshot: a list of {"id", "task", "time", "repeat"?}
+REMINDER_LOG = "data/reminders.log"     # changes since the snapshot, one JSON line each
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", TIME_FORMAT)
+COMPACT_AFTER = 200                     # logged changes (at least one per reminder) before the snapshot is rewritten
+MAX_LISTED = 10                         # occurrences spoken by list_reminders
 
-def add_reminder(task, time_str):
-    reminders = load_reminders()
-    
-    # Prevent duplicate reminders
-    for r in reminders:
-        if r["task"].strip().lower() == task.strip().lower() and r["time"] == time_str:
-            speak("This reminder already exists.")
-            return
 
-    reminders.append({"task": task.strip(), "time": time_str})
-    save_reminders(reminders)
-    speak(f"Reminder set for {task} at {time_str}")
+def parse_reminder_time(text):
+    try:
+        return datetime.datetime.fromisoformat(text)  # C fast path for both TIME_FORMATS
+    except (TypeError, ValueError):
+        pass
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"unrecognised reminder time {text!r}")
 
-def get_due_reminders():
-    now = datetime.datetime.now()
-    due = []
-    for r in load_reminders():
+
+def format_reminder_time(when):
+    """Minutes unless the reminder was set to the second ("in 90 seconds")."""
+    return when.strftime("%Y-%m-%d %H:%M:%S" if when.second else TIME_FORMAT)
+
+
+class ReminderBook:
+    """
+    Pending reminders, kept in memory and fired by a Scheduler.
+
+    Every reminder is parsed once, when it is loaded or added, and sits in
+    the scheduler's heap by due time: nothing is polled, and a reminder
+    fires on its second instead of up to a minute late. Adding or firing
+    one appends a single line to the journal; the snapshot is only
+    rewritten once the log outgrows it, so its cost is amortised.
+
+    A recurring reminder carries its rule in "repeat" (see core.recurrence)
+    and "time" always holds its next occurrence. Firing computes the one
+    after and logs it, so a recurring reminder costs what a one-shot does.
+
+    Reminders that fell due while the assistant was not running are
+    collected in one pass at load and handed to on_missed together when the
+    book starts (to on_fire one by one without it). Only once they have
+    been delivered are they removed, or moved to their next occurrence if
+    recurring, with a single journal write; a book that is never started
+    leaves them on disk for the next run.
+    """
+
+    def __init__(self, snapshot_path=REMINDER_FILE, log_path=REMINDER_LOG, on_fire=None, fsync=True,
+                 on_missed=None):
+        self.on_fire = on_fire
+        self.on_missed = on_missed
+        self.missed = []       # overdue at load, soonest first; delivered by start()
+        self._lock = threading.RLock()
+        self._reminders = {}   # id -> reminder dict
+        self._keys = {}        # (task, time) -> id, for duplicate checks
+        self._next_id = 1
+        self.scheduler = Scheduler("newt-reminders")
+        self.journal = Journal(log_path, snapshot_path, default=[], fsync=fsync)
+        self._load()
+
+    # ========== State ==========
+
+    def _load(self):
+        snapshot, ops = self.journal.load()
+        for reminder in snapshot if isinstance(snapshot, list) else []:
+            self._insert(dict(reminder))
+        for op in ops:
+            if op.get("op") == "add":
+                self._insert(op["reminder"])
+            elif op.get("op") == "remove":
+                self._discard(op["id"])
+            elif op.get("op") == "next" and op["id"] in self._reminders:
+                self._insert({**self._discard(op["id"]), "time": op["time"]})
+        now = datetime.datetime.now().timestamp()
+        overdue = [(self.scheduler.due(r["id"]), r) for r in self._reminders.values()]
+        overdue = sorted((entry for entry in overdue if entry[0] <= now), key=lambda entry: entry[0])
+        self.missed = [reminder for _, reminder in overdue]
+        for reminder in self.missed:
+            self.scheduler.cancel(reminder["id"])  # announced together by start(), not one by one
+        if self._compact_due():
+            self.compact()
+
+    def _catch_up(self, missed):
+        """Drop delivered missed reminders (or move recurring ones on) with one journal write."""
+        now = datetime.datetime.now()
+        ops = []
+        for reminder in missed:
+            self._discard(reminder["id"])
+            following = None
+            if "repeat" in reminder:
+                due = parse_reminder_time(reminder["time"])
+                following = parse_rule(reminder["repeat"]).next_after(due, now)
+            if following is None:
+                ops.append({"op": "remove", "id": reminder["id"]})
+            else:
+                time_str = format_reminder_time(following)
+                ops.append({"op": "next", "id": reminder["id"], "time": time_str})
+                self._insert({**reminder, "time": time_str})
+        if ops:
+            self._logged(*ops)
+
+    def _compact_due(self):
+        return self.journal.ops >= max(COMPACT_AFTER, len(self._reminders))
+
+    def _insert(self, reminder):
         try:
-            rt = datetime.datetime.strptime(r["time"], "%Y-%m-%d %H:%M")
-            if rt <= now:
-                due.append(r)
-        except Exception as e:
+            due = parse_reminder_time(reminder["time"])
+        except (KeyError, ValueError) as e:
             print(f"[Reminder time parse error] {e}")
-    return due
+            return None
+        if "id" not in reminder:
+            reminder["id"] = self._next_id  # written before reminders had ids
+        self._next_id = max(self._next_id, reminder["id"] + 1)
+        self._reminders[reminder["id"]] = reminder
+        self._keys[(reminder["task"].lower(), reminder["time"])] = reminder["id"]
+        self.scheduler.schedule(reminder["id"], due.timestamp(), self._fire)
+        return reminder
 
-def remove_reminder(reminder):
-    reminders = load_reminders()
-    new_list = [r for r in reminders if not (r["task"] == reminder["task"] and r["time"] == reminder["time"])]
-    save_reminders(new_list)
+    def _discard(self, reminder_id):
+        reminder = self._reminders.pop(reminder_id, None)
+        if reminder is not None:
+            self._keys.pop((reminder["task"].lower(), reminder["time"]), None)
+            self.scheduler.cancel(reminder_id)
+        return reminder
 
-def reminder_checker():
-    while True:
-        try:
-            due_list = get_due_reminders()
-            for reminder in due_list:
-                task = reminder["task"]
-                speak(f"⏰ Reminder: {task}")
-                if TOAST_AVAILABLE:
-                    notifier.show_toast("Newt Reminder", task, duration=10, threaded=True)
-                remove_reminder(reminder)
-        except Exception as e:
-            print(f"[Reminder Thread Error] {e}")
-        time.sleep(60)  # Check every 60 seconds
+    def compact(self):
+        with self._lock:
+            self.journal.compact(list(self._reminders.values()), indent=2)
+
+    def _logged(self, *ops):
+        self.journal.append(*ops)
+        if self._compact_due():
+            self.compact()
+
+    # ========== API ==========
+
+    def add(self, task, when, repeat=None):
+        """
+        Schedule a reminder at when (its first occurrence, if repeat is a
+        recurrence rule); returns it, or None if the same one already exists.
+        """
+        task = task.strip()
+        time_str = format_reminder_time(when) if isinstance(when, datetime.datetime) else when
+        parse_reminder_time(time_str)  # ValueError before anything is logged
+        if repeat:
+            parse_rule(repeat)
+        with self._lock:
+            if (task.lower(), time_str) in self._keys:
+                return None
+            reminder = {"id": self._next_id, "task": task, "time": time_str}
+            if repeat:
+                reminder["repeat"] = repeat
+            self._insert(reminder)  # before logging: the log line may trigger a compaction
+            self._logged({"op": "add", "reminder": reminder})
+            return reminder
+
+    def remove(self, reminder_id):
+        with self._lock:
+            reminder = self._discard(reminder_id)
+            if reminder is not None:
+                self._logged({"op": "remove", "id": reminder_id})
+            return reminder
+
+    def get(self, reminder_id):
+        return self._reminders.get(reminder_id)
+
+    def all(self):
+        """Every pending reminder, soonest first."""
+        with self._lock:
+            reminders = list(self._reminders.values())
+        return sorted(reminders, key=lambda r: self.scheduler.due(r["id"]) or 0)
+
+    def occurrences(self, start, end):
+        """
+        (when, reminder) for every occurrence in [start, end), in time order.
+        Recurring series are expanded one occurrence at a time as the caller
+        iterates, so taking the first few costs nothing per remaining one.
+        """
+        with self._lock:
+            reminders = list(self._reminders.values())
+        def series(reminder):
+            when = parse_reminder_time(reminder["time"])
+            if "repeat" in reminder:
+                for when in parse_rule(reminder["repeat"]).occurrences(when, start, end):
+                    yield when, reminder["id"], reminder
+            elif start <= when < end:
+                yield when, reminder["id"], reminder
+
+        for when, _, reminder in heapq.merge(*map(series, reminders)):
+            yield when, reminder
+
+    def __len__(self):
+        return len(self._reminders)
+
+    def _fire(self, reminder_id):
+        with self._lock:
+            reminder = self._discard(reminder_id)
+            if reminder is None:
+                return
+            if "repeat" in reminder:
+                due = parse_reminder_time(reminder["time"])
+                following = parse_rule(reminder["repeat"]).next_after(due, datetime.datetime.now())
+            else:
+                following = None
+            if following is None:
+                self._logged({"op": "remove", "id": reminder_id})
+            else:
+                time_str = format_reminder_time(following)
+                self._insert({**reminder, "time": time_str})
+                self._logged({"op": "next", "id": reminder_id, "time": time_str})
+        if self.on_fire is not None:
+            self.on_fire(reminder)
+
+    def start(self):
+        self.scheduler.start()
+        with self._lock:
+            # Skip any removed (or replaced) since load
+            missed = [r for r in self.missed if self._reminders.get(r["id"]) is r]
+            self.missed = []
+        if missed:
+            if self.on_missed is not None:
+                self.on_missed(missed)
+            elif self.on_fire is not None:
+                for reminder in missed:
+                    self.on_fire(reminder)
+            with self._lock:
+                self._catch_up(missed)
+        return self
+
+    def stop(self):
+        self.scheduler.stop()
+
+
+def announce(reminder):
+    task = reminder["task"]
+    publish("reminder", task=task, due=reminder["time"])
+    speak(f"⏰ Reminder: {task}", priority=PRIORITY_ALERT)
+    show_toast(task)
+
+
+def announce_missed(reminders):
+    """One announcement for every reminder that fell due while Newt was not running."""
+    latest = reminders[-1]
+    due = parse_reminder_time(latest["time"]).strftime("%I:%M %p on %B %d")
+    if len(reminders) == 1:
+        summary = f"You missed a reminder while I was away: {latest['task']}, due at {due}."
+    else:
+        summary = (f"You missed {len(reminders)} reminders while I was away. "
+                   f"The most recent was {latest['task']}, due at {due}.")
+    publish("reminder", task=latest["task"], due=latest["time"], missed=len(reminders))
+    speak(f"⏰ {summary}", priority=PRIORITY_ALERT)
+    show_toast(summary)
+
+
+_book = None
+_book_lock = threading.Lock()
+
+def get_reminders():
+    """The shared ReminderBook for data/, loaded on first use."""
+    global _book
+    with _book_lock:
+        if _book is None:
+            _book = ReminderBook(on_fire=announce, on_missed=announce_missed)
+        return _book
+
+def load_reminders():
+    return get_reminders().all()
+
+def add_reminder(task, time_str, repeat=None):
+    if get_reminders().add(task, time_str, repeat) is None:
+        speak("This reminder already exists.")
+        return
+    if repeat:
+        speak(f"Reminder set for {task} {parse_rule(repeat).describe()}, starting {time_str}")
+    else:
+        speak(f"Reminder set for {task} at {time_str}")
+
+def get_due_reminders():
+    now = datetime.datetime.now()
+    return [r for r in load_reminders() if parse_reminder_time(r["time"]) <= now]
+
+def remove_reminder(reminder):
+    get_reminders().remove(reminder["id"])
 
 def start_reminder_loop():
     try:
-        t = threading.Thread(target=reminder_checker, daemon=True)
-        t.start()
+        get_reminders().start()
         print("🔔 Reminder loop started.")
     except Exception as e:
         print(f"[Reminder Loop Error] {e}")
         speak("Reminder loop couldn't start.")
 
-def list_reminders():
+def reminder_window(text, now=None):
+    """(start, end) for "today", "tomorrow", "this week", "next week" or "this month"; None otherwise."""
+    now = now or datetime.datetime.now()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    day = datetime.timedelta(days=1)
+    text = (text or "").lower()
+    if "tomorrow" in text:
+        return midnight + day, midnight + 2 * day
+    if "today" in text or "tonight" in text:
+        return now, midnight + day
+    if "next week" in text:
+        monday = midnight - midnight.weekday() * day + 7 * day
+        return monday, monday + 7 * day
+    if "week" in text:
+        return now, midnight + (7 - midnight.weekday()) * day
+    if "month" in text:
+        following = (midnight.replace(day=1) + 32 * day).replace(day=1)
+        return now, following
+    return None
+
+def list_reminders(period=None):
+    window = reminder_window(period)
+    if window is None:
+        return list_upcoming_reminders()
+    upcoming = list(itertools.islice(get_reminders().occurrences(*window), MAX_LISTED + 1))
+    label = period.strip()
+    if not upcoming:
+        speak(f"You have no reminders {label}.")
+        return
+    more = len(upcoming) > MAX_LISTED
+    upcoming = upcoming[:MAX_LISTED]
+    speak(f"{'Your first' if more else 'You have'} {len(upcoming)} reminder{'s' if len(upcoming) > 1 else ''} {label}:")
+    for r_time, r in upcoming:
+        speak(f"{r['task']} at {r_time.strftime('%I:%M %p on %A %B %d')}")
+
+def list_upcoming_reminders():
     reminders = load_reminders()
     if not reminders:
         speak("You have no reminders.")
         return
 
-    upcoming = []
     now = datetime.datetime.now()
-
-    for r in reminders:
-        try:
-            r_time = datetime.datetime.strptime(r["time"], "%Y-%m-%d %H:%M")
-            if r_time >= now:
-                upcoming.append((r_time, r["task"]))
-        except:
-            continue
+    upcoming = [(parse_reminder_time(r["time"]), r) for r in reminders]
+    upcoming = [(r_time, r) for r_time, r in upcoming if r_time >= now]
 
     if not upcoming:
         speak("You have no upcoming reminders.")
     else:
         speak(f"You have {len(upcoming)} upcoming reminder{'s' if len(upcoming) > 1 else ''}:")
-        for r_time, task in sorted(upcoming):
+        for r_time, r in upcoming:
             date_str = r_time.strftime("%I:%M %p on %B %d")
-            speak(f"{task} at {date_str}")
+            repeats = f", repeating {parse_rule(r['repeat']).describe()}" if "repeat" in r else ""
+            speak(f"{r['task']} at {date_str}{repeats}")
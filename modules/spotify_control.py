@@ -11,21 +11,28 @@ REDIRECT_URI = 'http://localhost:xxxx/callback'
 SCOPE = 'user-read-playback-state user-modify-playback-state user-read-currently-playing user-read-private user-read-email'
 CACHE = ".cache"
 
-# Authenticate
-sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-    client_id=CLIENT_ID,
-    client_secret=CLIENT_SECRET,
-    redirect_uri=REDIRECT_URI,
-    scope=SCOPE,
-    cache_path=CACHE
-))
+_client = None
+
+
+def get_client():
+    """Authenticate on first use rather than at import time."""
+    global _client
+    if _client is None:
+        _client = spotipy.Spotify(auth_manager=SpotifyOAuth(
+            client_id=CLIENT_ID,
+            client_secret=CLIENT_SECRET,
+            redirect_uri=REDIRECT_URI,
+            scope=SCOPE,
+            cache_path=CACHE
+        ))
+    return _client
 
 
 # --------------------------- DEVICE HANDLING ---------------------------
 
 def get_active_device_id():
     try:
-        devices = sp.devices()
+        devices = get_client().devices()
         for d in devices['devices']:
             if d['is_active']:
                 return d['id']
@@ -39,7 +46,7 @@ def get_active_device_id():
 
 def list_devices():
     try:
-        devices = sp.devices()
+        devices = get_client().devices()
         if not devices['devices']:
             speak("No devices are currently connected to Spotify.")
             return
@@ -57,7 +64,7 @@ def list_devices():
 
 def play():
     try:
-        sp.start_playback(device_id=get_active_device_id())
+        get_client().start_playback(device_id=get_active_device_id())
         speak("Resuming Spotify.")
     except Exception as e:
         print(f"[Play Error] {e}")
@@ -66,7 +73,7 @@ def play():
 
 def pause():
     try:
-        sp.pause_playback()
+        get_client().pause_playback()
         speak("Paused Spotify.")
     except Exception as e:
         print(f"[Pause Error] {e}")
@@ -75,7 +82,7 @@ def pause():
 
 def next_track():
     try:
-        sp.next_track()
+        get_client().next_track()
         speak("Skipped to next track.")
     except Exception as e:
         print(f"[Next Track Error] {e}")
@@ -84,7 +91,7 @@ def next_track():
 
 def previous_track():
     try:
-        sp.previous_track()
+        get_client().previous_track()
         speak("Went back to the previous song.")
     except Exception as e:
         print(f"[Previous Track Error] {e}")
@@ -95,14 +102,14 @@ def previous_track():
 
 def play_song(song_name: str):
     try:
-        results = sp.search(q=song_name, type='track', limit=1)
+        results = get_client().search(q=song_name, type='track', limit=1)
         items = results.get('tracks', {}).get('items', [])
         if items:
             track = items[0]
             uri = track['uri']
             name = track['name']
             artist = track['artists'][0]['name']
-            sp.start_playback(device_id=get_active_device_id(), uris=[uri])
+            get_client().start_playback(device_id=get_active_device_id(), uris=[uri])
             speak(f"Playing {name} by {artist}")
             print(f"🎵 Now playing: {name} — {artist}")
         else:
@@ -114,10 +121,10 @@ def play_song(song_name: str):
 
 def play_playlist(playlist_name: str):
     try:
-        playlists = sp.current_user_playlists()['items']
+        playlists = get_client().current_user_playlists()['items']
         for playlist in playlists:
             if playlist_name.lower() in playlist['name'].lower():
-                sp.start_playback(device_id=get_active_device_id(), context_uri=playlist['uri'])
+                get_client().start_playback(device_id=get_active_device_id(), context_uri=playlist['uri'])
                 speak(f"Playing playlist {playlist['name']}")
                 return
         speak("Couldn't find that playlist.")
@@ -130,7 +137,7 @@ def play_playlist(playlist_name: str):
 
 def current_track():
     try:
-        track = sp.current_playback()
+        track = get_client().current_playback()
         if track and track.get("item"):
             name = track['item']['name']
             artist = track['item']['artists'][0]['name']
@@ -150,7 +157,7 @@ def current_track():
 
 def set_volume(percent: int):
     try:
-        sp.volume(percent, device_id=get_active_device_id())
+        get_client().volume(percent, device_id=get_active_device_id())
         speak(f"Spotify volume set to {percent} percent.")
     except Exception as e:
         print(f"[Volume Error] {e}")
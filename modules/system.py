@@ -3,23 +3,26 @@ import subprocess
 import ctypes
 import datetime
 import platform
-import pyautogui
-import win32gui
-import win32con
-import win32clipboard
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume, ISimpleAudioVolume
 from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
 from core.speech import speak
+from core.lazy import lazy_import
+
+# Windows-only backends, imported on first use so this module loads anywhere
+pyautogui = lazy_import("pyautogui")
+win32gui = lazy_import("win32gui")
+win32con = lazy_import("win32con")
+win32clipboard = lazy_import("win32clipboard")
+pycaw = lazy_import("pycaw.pycaw")
+comtypes = lazy_import("comtypes")
 
 
 # ===================== AUDIO CONTROLS =====================
 
 def set_master_volume(level):
     try:
-        devices = AudioUtilities.GetSpeakers()
-        interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-        volume = cast(interface, POINTER(IAudioEndpointVolume))
+        devices = pycaw.AudioUtilities.GetSpeakers()
+        interface = devices.Activate(pycaw.IAudioEndpointVolume._iid_, comtypes.CLSCTX_ALL, None)
+        volume = cast(interface, POINTER(pycaw.IAudioEndpointVolume))
         scalar = float(level) / 100.0
         volume.SetMasterVolumeLevelScalar(scalar, None)
         print(f"🔊 Master volume set to {level}%")
@@ -29,9 +32,9 @@ def set_master_volume(level):
 
 def get_master_volume():
     try:
-        devices = AudioUtilities.GetSpeakers()
-        interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-        volume = cast(interface, POINTER(IAudioEndpointVolume))
+        devices = pycaw.AudioUtilities.GetSpeakers()
+        interface = devices.Activate(pycaw.IAudioEndpointVolume._iid_, comtypes.CLSCTX_ALL, None)
+        volume = cast(interface, POINTER(pycaw.IAudioEndpointVolume))
         scalar = volume.GetMasterVolumeLevelScalar()
         return int(scalar * 100)
     except Exception as e:
@@ -40,9 +43,9 @@ def get_master_volume():
 
 def mute_system(mute=True):
     try:
-        devices = AudioUtilities.GetSpeakers()
-        interface = devices.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-        volume = cast(interface, POINTER(IAudioEndpointVolume))
+        devices = pycaw.AudioUtilities.GetSpeakers()
+        interface = devices.Activate(pycaw.IAudioEndpointVolume._iid_, comtypes.CLSCTX_ALL, None)
+        volume = cast(interface, POINTER(pycaw.IAudioEndpointVolume))
         volume.SetMute(int(mute), None)
         speak("System muted." if mute else "System unmuted.")
     except Exception as e:
@@ -50,10 +53,10 @@ def mute_system(mute=True):
 
 def set_app_volume(app_name, level):
     try:
-        sessions = AudioUtilities.GetAllSessions()
+        sessions = pycaw.AudioUtilities.GetAllSessions()
         for session in sessions:
             if session.Process and app_name.lower() in session.Process.name().lower():
-                volume = session._ctl.QueryInterface(ISimpleAudioVolume)
+                volume = session._ctl.QueryInterface(pycaw.ISimpleAudioVolume)
                 volume.SetMasterVolume(level / 100.0, None)
                 speak(f"{app_name} volume set to {level}%.")
                 return
@@ -63,10 +66,10 @@ def set_app_volume(app_name, level):
 
 def mute_app(app_name, mute=True):
     try:
-        sessions = AudioUtilities.GetAllSessions()
+        sessions = pycaw.AudioUtilities.GetAllSessions()
         for session in sessions:
             if session.Process and app_name.lower() in session.Process.name().lower():
-                volume = session._ctl.QueryInterface(ISimpleAudioVolume)
+                volume = session._ctl.QueryInterface(pycaw.ISimpleAudioVolume)
                 volume.SetMute(int(mute), None)
                 speak(f"{app_name} muted." if mute else f"{app_name} unmuted.")
                 return
@@ -1,10 +1,18 @@
+import re
 import time
 import threading
 from datetime import timedelta
-from core.speech import speak
+from core.speech import speak, PRIORITY_ALERT
+from core.events import publish
+from core.scheduler import Scheduler
+from core.journal import Journal
+from core.timeparse import parse_duration
 
-active_timer = None
-timer_cancelled = threading.Event()
+DEFAULT_NAME = "timer"            # what "start a timer for 5 minutes" is called
+DEFAULT_STOPWATCH = "stopwatch"
+TIMER_FILE = "data/timers.json"   # snapshot: {"timers": [...], "stopwatches": [...]}
+TIMER_LOG = "data/timers.log"     # changes since the snapshot, one JSON line each
+COMPACT_AFTER = 200
 
 # ========== Helper Utilities ==========
 
@@ -12,110 +20,440 @@ def format_time(seconds):
     return str(timedelta(seconds=int(seconds)))
 
 def parse_time(input_str):
-    input_str = input_str.lower()
-    mins, secs = 0, 0
-
-    if "min" in input_str:
-        try:
-            mins = int(input_str.split("min")[0].strip())
-        except:
-            pass
-    if "sec" in input_str:
-        try:
-            sec_part = input_str.split("sec")[0]
-            if "min" in sec_part:
-                secs = int(sec_part.split("min")[-1].strip())
+    """Seconds in "5 min", "1 hour 20 minutes", "90 seconds"; a bare number is minutes."""
+    found = parse_duration(input_str)
+    if found:
+        return found[0]
+    bare = re.search(r"\b(\d+)\b", input_str)
+    minutes = int(bare.group(1)) if bare else 0
+    return minutes * 60 if minutes > 0 else 60  # Default 60s if parsing fails
+
+def label(name):
+    return "the timer" if name == DEFAULT_NAME else f"the {name} timer"
+
+
+# ========== Timer Service ==========
+
+class TimerService:
+    """
+    Any number of named timers and stopwatches on one scheduler thread.
+
+    A running timer is one heap entry in the Scheduler at its end time, so
+    nothing wakes up until a timer is actually due; cancel and pause are
+    O(1) (the heap entry is dropped lazily). A paused timer keeps only its
+    remaining seconds. Stopwatches need no thread at all: elapsed time is
+    computed from their start time when asked for.
+
+    Timers are dicts ({"name", "total", "state", "ends_at" or "remaining"})
+    and stopwatches ({"name", "started_at", "elapsed", "state"}), keyed by
+    lower-cased name. Times are wall-clock, and every change is one line in
+    a Journal, so timers survive a restart with the right time left; those
+    that ran out while the assistant was down go to on_missed (or on_done,
+    one by one, without it) when the scheduler starts, and are ended in
+    the journal only then.
+    """
+
+    def __init__(self, snapshot_path=TIMER_FILE, log_path=TIMER_LOG, on_done=None, on_missed=None,
+                 clock=time.time, fsync=True):
+        self.on_done = on_done
+        self.on_missed = on_missed
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._timers = {}
+        self._stopwatches = {}
+        self.missed = []
+        self.scheduler = Scheduler("newt-timers", clock)
+        self.journal = Journal(log_path, snapshot_path, default={}, fsync=fsync)
+        self._load()
+
+    # ========== State ==========
+
+    def _load(self):
+        snapshot, ops = self.journal.load()
+        snapshot = snapshot if isinstance(snapshot, dict) else {}
+        self._timers = {t["name"]: t for t in snapshot.get("timers", [])}
+        self._stopwatches = {w["name"]: w for w in snapshot.get("stopwatches", [])}
+        for op in ops:
+            kind, name = op.get("op"), op.get("name")
+            if kind == "start":
+                self._timers[op["timer"]["name"]] = op["timer"]
+            elif kind == "end":
+                self._timers.pop(name, None)
+            elif kind == "pause" and name in self._timers:
+                self._timers[name].pop("ends_at", None)
+                self._timers[name].update(state="paused", remaining=op["remaining"])
+            elif kind == "resume" and name in self._timers:
+                self._timers[name].pop("remaining", None)
+                self._timers[name].update(state="running", ends_at=op["ends_at"])
+            elif kind == "watch":
+                self._stopwatches[op["watch"]["name"]] = op["watch"]
+            elif kind == "unwatch":
+                self._stopwatches.pop(name, None)
+
+        now = self.clock()
+        for timer in list(self._timers.values()):
+            if timer["state"] != "running":
+                continue
+            if timer["ends_at"] <= now:
+                self.missed.append(timer)  # kept until start_scheduler() has delivered it
             else:
-                secs = int(sec_part.strip())
-        except:
-            pass
+                self.scheduler.schedule(timer["name"], timer["ends_at"], self._fire)
+        self.missed.sort(key=lambda t: t["ends_at"])
+        if self._compact_due():
+            self.compact()
 
-    total = mins * 60 + secs
-    return total if total > 0 else 60  # Default 60s if parsing fails
+    def _compact_due(self):
+        return self.journal.ops >= max(COMPACT_AFTER, len(self._timers) + len(self._stopwatches))
 
+    def compact(self):
+        with self._lock:
+            self.journal.compact({"timers": list(self._timers.values()),
+                                  "stopwatches": list(self._stopwatches.values())}, indent=2)
 
-# ========== Timer Logic ==========
+    def _logged(self, *ops):
+        self.journal.append(*ops)
+        if self._compact_due():
+            self.compact()
 
-def _run_countdown(seconds):
-    timer_cancelled.clear()
-    start_time = time.time()
-    end_time = start_time + seconds
+    # ========== Timers ==========
 
-    try:
-        while time.time() < end_time:
-            if timer_cancelled.is_set():
-                speak("Timer cancelled.")
+    def start(self, name, seconds):
+        """Start a timer; returns it, or None if one with that name already exists."""
+        name = name.strip().lower() or DEFAULT_NAME
+        with self._lock:
+            if name in self._timers:
+                return None
+            timer = {"name": name, "total": seconds, "state": "running", "ends_at": self.clock() + seconds}
+            self._timers[name] = timer
+            self._logged({"op": "start", "timer": timer})
+            self.scheduler.schedule(name, timer["ends_at"], self._fire)
+        self._publish(timer)
+        return timer
+
+    def cancel(self, name):
+        with self._lock:
+            timer = self._timers.pop(name, None)
+            if timer is None:
+                return None
+            self._logged({"op": "end", "name": name})
+            self.scheduler.cancel(name)
+            timer["remaining"] = self.remaining(timer)
+            timer["state"] = "cancelled"
+        self._publish(timer)
+        return timer
+
+    def pause(self, name):
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None or timer["state"] != "running":
+                return None
+            self.scheduler.cancel(name)
+            timer["remaining"] = max(0.0, timer.pop("ends_at") - self.clock())
+            timer["state"] = "paused"
+            self._logged({"op": "pause", "name": name, "remaining": timer["remaining"]})
+        self._publish(timer)
+        return timer
+
+    def resume(self, name):
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None or timer["state"] != "paused":
+                return None
+            timer["ends_at"] = self.clock() + timer.pop("remaining")
+            timer["state"] = "running"
+            self._logged({"op": "resume", "name": name, "ends_at": timer["ends_at"]})
+            self.scheduler.schedule(name, timer["ends_at"], self._fire)
+        self._publish(timer)
+        return timer
+
+    def remaining(self, timer):
+        """Seconds left on a timer dict (or name), or None."""
+        if isinstance(timer, str):
+            timer = self._timers.get(timer)
+            if timer is None:
+                return None
+        if "ends_at" in timer:
+            return max(0.0, timer["ends_at"] - self.clock())
+        return timer["remaining"]
+
+    def get(self, name):
+        return self._timers.get(name)
+
+    def all(self):
+        """Every timer, the one ending soonest first."""
+        with self._lock:
+            timers = list(self._timers.values())
+        return sorted(timers, key=self.remaining)
+
+    def resolve(self, name=None):
+        """The timer meant by name; without one, the default timer or the only timer."""
+        with self._lock:
+            if name:
+                return self._timers.get(name.strip().lower())
+            if DEFAULT_NAME in self._timers:
+                return self._timers[DEFAULT_NAME]
+            if len(self._timers) == 1:
+                return next(iter(self._timers.values()))
+            return None
+
+    def __len__(self):
+        return len(self._timers)
+
+    def _fire(self, name):
+        with self._lock:
+            timer = self._timers.pop(name, None)
+            if timer is None:
                 return
-            time.sleep(1)
-        speak("⏰ Time's up!")
+            self._logged({"op": "end", "name": name})
+            timer["state"] = "done"
+            timer["remaining"] = 0
+        self._publish(timer)
+        if self.on_done is not None:
+            self.on_done(timer)
+
+    def _publish(self, timer):
+        publish("timer", name=timer["name"], state=timer["state"],
+                remaining=round(self.remaining(timer)), total=timer["total"])
+
+    # ========== Stopwatches ==========
+
+    def start_stopwatch(self, name=DEFAULT_STOPWATCH):
+        """Start (or resume a paused) stopwatch; returns it, or None if it is already running."""
+        name = name.strip().lower() or DEFAULT_STOPWATCH
+        with self._lock:
+            watch = self._stopwatches.get(name)
+            if watch is not None and watch["state"] == "running":
+                return None
+            if watch is None:
+                watch = self._stopwatches[name] = {"name": name, "elapsed": 0.0}
+            watch["started_at"] = self.clock()
+            watch["state"] = "running"
+            self._logged({"op": "watch", "watch": watch})
+        publish("stopwatch", name=name, state="running", elapsed=round(watch["elapsed"]))
+        return watch
+
+    def pause_stopwatch(self, name):
+        with self._lock:
+            watch = self._stopwatches.get(name)
+            if watch is None or watch["state"] != "running":
+                return None
+            watch["elapsed"] = self.elapsed(watch)
+            watch["state"] = "paused"
+            self._logged({"op": "watch", "watch": watch})
+        publish("stopwatch", name=name, state="paused", elapsed=round(watch["elapsed"]))
+        return watch
+
+    def stop_stopwatch(self, name):
+        """Remove a stopwatch; returns its elapsed seconds, or None if there is none."""
+        with self._lock:
+            watch = self._stopwatches.pop(name, None)
+            if watch is None:
+                return None
+            self._logged({"op": "unwatch", "name": name})
+            elapsed = self.elapsed(watch)
+        publish("stopwatch", name=name, state="stopped", elapsed=round(elapsed))
+        return elapsed
+
+    def elapsed(self, watch):
+        if isinstance(watch, str):
+            watch = self._stopwatches.get(watch)
+            if watch is None:
+                return None
+        if watch["state"] == "running":
+            return watch["elapsed"] + self.clock() - watch["started_at"]
+        return watch["elapsed"]
+
+    def stopwatches(self):
+        with self._lock:
+            return list(self._stopwatches.values())
+
+    def resolve_stopwatch(self, name=None):
+        with self._lock:
+            if name:
+                return self._stopwatches.get(name.strip().lower())
+            if DEFAULT_STOPWATCH in self._stopwatches:
+                return self._stopwatches[DEFAULT_STOPWATCH]
+            if len(self._stopwatches) == 1:
+                return next(iter(self._stopwatches.values()))
+            return None
+
+    def start_scheduler(self):
+        self.scheduler.start()
+        with self._lock:
+            missed = [t for t in self.missed if self._timers.get(t["name"]) is t]
+            self.missed = []
+        if missed:
+            if self.on_missed is not None:
+                self.on_missed(missed)
+            elif self.on_done is not None:
+                for timer in missed:
+                    self.on_done(timer)
+            with self._lock:
+                for timer in missed:
+                    if self._timers.get(timer["name"]) is timer:
+                        del self._timers[timer["name"]]
+                self._logged(*({"op": "end", "name": t["name"]} for t in missed))
+        return self
+
+    def stop(self):
+        self.scheduler.stop()
+
+
+def announce(timer):
+    if timer["name"] == DEFAULT_NAME:
+        speak("⏰ Time's up!", priority=PRIORITY_ALERT)
+    else:
+        speak(f"⏰ The {timer['name']} timer is done!", priority=PRIORITY_ALERT)
+
+
+def announce_missed(timers):
+    """One announcement for every timer that ran out while Newt was not running."""
+    names = [label(t["name"]) for t in timers]
+    if len(names) == 1:
+        summary = f"{names[0].capitalize()} finished while I was away."
+    else:
+        summary = f"{len(names)} timers finished while I was away: {', '.join(names[:-1])} and {names[-1]}."
+    for timer in timers:
+        timer.update(state="done", remaining=0)
+        publish("timer", name=timer["name"], state="done", remaining=0, total=timer["total"])
+    speak(f"⏰ {summary}", priority=PRIORITY_ALERT)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def get_timers():
+    """The shared TimerService for data/, loaded and started on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TimerService(on_done=announce, on_missed=announce_missed).start_scheduler()
+        return _service
+
+def start_timer_service():
+    """Bring back timers from the last run at startup rather than at the first timer command."""
+    try:
+        get_timers()
     except Exception as e:
-        speak("Timer failed to complete.")
-        print(f"❌ Timer error: {e}")
+        print(f"[Timer Service Error] {e}")
 
-def start_timer(duration="1 min"):
-    global active_timer
 
-    if active_timer and active_timer.is_alive():
-        speak("A timer is already running.")
-        return
+# ========== Timer Logic ==========
+
+def _no_timer(service, name):
+    """Say why resolve(name) found nothing."""
+    if name:
+        speak(f"There is no {name} timer.")
+    elif not len(service):
+        speak("There is no active timer running.")
+    else:
+        names = [t["name"] for t in service.all()]
+        speak(f"Which timer? You have {', '.join(names[:-1])} and {names[-1]} timers.")
 
+def start_timer(duration="1 min", name=None):
     seconds = parse_time(duration)
-    speak(f"Timer started for {format_time(seconds)}.")
-    active_timer = threading.Thread(target=_run_countdown, args=(seconds,), daemon=True)
-    active_timer.start()
-
-def cancel_timer():
-    global active_timer
-    if active_timer and active_timer.is_alive():
-        timer_cancelled.set()
-        speak("Timer cancelled.")
-        active_timer = None
+    timer = get_timers().start(name or DEFAULT_NAME, seconds)
+    if timer is None:
+        speak(f"{label(name or DEFAULT_NAME).capitalize()} is already running.")
+        return
+    speak(f"{label(timer['name']).capitalize()} started for {format_time(seconds)}.")
+
+def cancel_timer(name=None):
+    service = get_timers()
+    if name == "all":
+        cancelled = [service.cancel(t["name"]) for t in service.all()]
+        speak(f"Cancelled {len(cancelled)} timer{'s' if len(cancelled) != 1 else ''}." if cancelled
+              else "There is no active timer running.")
+        return
+    timer = service.resolve(name)
+    if timer is None:
+        _no_timer(service, name)
     else:
-        speak("There is no active timer running.")
+        service.cancel(timer["name"])
+        speak(f"Cancelled {label(timer['name'])}.")
 
+def pause_timer(name=None):
+    service = get_timers()
+    timer = service.resolve(name)
+    if timer is None:
+        return _no_timer(service, name)
+    if service.pause(timer["name"]) is None:
+        speak(f"{label(timer['name']).capitalize()} is already paused.")
+        return
+    speak(f"Paused {label(timer['name'])} with {format_time(service.remaining(timer))} left.")
 
-# ========== Stopwatch Logic ==========
+def resume_timer(name=None):
+    service = get_timers()
+    timer = service.resolve(name)
+    if timer is None:
+        return _no_timer(service, name)
+    if service.resume(timer["name"]) is None:
+        speak(f"{label(timer['name']).capitalize()} is already running.")
+        return
+    speak(f"Resumed {label(timer['name'])}, {format_time(service.remaining(timer))} to go.")
 
-stopwatch_start = None
-stopwatch_thread = None
-stopwatch_running = threading.Event()
+def list_timers():
+    timers = get_timers().all()
+    if not timers:
+        speak("No timers are running.")
+        return
+    speak(f"You have {len(timers)} timer{'s' if len(timers) != 1 else ''}:")
+    for timer in timers:
+        paused = ", paused" if timer["state"] == "paused" else ""
+        speak(f"{label(timer['name'])} with {format_time(get_timers().remaining(timer))} left{paused}")
 
-def _run_stopwatch():
-    global stopwatch_start
-    stopwatch_start = time.time()
-    stopwatch_running.set()
-    speak("Stopwatch started.")
-    try:
-        while stopwatch_running.is_set():
-            time.sleep(1)
-    except:
-        speak("Stopwatch error.")
-
-def start_stopwatch():
-    global stopwatch_thread
-    if stopwatch_running.is_set():
+
+# ========== Stopwatch Logic ==========
+
+def start_stopwatch(name=None):
+    if get_timers().start_stopwatch(name or DEFAULT_STOPWATCH) is None:
         speak("Stopwatch is already running.")
         return
-    stopwatch_thread = threading.Thread(target=_run_stopwatch, daemon=True)
-    stopwatch_thread.start()
+    speak("Stopwatch started.")
+
+def stop_stopwatch(name=None):
+    service = get_timers()
+    watch = service.resolve_stopwatch(name)
+    if watch is None:
+        speak("Stopwatch is not running." if not name else f"There is no {name} stopwatch.")
+        return
+    elapsed = service.stop_stopwatch(watch["name"])
+    speak(f"⏱ Stopwatch stopped at {format_time(elapsed)}.")
 
-def stop_stopwatch():
-    if not stopwatch_running.is_set():
+def pause_stopwatch(name=None):
+    service = get_timers()
+    watch = service.resolve_stopwatch(name)
+    if watch is None or service.pause_stopwatch(watch["name"]) is None:
         speak("Stopwatch is not running.")
         return
+    speak(f"⏱ Stopwatch paused at {format_time(service.elapsed(watch))}.")
 
-    stopwatch_running.clear()
-    elapsed = time.time() - stopwatch_start
-    speak(f"⏱ Stopwatch stopped at {format_time(elapsed)}.")
+
+def stopwatch_status(name=None):
+    service = get_timers()
+    watch = service.resolve_stopwatch(name)
+    if watch is None:
+        speak("Stopwatch is not running." if not name else f"There is no {name} stopwatch.")
+        return
+    paused = " It is paused." if watch["state"] == "paused" else ""
+    speak(f"Stopwatch at {format_time(service.elapsed(watch))}.{paused}")
 
 
 # ========== Timer Voice Summary (for status check) ==========
 
-def timer_status():
-    if active_timer and active_timer.is_alive() and not timer_cancelled.is_set():
-        speak("A timer is currently running.")
-    elif stopwatch_running.is_set():
-        elapsed = time.time() - stopwatch_start
+def timer_status(name=None):
+    service = get_timers()
+    timer = service.resolve(name)
+    if timer is not None:
+        paused = " It is paused." if timer["state"] == "paused" else ""
+        speak(f"{format_time(service.remaining(timer))} left on {label(timer['name'])}.{paused}")
+        return
+    if name:
+        speak(f"There is no {name} timer.")
+    elif len(service) > 1:
+        list_timers()
+    elif service.resolve_stopwatch() is not None:
+        elapsed = service.elapsed(service.resolve_stopwatch())
         speak(f"Stopwatch running. Elapsed time: {format_time(elapsed)}.")
     else:
         speak("No active timers or stopwatch.")
@@ -1,53 +1,213 @@
-from flask import Flask, render_template, request, redirect
-import json
+from flask import Flask, render_template, request, redirect, url_for, jsonify, abort
+import io
 import os
-from datetime import datetime
+import sys
+import hmac
+import json
+import bisect
+import hashlib
+import secrets
+import threading
+from datetime import datetime, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from core.memory_store import MemoryStore
+from core.memory_search import MemoryIndex
+from core.memory_ingest import ingest, guess_format, format_report, FORMATS
+from core.events import EVENT_PORT
+from core.daemon_client import send_command, new_request_id, DaemonUnavailable
+
+# Where the running assistant streams its events (python main.py --events-port)
+EVENTS_URL = os.environ.get("NEWT_EVENTS_URL", f"http://127.0.0.1:{EVENT_PORT}/events")
+PAGE_LIMIT = 50
+MAX_LIMIT = 500
+CACHED_PAGES = 256
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Changes need this token, which only pages served by this process carry,
+# so another site cannot post a form or fetch() here on the user's behalf
+CSRF_TOKEN = secrets.token_urlsafe(32)
+CSRF_HEADER = "X-CSRF-Token"
 
 app = Flask(__name__)
-MEMORY_FILE = "../data/memory.json"
-
-def load_memory():
-    if os.path.exists(MEMORY_FILE):
-        with open(MEMORY_FILE, "r") as f:
-            try:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
-            except json.JSONDecodeError:
-                return []
-    return []
-
-def save_memory(data):
-    with open(MEMORY_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
-@app.route("/", methods=["GET", "POST"])
+# The same journal the assistant writes; compaction is left to the assistant process
+store = MemoryStore(os.path.join(ROOT_DIR, "data"), background=False)
+
+
+class MemoryView:
+    """
+    Newest-first view of the store for the API, kept in this process.
+
+    Records are sorted once per store version and pages are served with a
+    bisect on the id cursor; rendered pages are cached until the next
+    change. Search uses a private in-memory FTS5 index so the web UI never
+    writes to the assistant's memory.db.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._version = None   # store version the sorted records and pages belong to
+        self._ids = None       # ascending record ids
+        self._records = None
+        self._pages = {}
+        self._index = MemoryIndex(":memory:")
+        # Called under the store's lock, so it must not take ours
+        store.add_listener(self._index)
+
+    def _sorted(self):
+        if self._ids is None:
+            self._records = sorted(self.store.all(), key=lambda r: r["id"])
+            self._ids = [r["id"] for r in self._records]
+        return self._ids, self._records
+
+    def page(self, cursor=None, limit=PAGE_LIMIT, query=""):
+        """
+        (body bytes, version) of one page. Listing cursors are the id to
+        continue below; search cursors are offsets into the ranked results.
+        """
+        self.store.refresh()
+        key = (cursor, limit, query)
+        with self._lock:
+            version = self.store.version
+            if version != self._version:
+                self._version, self._ids, self._records, self._pages = version, None, None, {}
+            if key in self._pages:
+                return self._pages[key], version
+            if query:
+                offset = int(cursor or 0)
+                hits = self._index.search(query, limit + 1, offset)
+                items = [self.store.get(hit["id"]) or hit for hit in hits]
+                next_cursor = str(offset + limit) if len(items) > limit else None
+                total = None
+            else:
+                ids, records = self._sorted()
+                end = bisect.bisect_left(ids, int(cursor)) if cursor else len(ids)
+                items = records[max(end - limit - 1, 0):end][::-1]
+                next_cursor = str(items[limit - 1]["id"]) if len(items) > limit else None
+                total = len(ids)
+            body = json.dumps({"items": [_public(r) for r in items[:limit]], "next_cursor": next_cursor,
+                               "total": total, "version": version}, ensure_ascii=False).encode("utf-8")
+            if len(self._pages) >= CACHED_PAGES:
+                self._pages.pop(next(iter(self._pages)))
+            self._pages[key] = body
+            return body, version
+
+
+def _public(record):
+    return {k: record.get(k) for k in ("id", "text", "timestamp", "source", "pinned", "expires")}
+
+
+view = MemoryView(store)
+
+
+@app.before_request
+def check_origin():
+    """Refuse changes from other origins or without this process's CSRF token."""
+    if request.method in SAFE_METHODS:
+        return
+    origin = request.headers.get("Origin")
+    if origin and origin.rstrip("/") != request.host_url.rstrip("/"):
+        abort(403, "cross-origin request")
+    token = request.headers.get(CSRF_HEADER) or request.form.get("csrf_token", "")
+    if not hmac.compare_digest(token, CSRF_TOKEN):
+        abort(403, "missing or wrong CSRF token")
+
+
+def json_body():
+    """The request's JSON object; form posts and other content types are refused."""
+    if not request.is_json:
+        abort(415, "send application/json")
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        abort(400, "body must be a JSON object")
+    return body
+
+
+@app.route("/")
 def index():
-    if request.method == "POST":
-        text = request.form.get("text")
-        if text:
-            memory = load_memory()
-            memory.append({
-                "text": text.strip(),
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
-            save_memory(memory)
+    return render_template("index.html", report=request.args.get("report"), events_url=EVENTS_URL,
+                           csrf_token=CSRF_TOKEN)
+
+
+# ========== JSON API ==========
+
+@app.route("/api/memories")
+def api_list():
+    cursor = request.args.get("cursor") or None
+    if cursor is not None and not cursor.isdigit():
+        abort(400, "cursor must come from next_cursor")
+    limit = min(max(request.args.get("limit", PAGE_LIMIT, type=int), 1), MAX_LIMIT)
+    body, version = view.page(cursor, limit, request.args.get("q", "").strip())
+    response = app.response_class(body, mimetype="application/json")
+    response.set_etag(hashlib.sha1(body).hexdigest())
+    if store.changed_at:
+        response.last_modified = datetime.fromtimestamp(store.changed_at, timezone.utc)
+    response.cache_control.no_cache = True  # always revalidate; unchanged pages come back as 304
+    return response.make_conditional(request)
+
+
+@app.route("/api/memories", methods=["POST"])
+def api_add():
+    text = json_body().get("text", "")
+    if not isinstance(text, str) or not text.strip():
+        abort(400, "text is required")
+    return jsonify(_public(store.add(text, source="web"))), 201
+
+
+@app.route("/api/memories/<int:record_id>", methods=["GET"])
+def api_get(record_id):
+    record = store.get(record_id)
+    if record is None:
+        abort(404)
+    return jsonify(_public(record))
+
+
+@app.route("/api/memories/<int:record_id>", methods=["DELETE"])
+def api_delete(record_id):
+    if not store.delete(record_id):
+        abort(404)
+    return "", 204
+
+
+@app.route("/api/memories", methods=["DELETE"])
+def api_clear():
+    store.clear()
+    return "", 204
+
+
+@app.route("/api/commands", methods=["POST"])
+def api_command():
+    """Run a text command on the warm assistant daemon (python main.py --daemon)."""
+    body = json_body()
+    command = str(body.get("command") or "").strip()
+    if not command:
+        abort(400, "command is required")
+    request_id = body.get("id") or request.headers.get("X-Request-ID") or new_request_id()
+    try:
+        response = send_command(command, request_id=request_id)
+    except DaemonUnavailable as e:
+        return jsonify({"id": request_id, "outcome": "unavailable", "error": str(e)}), 503
+    except OSError as e:
+        return jsonify({"id": request_id, "outcome": "error", "error": str(e)}), 504
+    reply = jsonify(response)
+    reply.headers["X-Request-ID"] = response.get("id", request_id)
+    return reply
+
+
+@app.route("/upload", methods=["POST"])
+def upload():
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
         return redirect("/")
+    fmt = request.form.get("format")
+    fmt = fmt if fmt in FORMATS else guess_format(upload.filename)
+    # Read straight from the upload stream; the file is never held in memory whole
+    lines = io.TextIOWrapper(upload.stream, encoding="utf-8", errors="replace")
+    report = ingest(lines, fmt, source="web", store=store)
+    return redirect(url_for("index", report=format_report(report)))
 
-    memory = load_memory()
-    return render_template("index.html", memory=memory)
-
-@app.route("/delete/<int:index>")
-def delete(index):
-    memory = load_memory()
-    if 0 <= index < len(memory):
-        memory.pop(index)
-        save_memory(memory)
-    return redirect("/")
-
-@app.route("/clear")
-def clear():
-    save_memory([])
-    return redirect("/")
 
 if __name__ == "__main__":
     app.run(debug=True)